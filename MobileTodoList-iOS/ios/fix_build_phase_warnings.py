@@ -8,9 +8,13 @@ Works without external dependencies
 
 import os
 import sys
-import re
+import json
+import shutil
 import glob
 from datetime import datetime
+from pathlib import Path
+
+from xcode_audit import FixTransaction, PhaseRuleSet, set_array_field
 
 def find_xcodeproj():
     """Find the .xcodeproj file in the ios directory"""
@@ -24,91 +28,88 @@ def backup_file(filepath):
     """Create a backup of the file"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_path = f"{filepath}.backup_{timestamp}"
-    with open(filepath, 'r') as f:
-        content = f.read()
-    with open(backup_path, 'w') as f:
-        f.write(content)
+    shutil.copyfile(filepath, backup_path)
     print(f"📋 Created backup: {os.path.basename(backup_path)}")
     return backup_path
 
-def fix_build_phases(pbxproj_path):
-    """Fix build phase warnings by adding output files"""
+def protocol_path(pbxproj_path):
+    """The build protocol of the nearest project root above pbxproj_path, or None
+    
+    The root is the first directory up the tree with a
+    .vscode/xcode-build-protocol.json, as the auditor's project root has.
+    """
+    for directory in Path(pbxproj_path).resolve().parents:
+        path = directory / '.vscode' / 'xcode-build-protocol.json'
+        if path.exists():
+            return path
+    return None
+
+def load_phase_rules(pbxproj_path):
+    """Script phases that must declare outputs, from the build protocol (as the auditor reads them)"""
+    path = protocol_path(pbxproj_path)
+    if path is None:
+        print(f"❌ Error: no .vscode/xcode-build-protocol.json found above {pbxproj_path}")
+        sys.exit(1)
+    with open(path, 'r') as f:
+        protocol = json.load(f)
+    specs = protocol.get('buildPhaseConfiguration', {}).get('scriptPhases', {}).get('rules', [])
+    return PhaseRuleSet.from_protocol(specs)
+
+def fix_build_phases(pbxproj_path, transaction=None, rules=None):
+    """Fix build phase warnings by adding output files
     
-    print(f"📝 Reading: {pbxproj_path}")
+    With a FixTransaction the edits join it and are written when the caller
+    commits; otherwise they are written (after a backup) before returning.
+    Rules default to the protocol's buildPhaseConfiguration.
+    """
     
-    with open(pbxproj_path, 'r') as f:
-        content = f.read()
+    if rules is None:
+        rules = load_phase_rules(pbxproj_path)
     
-    original_content = content
-    fixes_applied = 0
+    if transaction is None:
+        with FixTransaction() as transaction:
+            if not fix_build_phases(pbxproj_path, transaction, rules):
+                return False
+            transaction.commit(backup=backup_file)
+            print(f"💾 Saved: {pbxproj_path}")
+            return True
     
-    # Pattern to find shell script build phases
-    # We need to find the section and add outputPaths if missing
+    print(f"📝 Reading: {pbxproj_path}")
     
-    # Fix 1: Bundle React Native code and images
-    pattern1 = r'(shellScript = ".*?Bundle React Native code and images.*?";)'
-    matches1 = re.finditer(pattern1, content, re.DOTALL)
+    project = transaction.project(pbxproj_path)
+    patches = transaction.patches(pbxproj_path)
+    fixes_applied = 0
     
-    for match in matches1:
-        # Find the enclosing PBXShellScriptBuildPhase section
-        start_pos = match.start()
-        
-        # Search backwards for the beginning of this build phase
-        section_start = content.rfind('Begin PBXShellScriptBuildPhase section', 0, start_pos)
-        if section_start == -1:
-            section_start = 0
-            
-        # Find the build phase object that contains this script
-        # Look for patterns like: 00DD1BFF1BD5951E006B06BC /* Bundle React Native code and images */ = {
-        phase_match = re.search(
-            r'([A-F0-9]{24}) /\* Bundle React Native code and images \*/ = \{([^}]+)\}',
-            content[section_start:start_pos + 1000],
-            re.DOTALL
-        )
-        
-        if phase_match:
-            phase_id = phase_match.group(1)
-            phase_content = phase_match.group(2)
-            
-            # Check if outputPaths already exists
-            if 'outputPaths' not in phase_content:
-                # Find where to insert outputPaths (before shellScript)
-                insert_pos = content.find('shellScript', start_pos)
-                if insert_pos != -1:
-                    # Add outputPaths
-                    output_paths_entry = '\t\t\toutputPaths = (\n\t\t\t\t"$(DERIVED_FILE_DIR)/main.jsbundle",\n\t\t\t\t"$(DERIVED_FILE_DIR)/main.jsbundle.map",\n\t\t\t);\n\t\t\t'
-                    content = content[:insert_pos] + output_paths_entry + content[insert_pos:]
-                    fixes_applied += 1
-                    print("✓ Fixed: Bundle React Native code and images")
-    
-    # Fix 2: [CP-User] [RNFB] Core Configuration
-    pattern2 = r'(shellScript = ".*?\[CP-User\] \[RNFB\] Core Configuration.*?";)'
-    matches2 = re.finditer(pattern2, content, re.DOTALL)
-    
-    for match in matches2:
-        start_pos = match.start()
+    phase_target = project.graph.phase_target
+    phases = list(project.objects_of('PBXShellScriptBuildPhase'))
+    
+    # Outputs each target already declares: a pattern rule must not make two
+    # phases of one target produce the same file
+    claimed = {}
+    for phase_id, phase in phases:
+        claimed.setdefault(phase_target.get(phase_id, ''), set()).update(phase.outputPaths or ())
+    
+    # Every phase with a matching name is fixed, even if two share a body
+    for phase_id, phase in phases:
+        # Check if outputPaths (or output file lists) already exist
+        if phase.outputPaths is not None or phase.outputFileListPaths:
+            continue
+        phase_name = phase.display_name
+        rule = rules.match(phase_name)
+        if rule is None or not rule.required_outputs:
+            continue
         
-        section_start = content.rfind('Begin PBXShellScriptBuildPhase section', 0, start_pos)
-        if section_start == -1:
-            section_start = 0
-            
-        phase_match = re.search(
-            r'([A-F0-9]{24}) /\* \[CP-User\] \[RNFB\] Core Configuration \*/ = \{([^}]+)\}',
-            content[section_start:start_pos + 1000],
-            re.DOTALL
-        )
+        outputs = list(rule.required_outputs)
+        target_outputs = claimed[phase_target.get(phase_id, '')]
+        if target_outputs.intersection(outputs):
+            print(f"⚠️  Skipped {rule.id} for '{phase_name}': another phase in its target "
+                  f"already produces {', '.join(outputs)}")
+            continue
+        target_outputs.update(outputs)
         
-        if phase_match:
-            phase_id = phase_match.group(1)
-            phase_content = phase_match.group(2)
-            
-            if 'outputPaths' not in phase_content:
-                insert_pos = content.find('shellScript', start_pos)
-                if insert_pos != -1:
-                    output_paths_entry = '\t\t\toutputPaths = (\n\t\t\t\t"$(DERIVED_FILE_DIR)/rnfb-config-generated.log",\n\t\t\t);\n\t\t\t'
-                    content = content[:insert_pos] + output_paths_entry + content[insert_pos:]
-                    fixes_applied += 1
-                    print("✓ Fixed: [CP-User] [RNFB] Core Configuration")
+        set_array_field(patches, project, phase_id, 'outputPaths', outputs)
+        fixes_applied += 1
+        print(f"✓ Fixed: {phase_name} ({rule.id})")
     
     # If no fixes were applied using the complex method, try a simpler approach
     if fixes_applied == 0:
@@ -118,22 +119,13 @@ def fix_build_phases(pbxproj_path):
         print("  - The project structure is different than expected")
         print("  - The fixes were already applied")
         print("\n📖 Manual fix instructions:")
-        print_manual_instructions()
+        print_manual_instructions(rules)
         return False
     
-    # Save the modified content
-    if content != original_content:
-        backup_file(pbxproj_path)
-        
-        with open(pbxproj_path, 'w') as f:
-            f.write(content)
-        
-        print(f"\n✅ Successfully applied {fixes_applied} fix(es) to project file")
-        return True
-    
-    return False
+    print(f"\n✅ Applied {fixes_applied} fix(es) to project file")
+    return True
 
-def print_manual_instructions():
+def print_manual_instructions(rules):
     """Print manual fix instructions"""
     print("\n" + "="*60)
     print("MANUAL FIX INSTRUCTIONS")
@@ -142,15 +134,20 @@ def print_manual_instructions():
     print("   open ios/*.xcworkspace")
     print("\n2. Select your app target")
     print("\n3. Go to 'Build Phases' tab")
-    print("\n4. For 'Bundle React Native code and images':")
-    print("   - Find the script phase")
-    print("   - Expand 'Output Files'")
-    print("   - Add: $(DERIVED_FILE_DIR)/main.jsbundle")
-    print("\n5. For '[CP-User] [RNFB] Core Configuration':")
-    print("   - Find the script phase")
-    print("   - Expand 'Output Files'")
-    print("   - Add: $(DERIVED_FILE_DIR)/rnfb-config-generated.log")
-    print("\n6. Clean and rebuild (Cmd+Shift+K, then Cmd+B)")
+    step = 4
+    for rule in rules.rules:
+        if not rule.required_outputs:
+            continue
+        if rule.script_name is not None:
+            print(f"\n{step}. For '{rule.script_name}':")
+        else:
+            print(f"\n{step}. For script phases matching {rule.pattern}:")
+        print("   - Find the script phase")
+        print("   - Expand 'Output Files'")
+        for output in rule.required_outputs:
+            print(f"   - Add: {output}")
+        step += 1
+    print(f"\n{step}. Clean and rebuild (Cmd+Shift+K, then Cmd+B)")
     print("="*60 + "\n")
 
 def main():
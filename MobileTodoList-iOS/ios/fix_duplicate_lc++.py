@@ -7,9 +7,16 @@ Automatically removes duplicate -lc++ entries from Xcode project
 
 import os
 import sys
-import re
+import json
+import shutil
 import glob
 from datetime import datetime
+from pathlib import Path
+
+from xcode_audit import (
+    FixTransaction, parse_flags, PBXProject, SettingsResolver, SettingsRuleSet, set_array_field,
+    set_string_field,
+)
 
 def find_xcodeproj():
     """Find the .xcodeproj file in the ios directory"""
@@ -26,110 +33,98 @@ def backup_file(filepath):
     """Create a backup of the file"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     backup_path = f"{filepath}.backup_{timestamp}"
-    with open(filepath, 'r') as f:
-        content = f.read()
-    with open(backup_path, 'w') as f:
-        f.write(content)
+    shutil.copyfile(filepath, backup_path)
     print(f"📋 Created backup: {os.path.basename(backup_path)}")
     return backup_path
 
-def fix_duplicate_lc_plusplus(pbxproj_path):
-    """Remove duplicate -lc++ entries from OTHER_LDFLAGS"""
-    
-    print(f"📝 Reading: {pbxproj_path}")
-    
-    with open(pbxproj_path, 'r') as f:
-        content = f.read()
-    
-    original_content = content
-    fixes_applied = 0
+def protocol_path(pbxproj_path):
+    """The build protocol of the nearest project root above pbxproj_path, or None
+    
+    The root is the first directory up the tree with a
+    .vscode/xcode-build-protocol.json, as the auditor's project root has.
+    """
+    for directory in Path(pbxproj_path).resolve().parents:
+        path = directory / '.vscode' / 'xcode-build-protocol.json'
+        if path.exists():
+            return path
+    return None
+
+def load_ldflags_rules(pbxproj_path):
+    """The protocol's OTHER_LDFLAGS rules (BS001: every repeated linker flag,
+    not just -lc++, in every configuration and [sdk=...] variant)"""
+    path = protocol_path(pbxproj_path)
+    if path is None:
+        print(f"❌ Error: no .vscode/xcode-build-protocol.json found above {pbxproj_path}")
+        sys.exit(1)
+    with open(path, 'r') as f:
+        protocol = json.load(f)
+    specs = protocol.get('buildSettingsConfiguration', {}).get('rules', [])
+    return SettingsRuleSet.from_protocol([spec for spec in specs if spec.get('setting') == 'OTHER_LDFLAGS'])
+
+def fix_duplicate_lc_plusplus(pbxproj_path, transaction=None, rules=None):
+    """Remove duplicate -lc++ (and other repeated) entries from OTHER_LDFLAGS
     
-    # Pattern 1: Find OTHER_LDFLAGS with duplicate -lc++
-    # Example: OTHER_LDFLAGS = ("-lc++", "-lc++", ...);
-    pattern1 = r'OTHER_LDFLAGS\s*=\s*\(([^)]+)\);'
+    With a FixTransaction the edits join it and are written when the caller
+    commits; otherwise they are written (after a backup) before returning.
+    Rules default to the protocol's OTHER_LDFLAGS build setting rules.
+    """
     
-    def remove_duplicate_lc_plusplus(match):
-        nonlocal fixes_applied
-        full_match = match.group(0)
-        flags_content = match.group(1)
-        
-        # Split by comma and clean up
-        flags = [f.strip() for f in flags_content.split(',')]
-        
-        # Count -lc++ occurrences
-        lc_plusplus_count = sum(1 for flag in flags if '"-lc++"' in flag or "'-lc++'" in flag)
-        
-        if lc_plusplus_count > 1:
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_flags = []
-            for flag in flags:
-                flag_clean = flag.strip()
-                if flag_clean and flag_clean not in seen:
-                    seen.add(flag_clean)
-                    unique_flags.append(flag)
-            
-            fixes_applied += 1
-            print(f"✓ Removed {lc_plusplus_count - 1} duplicate -lc++ flag(s)")
-            
-            # Reconstruct OTHER_LDFLAGS
-            return f"OTHER_LDFLAGS = ({', '.join(unique_flags)});"
-        
-        return full_match
+    if rules is None:
+        rules = load_ldflags_rules(pbxproj_path)
     
-    content = re.sub(pattern1, remove_duplicate_lc_plusplus, content)
+    if transaction is None:
+        with FixTransaction() as transaction:
+            if not fix_duplicate_lc_plusplus(pbxproj_path, transaction, rules):
+                return False
+            transaction.commit(backup=backup_file)
+            print(f"💾 Saved: {pbxproj_path}")
+            return True
     
-    # Pattern 2: Find inherited OTHER_LDFLAGS with duplicate -lc++
-    # Example: OTHER_LDFLAGS = "$(inherited) -lc++ -lc++";
-    pattern2 = r'OTHER_LDFLAGS\s*=\s*"([^"]+)";'
+    print(f"📝 Reading: {pbxproj_path}")
     
-    def remove_duplicate_lc_plusplus_string(match):
-        nonlocal fixes_applied
-        full_match = match.group(0)
-        flags_content = match.group(1)
-        
-        # Split by space and clean up
-        flags = flags_content.split()
-        
-        # Count -lc++ occurrences
-        lc_plusplus_count = sum(1 for flag in flags if flag == '-lc++')
-        
-        if lc_plusplus_count > 1:
-            # Remove duplicates while preserving order and keeping $(inherited)
-            seen = set()
-            unique_flags = []
-            for flag in flags:
-                # Always keep $(inherited) and other $(...) variables
-                if flag.startswith('$(') or flag not in seen:
-                    if not flag.startswith('$('):
-                        seen.add(flag)
-                    unique_flags.append(flag)
-            
-            fixes_applied += 1
-            print(f"✓ Removed {lc_plusplus_count - 1} duplicate -lc++ flag(s) from string format")
-            
-            # Reconstruct OTHER_LDFLAGS
-            return f'OTHER_LDFLAGS = "{" ".join(unique_flags)}";'
-        
-        return full_match
+    project = transaction.project(pbxproj_path)
+    patches = transaction.patches(pbxproj_path)
+    fixes_applied = 0
     
-    content = re.sub(pattern2, remove_duplicate_lc_plusplus_string, content)
+    # Array and string forms, quoted commas and $(inherited) are handled by
+    # the shared flag parser; each configuration is visited once
+    for config_id, config in project.objects_of('XCBuildConfiguration'):
+        for edit in rules.check(config):
+            if isinstance(edit.fixed, str):
+                set_string_field(patches, project, config_id, edit.key, edit.fixed, within='buildSettings')
+            else:
+                set_array_field(patches, project, config_id, edit.key, edit.fixed, within='buildSettings')
+            for finding in edit.findings:
+                fixes_applied += 1
+                print(f"✓ Removed duplicate {', '.join(finding.values)} from {edit.key} ({config.name})")
     
     if fixes_applied == 0:
         print("\n✅ No duplicate -lc++ flags found. Your project is already clean!")
         return False
     
-    # Save the modified content
-    if content != original_content:
-        backup_file(pbxproj_path)
-        
-        with open(pbxproj_path, 'w') as f:
-            f.write(content)
-        
-        print(f"\n✅ Successfully removed {fixes_applied} duplicate -lc++ flag(s)")
-        return True
-    
-    return False
+    print(f"\n✅ Removed duplicate linker flags from {fixes_applied} setting(s)")
+    return True
+
+def check_effective_flags(pbxproj_path):
+    """Report -lc++ repeated in the effective OTHER_LDFLAGS (xcconfigs included)"""
+    
+    print("\n📝 Resolving effective OTHER_LDFLAGS (project, xcconfig and Pods settings)")
+    
+    with PBXProject.load(pbxproj_path) as project:
+        resolver = SettingsResolver.for_pbxproj(project, pbxproj_path)
+        found = False
+        for row in resolver.effective(['OTHER_LDFLAGS']):
+            flags = parse_flags([row['settings']['OTHER_LDFLAGS'] or ''])
+            count = sum(1 for flag in flags if flag.key == ('-lc++',))
+            if count > 1:
+                found = True
+                print(f"⚠️  {row['target']} ({row['configuration']}): -lc++ appears {count} times")
+                print(f"    OTHER_LDFLAGS = {row['settings']['OTHER_LDFLAGS']}")
+        if not found:
+            print("✓ No target links -lc++ more than once")
+        if resolver.files_read:
+            print(f"    ({resolver.files_read} xcconfig file(s) included)")
+    return found
 
 def check_podfile():
     """Check if Podfile has duplicate -lc++ in post_install"""
@@ -211,11 +206,12 @@ def main():
             print("   - Go to Build Settings tab")
             print("   - Search for 'Other Linker Flags'")
             print("   - Look for duplicate -lc++ entries")
-            print("\n2. Check any .xcconfig files for duplicate entries")
-            print("\n3. If using CocoaPods, check if any pod is adding -lc++:")
-            print("   - Look in ios/Pods/Target Support Files/")
-            print("   - Check the .xcconfig files there")
-            print("="*60 + "\n")
+            print("\n2. Duplicates that only appear below come from .xcconfig files")
+            print("   (ios/Pods/Target Support Files/ for CocoaPods): fix the pod or")
+            print("   the post_install hook, then run pod install")
+            print("="*60)
+            check_effective_flags(pbxproj_path)
+            print()
             
     except Exception as e:
         print(f"\n❌ Error: {e}")
@@ -0,0 +1,161 @@
+import gzip
+import io
+import struct
+from pathlib import Path
+
+import pytest
+
+from xcode_audit import activitylog
+from xcode_audit import BuildTimeline, iter_slf_tokens, read_sections, SLFError
+
+SAMPLE = Path(__file__).parent / 'fixtures' / 'MobileTodoList.xcactivitylog'
+CHUNK = 1 << 16
+
+
+def string(value: str) -> bytes:
+    data = value.encode('utf-8')
+    return f'{len(data)}"'.encode() + data
+
+
+def double(value: float) -> bytes:
+    return struct.pack('<d', value).hex().encode() + b'^'
+
+
+def section(title: str, start: float, end: float, children: int) -> bytes:
+    """Header fields of a section instance of class 1"""
+    return (b'1@0#' + string('Xcode.IDEActivityLogDomainType.BuildLog') + string(title) + string('')
+            + double(start) + double(end) + f'{children}('.encode())
+
+
+def tokens(data: bytes):
+    return list(iter_slf_tokens(io.BytesIO(data)))
+
+
+def test_sample_tokens_decode():
+    with gzip.open(SAMPLE, 'rb') as f:
+        decoded = list(iter_slf_tokens(f))
+    assert decoded[0] == ('#', 11)
+    assert ('%', 'IDEActivityLogSection') in decoded
+    assert ('"', 'log text with 12# and "quotes" ✓') in decoded
+
+
+@pytest.mark.parametrize('shift', range(1, 9))
+def test_tokens_straddling_the_chunk_boundary(shift):
+    # Filler string that ends `shift` bytes before the first chunk does
+    header = b'SLF0'
+    length = CHUNK - shift - len(header) - len(f'{CHUNK}"')
+    data = header + f'{length}"'.encode() + b'x' * length
+    data += b'1234567#' + double(1.5) + string('after') + b'-3('
+    decoded = tokens(data)
+    assert decoded[0] == ('"', 'x' * length)
+    assert decoded[1:] == [('#', 1234567), ('^', 1.5), ('"', 'after'), ('-', None), ('(', 3)]
+
+
+def test_string_longer_than_a_chunk():
+    long = 'é' * (CHUNK + 100)  # two bytes each
+    decoded = tokens(b'SLF0' + b'7#' + string(long) + b'8#')
+    assert decoded == [('#', 7), ('"', long), ('#', 8)]
+
+
+def test_small_reads_give_the_same_sections(monkeypatch):
+    with gzip.open(SAMPLE, 'rb') as f:
+        expected = list(read_sections(iter_slf_tokens(f)))
+    monkeypatch.setattr(activitylog, '_CHUNK', 5)
+    with gzip.open(SAMPLE, 'rb') as f:
+        assert list(read_sections(iter_slf_tokens(f))) == expected
+
+
+def test_truncated_string_is_an_error():
+    data = b'SLF0' + string('y' * (CHUNK + 10))
+    with pytest.raises(SLFError, match='ends inside a string'):
+        tokens(data[:-5])
+
+
+def test_truncated_section_is_an_error():
+    data = b'SLF0' + b'21%IDEActivityLogSection' + section('Build', 1.0, 2.0, 0)
+    with pytest.raises(SLFError, match='ends inside a section'):
+        list(read_sections(iter(tokens(data[:-len(b'0(')]))))
+
+
+def test_garbage_and_missing_header_are_errors():
+    with pytest.raises(SLFError, match='SLF0'):
+        tokens(b'PK\x03\x04')
+    with pytest.raises(SLFError, match='Unexpected'):
+        tokens(b'SLF012#zz')
+
+
+def test_sections_link_to_parents_through_subsection_counts():
+    data = (b'SLF0' + b'21%IDEActivityLogSection'
+            + section('root', 0, 9, 3)
+            + section('empty', 0, 1, 0)
+            + section('parent', 1, 5, 2)
+            + section('leaf a', 1, 2, 0)
+            + section('leaf b', 2, 5, 0)
+            + section('last', 5, 9, 0)
+            + section('second root', 10, 11, 0))
+    sections = list(read_sections(iter(tokens(data))))
+    links = [(s.title, s.parent, s.depth) for s in sections]
+    assert links == [
+        ('root', None, 0),
+        ('empty', 0, 1),
+        ('parent', 0, 1),
+        ('leaf a', 2, 2),
+        ('leaf b', 2, 2),
+        ('last', 0, 1),
+        ('second root', None, 0),
+    ]
+
+
+def test_sample_section_tree():
+    timeline = BuildTimeline.load(SAMPLE)
+    tree = [(s.index, s.parent, s.depth, s.children) for s in timeline.sections]
+    assert tree == [(0, None, 0, 3), (1, 0, 1, 3), (2, 1, 2, 0), (3, 1, 2, 0), (4, 1, 2, 0),
+                    (5, 0, 1, 0), (6, 0, 1, 3), (7, 6, 2, 0), (8, 6, 2, 0), (9, 6, 2, 0)]
+    # The idle target is a leaf but not a build step
+    assert [step.title for step in timeline.steps] == [
+        'Compile a.m', 'Compile b.m', 'Link Core',
+        'Run custom shell script [CP-User] [RNFB] Core Configuration', 'Compile main.m', 'Sign']
+    assert {timeline.target(step) for step in timeline.steps} == {'Pods-Core', 'MobileTodoList'}
+    assert timeline.wall_time == pytest.approx(60.0)
+
+
+def test_concurrency():
+    timeline = BuildTimeline.load(SAMPLE)
+    # Back-to-back steps (b.m -> Link at 12 s) do not count as overlapping
+    assert timeline.concurrency() == [(0.0, 2), (10.0, 1), (12.0, 1), (20.0, 1), (21.0, 2),
+                                      (25.0, 1), (58.0, 1), (60.0, 0)]
+
+
+def test_critical_path():
+    path = BuildTimeline.load(SAMPLE).critical_path()
+    assert [step.title for step in path] == [
+        'Compile b.m', 'Link Core', 'Run custom shell script [CP-User] [RNFB] Core Configuration', 'Sign']
+
+
+def test_serial_time_and_target_summary():
+    timeline = BuildTimeline.load(SAMPLE)
+    serial = timeline.serial_time()
+    assert serial['Pods-Core'] == pytest.approx(2.0 + 8.0)
+    assert serial['MobileTodoList'] == pytest.approx(1.0 + 33.0 + 2.0)
+    summary = {row['target']: row for row in timeline.target_summary()}
+    assert summary['Pods-Core'] == {'target': 'Pods-Core', 'start': 0.0, 'end': 20.0, 'wall': 20.0,
+                                    'busy': 30.0, 'steps': 3}
+
+
+def test_chrome_trace_lanes():
+    trace = BuildTimeline.load(SAMPLE).chrome_trace()
+    names = {event['pid']: event['args']['name'] for event in trace['traceEvents'] if event['ph'] == 'M'}
+    assert names == {1: 'Pods-Core', 2: 'MobileTodoList'}
+    lanes = {event['name']: (event['pid'], event['tid']) for event in trace['traceEvents']
+             if event['ph'] == 'X'}
+    assert lanes == {
+        'Compile a.m': (1, 1),
+        'Compile b.m': (1, 2),
+        # a.m's row is free again by the time the link starts
+        'Link Core': (1, 1),
+        'Run custom shell script [CP-User] [RNFB] Core Configuration': (2, 1),
+        'Compile main.m': (2, 2),
+        'Sign': (2, 1),
+    }
+    link = next(event for event in trace['traceEvents'] if event['name'] == 'Link Core')
+    assert (link['ts'], link['dur']) == (12_000_000, 8_000_000)
@@ -0,0 +1,102 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import pytest
+
+from xcode_audit import BuildLogTimings, parse_build_logs
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+MIDNIGHT = FIXTURES / 'xcodebuild-midnight.log'
+ISO = FIXTURES / 'xcodebuild-iso.log'
+
+CHECK_PODS = '[CP] Check Pods Manifest.lock'
+BUNDLE = 'Bundle React Native code and images'
+
+
+def steps_by_subject(timings: BuildLogTimings):
+    return {(step.kind, step.subject): step for step in timings.steps.values()}
+
+
+def test_charges_each_step_the_time_since_the_previous_task():
+    steps = steps_by_subject(parse_build_logs([MIDNIGHT]))
+    assert steps[('PhaseScriptExecution', CHECK_PODS)].seconds == pytest.approx(2.0)
+    assert steps[('CompileC', '/Users/ci/ios/MobileTodoList/main.m')].seconds == pytest.approx(3.0)
+    assert steps[('Ld', '/Users/ci/Build/Products/Debug-iphonesimulator/MobileTodoList.app/MobileTodoList')] \
+        .seconds == pytest.approx(2.5)
+    assert steps[('CodeSign', '/Users/ci/Build/Products/Debug-iphonesimulator/MobileTodoList.app')] \
+        .seconds == pytest.approx(0.5)
+
+
+def test_time_of_day_stamps_wrap_past_midnight():
+    steps = steps_by_subject(parse_build_logs([MIDNIGHT]))
+    # 23:59:55 -> 00:00:10
+    assert steps[('PhaseScriptExecution', BUNDLE)].seconds == pytest.approx(15.0)
+
+
+def test_script_phases_carry_their_object_id():
+    steps = steps_by_subject(parse_build_logs([MIDNIGHT]))
+    assert steps[('PhaseScriptExecution', CHECK_PODS)].phase_id == 'D7F4CF3820C676ABF9ADA414'
+    assert steps[('PhaseScriptExecution', BUNDLE)].phase_id == '00DD1BFF1BD5951E006B06BC'
+    assert steps[('CompileC', '/Users/ci/ios/MobileTodoList/main.m')].phase_id is None
+    assert steps[('PhaseScriptExecution', BUNDLE)].target == 'MobileTodoList'
+    assert steps[('PhaseScriptExecution', BUNDLE)].project == 'MobileTodoList'
+
+
+def test_first_task_of_a_log_starts_at_its_first_timestamp():
+    # Nothing before the first header marks when that task started
+    steps = steps_by_subject(parse_build_logs([ISO]))
+    assert steps[('PhaseScriptExecution', CHECK_PODS)].seconds == 0.0
+
+
+def test_iso_stamps_and_untracked_tasks_advance_the_clock():
+    steps = steps_by_subject(parse_build_logs([ISO]))
+    # WriteAuxiliaryFile is not recorded but still ends the previous step
+    assert ('WriteAuxiliaryFile', '/Users/ci/DerivedData/all-product-headers.yaml') not in steps
+    ld = steps[('Ld', '/Users/ci/Build/Products/Debug-iphonesimulator/MobileTodoList.app/MobileTodoList')]
+    assert ld.seconds == pytest.approx(3.0)
+
+
+def test_runs_count_every_task_and_builds_count_logs():
+    timings = parse_build_logs([ISO, MIDNIGHT])
+    steps = steps_by_subject(timings)
+    # Two architectures of main.m in the ISO log, one in the other
+    main = steps[('CompileC', '/Users/ci/ios/MobileTodoList/main.m')]
+    assert (main.runs, main.builds) == (3, 2)
+    assert main.seconds == pytest.approx(4.0 + 1.5 + 3.0)
+    assert main.per_build == pytest.approx(8.5 / 2)
+    check = steps[('PhaseScriptExecution', CHECK_PODS)]
+    assert (check.runs, check.builds) == (2, 2)
+    assert timings.builds == 2
+    assert timings.timed
+
+
+def test_build_timing_summary_totals():
+    timings = parse_build_logs([MIDNIGHT])
+    assert timings.summary['PhaseScriptExecution'] == [2, pytest.approx(17.0)]
+    assert timings.summary['CompileC'] == [1, pytest.approx(3.0)]
+    assert timings.summary['Ld'] == [1, pytest.approx(2.5)]
+
+
+def test_gzip_logs_match_plain_ones(tmp_path):
+    compressed = tmp_path / 'build.log.gz'
+    with open(MIDNIGHT, 'rb') as f, gzip.open(compressed, 'wb') as out:
+        shutil.copyfileobj(f, out)
+    plain = {key: step.to_dict() for key, step in parse_build_logs([MIDNIGHT]).steps.items()}
+    gz = {key: step.to_dict() for key, step in parse_build_logs([compressed]).steps.items()}
+    assert gz == plain
+
+
+def test_logs_without_timestamps_count_runs_only():
+    timings = BuildLogTimings()
+    with open(MIDNIGHT) as f:
+        timings.feed(line.split('] ', 1)[1] for line in f)
+    assert not timings.timed
+    assert all(step.seconds == 0.0 and step.runs == 1 for step in timings.steps.values())
+
+
+def test_slowest_orders_by_total_time():
+    slowest = parse_build_logs([MIDNIGHT]).slowest(limit=2)
+    assert [step.subject for step in slowest] == [BUNDLE, '/Users/ci/ios/MobileTodoList/main.m']
+    assert [step.subject for step in parse_build_logs([MIDNIGHT]).slowest('PhaseScriptExecution')] \
+        == [BUNDLE, CHECK_PODS]
@@ -0,0 +1,87 @@
+from xcode_audit import make_object, parse_flags, SettingsRuleSet
+
+DEDUPE = SettingsRuleSet.from_protocol([
+    {'id': 'BS001', 'setting': 'OTHER_LDFLAGS', 'dedupe': True},
+])
+
+
+def fixed(value, rule_set=DEDUPE, key='OTHER_LDFLAGS'):
+    edit = rule_set.check_value(key, value)
+    return None if edit is None else edit.fixed
+
+
+def repeated(value, rule_set=DEDUPE):
+    edit = rule_set.check_value('OTHER_LDFLAGS', value)
+    return [finding.values for finding in edit.findings if finding.kind == 'duplicate']
+
+
+def test_string_form_keeps_the_first_of_each_flag():
+    value = '$(inherited) -ObjC -lc++ -ObjC -lc++ -lz'
+    assert fixed(value) == '$(inherited) -ObjC -lc++ -lz'
+    assert repeated(value) == [('-ObjC', '-lc++')]
+
+
+def test_array_form_drops_repeated_elements_and_keeps_the_rest_verbatim():
+    assert fixed(['$(inherited)', '"-ObjC"', '-lc++', '-lc++', '"-ObjC"']) == \
+        ['$(inherited)', '"-ObjC"', '-lc++']
+    # Several flags in one element: only the changed element is rewritten
+    assert fixed(['-ObjC  -lc++', '-lz -lc++', ' ']) == ['-ObjC  -lc++', '-lz', ' ']
+    assert fixed(['-lc++', '-lc++ -lc++']) == ['-lc++']
+
+
+def test_framework_pairs_are_one_unit():
+    assert fixed('-framework UIKit -framework Foundation -framework UIKit') == \
+        '-framework UIKit -framework Foundation'
+    # A pair split over two array elements is dropped as a whole
+    assert fixed(['-framework', 'UIKit', '-framework', 'Foundation', '-framework', '"UIKit"']) == \
+        ['-framework', 'UIKit', '-framework', 'Foundation']
+    assert fixed('-framework UIKit -weak_framework UIKit') is None
+    assert [flag.key for flag in parse_flags(['-force_load "$(BUILT)/libA.a" -framework'])] == \
+        [('-force_load', '$(BUILT)/libA.a'), ('-framework',)]
+
+
+def test_quoting_and_commas_are_compared_the_way_xcodebuild_splits_them():
+    assert [flag.key for flag in parse_flags(['-Wl,-rpath,"@executable_path/My Frameworks" \'-DA=1,2\''])] == \
+        [('-Wl,-rpath,@executable_path/My Frameworks',), ('-DA=1,2',)]
+    value = '-Wl,-rpath,"@loader_path/a b" "-Wl,-rpath,@loader_path/a b" -DA="1,2" -DA=1,2'
+    assert fixed(value) == '-Wl,-rpath,"@loader_path/a b" -DA="1,2"'
+    # Commas inside a quoted array element are part of the one flag
+    assert fixed(['"-Wl,-u,_a,-u,_b"', '"-Wl,-u,_a,-u,_b"', '-Wl,-u,_a']) == ['"-Wl,-u,_a,-u,_b"', '-Wl,-u,_a']
+
+
+def test_references_and_pass_through_pairs_are_never_deduplicated():
+    assert fixed('$(OTHER_LINK) $(OTHER_LINK) ${EXTRA} ${EXTRA}') is None
+    assert fixed('-Xlinker -rpath -Xlinker @a -Xlinker -rpath -Xlinker @b') is None
+    assert fixed('$(inherited) -ObjC $(inherited)') == '$(inherited) -ObjC'
+
+
+def test_check_visits_each_setting_and_sdk_variant_of_a_configuration():
+    config = make_object('C1', {
+        'isa': 'XCBuildConfiguration',
+        'name': 'Release',
+        'buildSettings': {
+            'OTHER_LDFLAGS': ['$(inherited)', '-ObjC', '-ObjC'],
+            'OTHER_LDFLAGS[sdk=iphoneos*]': '-lc++ -lc++',
+            'OTHER_CFLAGS': '-DA -DA',
+        },
+    })
+    edits = {edit.key: edit.fixed for edit in DEDUPE.check(config)}
+    assert edits == {
+        'OTHER_LDFLAGS': ['$(inherited)', '-ObjC'],
+        'OTHER_LDFLAGS[sdk=iphoneos*]': '-lc++',
+    }
+
+
+def test_require_forbid_and_inherited_first_combine_with_dedupe():
+    rule_set = SettingsRuleSet.from_protocol([{
+        'id': 'BS009', 'setting': 'OTHER_LDFLAGS', 'dedupe': True, 'require': ['-ObjC'],
+        'forbid': ['-all_load'], 'inheritedFirst': True, 'configurations': ['Debug'],
+    }])
+    edit = rule_set.check_value('OTHER_LDFLAGS', '-lc++ -all_load $(inherited) -lc++', 'Debug')
+    assert edit.fixed == '$(inherited) -lc++ -ObjC'
+    assert [finding.kind for finding in edit.findings] == ['forbidden', 'duplicate', 'missing', 'order']
+    assert rule_set.check_value('OTHER_LDFLAGS', '-lc++ -lc++', 'Release') is None
+    # An unset setting is created from $(inherited)
+    config = make_object('C2', {'isa': 'XCBuildConfiguration', 'name': 'Debug', 'buildSettings': {}})
+    assert [(edit.key, edit.value, edit.fixed) for edit in rule_set.check(config)] == \
+        [('OTHER_LDFLAGS', None, ['$(inherited)', '-ObjC'])]
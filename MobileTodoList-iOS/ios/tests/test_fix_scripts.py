@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from xcode_audit.bench import _load_script
+
+SCRIPTS = [
+    ('fix_duplicate_lcxx', 'fix_duplicate_lc++.py', 'load_ldflags_rules'),
+    ('fix_build_phase_warnings', 'fix_build_phase_warnings.py', 'load_phase_rules'),
+]
+
+
+@pytest.fixture(params=SCRIPTS, ids=[filename for _, filename, _ in SCRIPTS])
+def script(request):
+    name, filename, loader = request.param
+    return _load_script(name, filename), loader
+
+
+@pytest.mark.parametrize('layout', [
+    'ios/App.xcodeproj/project.pbxproj',
+    'App.xcodeproj/project.pbxproj',
+    'apps/mobile/ios/App.xcodeproj/project.pbxproj',
+])
+def test_protocol_is_found_in_the_nearest_root_above_the_project(tmp_path, script, layout):
+    module, loader = script
+    protocol = tmp_path / '.vscode' / 'xcode-build-protocol.json'
+    protocol.parent.mkdir()
+    protocol.write_text(json.dumps({}))
+    pbxproj = tmp_path / layout
+    pbxproj.parent.mkdir(parents=True)
+    pbxproj.write_text('{}')
+    assert module.protocol_path(pbxproj) == protocol.resolve()
+    getattr(module, loader)(pbxproj)
+
+
+def test_missing_protocol_exits_with_an_error(tmp_path, script, capsys):
+    module, loader = script
+    pbxproj = tmp_path / 'ios' / 'App.xcodeproj' / 'project.pbxproj'
+    assert module.protocol_path(pbxproj) is None
+    with pytest.raises(SystemExit):
+        getattr(module, loader)(pbxproj)
+    assert 'xcode-build-protocol.json found above' in capsys.readouterr().out
@@ -0,0 +1,101 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from xcode_audit import Lockfile, LockfileError, parse_lockfile, PodDrift, pods_status
+
+PODFILE_LOCK = Path(__file__).resolve().parent / 'fixtures' / 'Podfile.lock'
+
+
+def test_nested_dependency_lists_parse_under_their_pod():
+    data = parse_lockfile(PODFILE_LOCK.read_text())
+    pods = data['PODS']
+    assert pods[0] == 'boost (1.84.0)'
+    assert {'hermes-engine (0.76.0)': ['hermes-engine/Pre-built (= 0.76.0)']} in pods
+    assert {'RCT-Folly/Default (2024.01.01.00)': ['boost', 'DoubleConversion', 'fmt (= 9.1.0)', 'glog']} in pods
+    # Quoted pod names and quoted dependencies lose their quotes
+    assert {'React-Core/Default (0.76.0)': ['glog', 'hermes-engine', 'RCT-Folly (= 2024.01.01.00)',
+                                           'React-cxxreact']} in pods
+    assert {'RNScreens (3.34.0)': ['React-Core', 'React-RCTImage']} in pods
+    assert data['DEPENDENCIES'][5] == \
+        'RNCAsyncStorage (from `../node_modules/@react-native-async-storage/async-storage`)'
+    assert data['SPEC REPOS'] == {'trunk': ['fmt', 'SocketRocket']}
+    assert data['EXTERNAL SOURCES']['hermes-engine'] == {
+        ':podspec': '../node_modules/react-native/sdks/hermes-engine/hermes-engine.podspec',
+        ':tag': 'hermes-2024-09-09-RNv0.76.0-db6d12e202e15f7a446d8848d6ca8f7abb3cfb32',
+    }
+
+
+def test_lockfile_reads_versions_and_checksums():
+    lockfile = Lockfile.load(PODFILE_LOCK)
+    assert lockfile.pods['React-Core/Default'] == '0.76.0'
+    assert lockfile.pods['RCT-Folly'] == '2024.01.01.00'
+    assert lockfile.pods['RNScreens'] == '3.34.0'
+    assert len(lockfile.pods) == 17
+    assert lockfile.checksums['boost'] == '1dca942403ed9342f98334bf4c3621f011aa7946'
+    assert len(lockfile.checksums) == 14
+    assert lockfile.podfile_checksum == '3b0f3b6a4f1e1b0d9f4c2a1e8b7d6c5a4f3e2d1c'
+    assert lockfile.cocoapods == '1.15.2'
+
+
+def test_quoted_scalars_and_keys():
+    data = parse_lockfile('''\
+PODS:
+  - 'It''s (1.0)'
+  - "Back\\\\slash \\"q\\" (2.0)":
+    - dep
+SPEC CHECKSUMS:
+  "Quoted: Pod": abc
+  :git: "https://example.com/a.git"
+''')
+    assert data['PODS'] == ["It's (1.0)", {'Back\\slash "q" (2.0)': ['dep']}]
+    assert data['SPEC CHECKSUMS'] == {'Quoted: Pod': 'abc', ':git': 'https://example.com/a.git'}
+
+
+@pytest.mark.parametrize('text, message', [
+    ('PODS:\n  - a\n just text\n', 'Unexpected indentation'),
+    ('PODS:\n  - a\nno colon here\n', "Expected 'key: value'"),
+    ('- a\n- b\n', 'not a mapping'),
+])
+def test_unsupported_yaml_raises(text, message):
+    with pytest.raises(LockfileError, match=message):
+        parse_lockfile(text)
+
+
+def test_fingerprint_covers_subspecs_through_their_podspec_checksum(tmp_path):
+    changed = tmp_path / 'Podfile.lock'
+    changed.write_text(PODFILE_LOCK.read_text().replace(
+        'React-Core: 8d2cb1b7c3e5f1a4b6b0e1e6c4e4f1d5a0c3d2e1', 'React-Core: 0000000000000000000000000000000000000000'))
+    assert Lockfile.load(PODFILE_LOCK).fingerprint() == Lockfile.load(PODFILE_LOCK).fingerprint()
+    assert Lockfile.load(changed).fingerprint() != Lockfile.load(PODFILE_LOCK).fingerprint()
+
+
+def test_pods_status_compares_podfile_lock_and_manifest(tmp_path):
+    podfile = tmp_path / 'Podfile'
+    podfile.write_text("platform :ios, '16.0'\n")
+    status = pods_status(podfile)
+    assert status.lockfile is None and status.install_needed
+
+    lock_text = PODFILE_LOCK.read_text().replace(
+        '3b0f3b6a4f1e1b0d9f4c2a1e8b7d6c5a4f3e2d1c', status.podfile_checksum)
+    (tmp_path / 'Podfile.lock').write_text(lock_text)
+    (tmp_path / 'Pods').mkdir()
+    shutil.copy(tmp_path / 'Podfile.lock', tmp_path / 'Pods' / 'Manifest.lock')
+    status = pods_status(podfile)
+    assert not status.podfile_changed and status.drift == [] and not status.install_needed
+
+    (tmp_path / 'Pods' / 'Manifest.lock').write_text(lock_text
+        .replace('RNScreens (3.34.0)', 'RNScreens (3.33.0)')
+        .replace('  - SocketRocket (0.7.1)\n', '')
+        .replace('boost: 1dca942403ed9342f98334bf4c3621f011aa7946', 'boost: 2dca942403ed9342f98334bf4c3621f011aa7946'))
+    status = pods_status(podfile)
+    assert status.drift == [
+        PodDrift('RNScreens', '3.34.0', '3.33.0', 'version'),
+        PodDrift('SocketRocket', '0.7.1', None, 'added'),
+        PodDrift('boost', '1.84.0', '1.84.0', 'checksum'),
+    ]
+    assert status.install_needed
+
+    podfile.write_text("platform :ios, '17.0'\n")
+    assert pods_status(podfile).podfile_changed
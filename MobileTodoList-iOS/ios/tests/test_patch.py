@@ -0,0 +1,64 @@
+from xcode_audit import PatchSet, PBXProject, set_array_field, set_string_field
+
+PROJECT = b'''// !$*UTF8*$!
+{
+	objects = {
+		B1 /* main.m in Sources */ = {isa = PBXBuildFile; fileRef = F1 /* main.m */; };
+		B2 /* Weak.framework */ = {isa = PBXBuildFile; fileRef = F2; settings = {ATTRIBUTES = (Weak, ); }; };
+		E1 = {isa = PBXBuildFile; settings = {}; };
+		P1 /* Bundle */ = {
+			isa = PBXShellScriptBuildPhase;
+			name = Bundle;
+			shellScript = "make";
+		};
+		P2 = {isa = PBXShellScriptBuildPhase; name = Inline; outputPaths = (); shellScript = "make"; };
+	};
+	rootObject = P1;
+}
+'''
+
+
+def patched(edit) -> bytes:
+    project = PBXProject(None, PROJECT)
+    patches = PatchSet(project.data)
+    edit(patches, project)
+    result = patches.apply()
+    # The result must still parse
+    PBXProject(None, result)
+    return result
+
+
+def test_multi_line_object_gets_an_indented_entry_in_key_order():
+    result = patched(lambda patches, project: set_array_field(patches, project, 'P1', 'outputPaths', ['$(DERIVED_FILE_DIR)/a']))
+    assert (b'\t\t\tname = Bundle;\n'
+            b'\t\t\toutputPaths = (\n'
+            b'\t\t\t\t"$(DERIVED_FILE_DIR)/a",\n'
+            b'\t\t\t);\n'
+            b'\t\t\tshellScript = "make";\n') in result
+
+
+def test_one_line_object_replaces_a_value_inline():
+    result = patched(lambda patches, project: set_array_field(patches, project, 'P2', 'outputPaths', ['a', 'b c']))
+    assert b'P2 = {isa = PBXShellScriptBuildPhase; name = Inline; outputPaths = (a, "b c", ); shellScript = "make"; };\n' \
+        in result
+
+
+def test_one_line_object_inserts_inline_in_key_order():
+    result = patched(lambda patches, project: set_string_field(patches, project, 'B1', 'productRef', 'R1'))
+    assert b'{isa = PBXBuildFile; fileRef = F1 /* main.m */; productRef = R1; };\n' in result
+    result = patched(lambda patches, project: set_string_field(patches, project, 'B1', 'abc', 'x'))
+    assert b'{isa = PBXBuildFile; abc = x; fileRef = F1 /* main.m */; };\n' in result
+
+
+def test_one_line_dictionary_within_a_field():
+    result = patched(lambda patches, project: set_array_field(
+        patches, project, 'B2', 'COMPILER_FLAGS', ['-w'], within='settings'))
+    assert b'settings = {ATTRIBUTES = (Weak, ); COMPILER_FLAGS = ("-w", ); }; };\n' in result
+
+
+def test_one_line_empty_dictionary():
+    result = patched(lambda patches, project: set_string_field(patches, project, 'E1', 'productRef', 'R9'))
+    assert b'E1 = {isa = PBXBuildFile; productRef = R9; settings = {}; };\n' in result
+    result = patched(lambda patches, project: set_array_field(
+        patches, project, 'E1', 'ATTRIBUTES', ['Weak'], within='settings'))
+    assert b'settings = {ATTRIBUTES = (Weak, ); }; };\n' in result
@@ -0,0 +1,170 @@
+from pathlib import Path
+
+import pytest
+
+from xcode_audit import load_projects, PBXParseError, PBXProject, quote
+from xcode_audit.pbxproj import _Parser
+
+APP_PBXPROJ = Path(__file__).resolve().parent.parent / 'MobileTodoList.xcodeproj' / 'project.pbxproj'
+
+PROJECT = b'''// !$*UTF8*$!
+{
+	archiveVersion = 1;
+	objects = {
+
+/* Begin PBXBuildFile section */
+		B1 /* main.m in Sources */ = {isa = PBXBuildFile; fileRef = F1 /* main.m */; };
+/* End PBXBuildFile section */
+
+		C1 /* Debug */ = {
+			isa = XCBuildConfiguration;
+			buildSettings = {
+				OTHER_LDFLAGS = (
+					"$(inherited)",
+					"-ObjC",
+				);
+				"PRODUCT_NAME[sdk=iphoneos*]" = "My App";
+			};
+			name = Debug;
+		};
+		F1 /* main.m */ = {isa = PBXFileReference; lastKnownFileType = sourcecode.c.objc; path = main.m; sourceTree = "<group>"; };
+		P1 /* Bundle */ = {
+			isa = PBXShellScriptBuildPhase;
+			name = "Bundle \\"React\\" code";
+			shellScript = "set -e\\n\\tWITH_ENVIRONMENT=\\"../x.sh\\"\\n\\\\ done";
+		};
+	};
+	rootObject = P1 /* Bundle */;
+}
+'''
+
+
+def parse(data: bytes) -> PBXProject:
+    return PBXProject(None, data)
+
+
+def decode(data: bytes, start: int, end: int):
+    parser = _Parser(data, start, end)
+    value = parser.parse_value()
+    parser.close()
+    return value
+
+
+def test_indexes_objects_by_id_and_isa_in_file_order():
+    project = parse(PROJECT)
+    assert list(project.index) == ['B1', 'C1', 'F1', 'P1']
+    assert project.isa('C1') == 'XCBuildConfiguration'
+    assert project.isa('missing') is None
+    assert [object_id for object_id, _ in project.objects_of('PBXShellScriptBuildPhase')] == ['P1']
+    assert project.root['archiveVersion'] == '1'
+    assert project.root['rootObject'] == 'P1'
+    assert bytes(project.raw('B1')).startswith(b'B1 /* main.m in Sources */ = {isa = PBXBuildFile;')
+    assert bytes(project.raw('B1')).endswith(b'};')
+
+
+def test_quoted_strings_are_unescaped_and_quote_round_trips_them():
+    phase = parse(PROJECT).objects['P1']
+    assert phase.name == 'Bundle "React" code'
+    assert phase.shellScript == 'set -e\n\tWITH_ENVIRONMENT="../x.sh"\n\\ done'
+    for text in (phase.name, phase.shellScript, 'main.m', '<group>', '$(inherited)', ''):
+        assert decode(quote(text).encode(), 0, None) == text
+    assert quote('sourcecode.c.objc') == 'sourcecode.c.objc'
+    assert quote('My App') == '"My App"'
+
+
+def test_field_spans_cover_each_field_and_its_value():
+    project = parse(PROJECT)
+    data = project.data
+    for object_id in project.index:
+        fields, close = project.field_spans(object_id)
+        assert data[close:close + 1] == b'}'
+        obj = project.objects[object_id]
+        assert set(fields) == set(obj.keys())
+        for key, span in fields.items():
+            assert data[span.key_start:span.value_start].rstrip(b' =') == quote(key).encode()
+            assert data[span.end - 1:span.end] == b';'
+            value = decode(data, span.value_start, span.value_end)
+            assert (key, value) == ('isa', obj.isa) or value == _plain(obj.get(key))
+
+
+def test_field_spans_within_a_dictionary_field():
+    project = parse(PROJECT)
+    data = project.data
+    fields, close = project.field_spans('C1', within='buildSettings')
+    assert list(fields) == ['OTHER_LDFLAGS', 'PRODUCT_NAME[sdk=iphoneos*]']
+    span = fields['OTHER_LDFLAGS']
+    assert decode(data, span.value_start, span.value_end) == ['$(inherited)', '-ObjC']
+    assert data[span.key_start:span.value_start].startswith(b'OTHER_LDFLAGS')
+    assert data[close:close + 2] == b'};'
+    # Splicing a span back with a new value leaves the rest intact
+    patched = data[:span.value_start] + b'(-lc++, )' + data[span.value_end:]
+    assert parse(patched).objects['C1'].buildSettings['OTHER_LDFLAGS'] == ('-lc++',)
+
+
+def test_objects_are_decoded_on_first_access_only():
+    project = parse(PROJECT)
+    assert project.objects._cache == {}
+    first = project.objects['F1']
+    assert list(project.objects._cache) == ['F1']
+    assert project.objects['F1'] is first
+    assert project.get('nope') is None
+    assert [obj.id for obj in project.resolve(['F1', 'dangling', 'B1'])] == ['F1', 'B1']
+
+
+def test_object_bodies_are_only_validated_when_decoded():
+    # The index pass only balances brackets, so a bad field surfaces on access
+    data = PROJECT.replace(b'name = Debug;', b'name = ;')
+    project = parse(data)
+    assert project.isa('C1') == 'XCBuildConfiguration'
+    with pytest.raises(PBXParseError):
+        project.objects['C1']
+
+
+@pytest.mark.parametrize('data, message', [
+    (PROJECT[:PROJECT.index(b'F1 /* main.m */ = {') + 30], 'Unterminated object'),
+    (PROJECT[:-3], "Expected"),
+    (PROJECT.replace(b'rootObject = P1', b'rootObject = "P1'), 'Unexpected character'),
+    (PROJECT.replace(b'{isa = PBXBuildFile; fileRef', b'{fileRef'), 'Object B1 has no isa'),
+    (PROJECT + b'}', 'Trailing data'),
+    (b'', 'Expected'),
+])
+def test_malformed_input_raises_parse_errors_with_an_offset(data, message):
+    with pytest.raises(PBXParseError, match=message) as error:
+        parse(data)
+    assert 0 <= error.value.offset <= len(data)
+
+
+def test_loads_the_app_project_through_mmap():
+    with PBXProject.load(APP_PBXPROJ) as project:
+        targets = [target.name for _, target in project.objects_of('PBXNativeTarget')]
+        assert 'MobileTodoList' in targets
+        root = project.objects[project.root['rootObject']]
+        assert root.isa == 'PBXProject'
+        assert set(root.targets) == {object_id for object_id, _ in project.objects_of('PBXNativeTarget')}
+        for object_id in project.index:
+            assert project.objects[object_id].isa == project.isa(object_id)
+    assert project.data.closed
+
+
+def test_parallel_and_serial_loads_build_the_same_index(tmp_path):
+    paths = []
+    for n in range(2):
+        path = tmp_path / f'p{n}.pbxproj'
+        path.write_bytes(PROJECT)
+        paths.append(path)
+    serial = load_projects(paths)
+    parallel = load_projects(paths, jobs=2)
+    for one, other in zip(serial, parallel):
+        assert one.export_index() == other.export_index()
+        assert one.objects['P1'].name == other.objects['P1'].name
+        one.close()
+        other.close()
+
+
+def _plain(value):
+    """Model values (tuples, interned strings) as the parser returns them"""
+    if isinstance(value, tuple):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
@@ -0,0 +1,59 @@
+import pytest
+
+from xcode_audit import PhaseRuleSet
+
+
+def rules(*specs):
+    return PhaseRuleSet.from_protocol([
+        dict(spec, id=f'BP{n:03}', requiredOutputs=[]) for n, spec in enumerate(specs, 1)
+    ])
+
+
+def rule_id(rule_set, name):
+    rule = rule_set.match(name)
+    return rule.id if rule is not None else None
+
+
+def test_exact_names_win_over_patterns_and_protocol_order_decides_among_patterns():
+    rule_set = rules(
+        {'scriptNamePattern': r'Pods'},
+        {'scriptNamePattern': r'\[CP.*\]'},
+        {'scriptName': '[CP] Check Pods Manifest.lock'},
+    )
+    assert rule_id(rule_set, '[CP] Check Pods Manifest.lock') == 'BP003'
+    assert rule_id(rule_set, '[CP] Embed Pods Frameworks') == 'BP001'
+    assert rule_id(rule_set, '[CP-User] [RNFB] Core Configuration') == 'BP002'
+    assert rule_id(rule_set, 'Bundle React Native code and images') is None
+
+
+def test_patterns_with_groups_and_backreferences_are_matched_alone():
+    rule_set = rules(
+        {'scriptNamePattern': r'Bundle'},
+        {'scriptNamePattern': r'(?P<tag>\w+) (?P=tag)'},
+        {'scriptNamePattern': r'(\w+)-\1'},
+        {'scriptNamePattern': r'(?P<tag>CP)'},
+        {'scriptNamePattern': r'Copy'},
+    )
+    assert rule_id(rule_set, 'Bundle React Native code and images') == 'BP001'
+    assert rule_id(rule_set, 'echo echo') == 'BP002'
+    assert rule_id(rule_set, 'xyz-xyz') == 'BP003'
+    assert rule_id(rule_set, 'xyz-abc') is None
+    assert rule_id(rule_set, '[CP] Copy Pods Resources') == 'BP004'
+    assert rule_id(rule_set, 'Copy Files') == 'BP005'
+
+
+def test_patterns_with_inline_global_flags_are_matched_alone():
+    rule_set = rules(
+        {'scriptNamePattern': r'Bundle'},
+        {'scriptNamePattern': r'(?i)\[cp.*\]'},
+        {'scriptNamePattern': r'Copy'},
+    )
+    assert rule_id(rule_set, '[CP] Copy Pods Resources') == 'BP002'
+    assert rule_id(rule_set, 'Copy Files') == 'BP003'
+    assert rule_id(rule_set, 'bundle') is None
+    assert rule_id(rules({'scriptNamePattern': r'(?i)\[cp.*\]'}), '[cp-user] x') == 'BP001'
+
+
+def test_invalid_pattern_names_its_rule():
+    with pytest.raises(ValueError, match='BP002'):
+        rules({'scriptNamePattern': r'ok'}, {'scriptNamePattern': r'(unclosed'})
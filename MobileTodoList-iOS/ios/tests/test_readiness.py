@@ -0,0 +1,149 @@
+import pytest
+
+from xcode_audit import (
+    ALWAYS_RUN, BROKEN, DEPENDENCY_TRACKED, PBXProject, read_file_list, ReadinessAnalyzer, SettingsResolver,
+    UNRESOLVED,
+)
+
+PROJECT = b'''// !$*UTF8*$!
+{
+	objects = {
+		R1 = {isa = PBXProject; targets = (T1, ); };
+		T1 = {
+			isa = PBXNativeTarget;
+			buildConfigurationList = L1;
+			buildPhases = (S1, S2, S3, S4, S5, S6, S7, S8, S9, );
+			name = App;
+		};
+		L1 = {isa = XCConfigurationList; buildConfigurations = (TD, TR, ); };
+		TD = {isa = XCBuildConfiguration; buildSettings = {}; name = Debug; };
+		TR = {isa = XCBuildConfiguration; buildSettings = {PODS_ROOT = "$(SRCROOT)/Pods"; }; name = Release; };
+		S1 = {
+			isa = PBXShellScriptBuildPhase;
+			inputPaths = ("$(SRCROOT)/index.js", );
+			name = "Bundle React Native code and images";
+			outputPaths = ("$(DERIVED_FILE_DIR)/main.jsbundle", );
+		};
+		S2 = {isa = PBXShellScriptBuildPhase; name = "Upload Symbols"; };
+		S3 = {
+			isa = PBXShellScriptBuildPhase;
+			alwaysOutOfDate = 1;
+			inputPaths = (a, );
+			name = Stamp;
+			outputPaths = (b, );
+		};
+		S4 = {isa = PBXShellScriptBuildPhase; inputPaths = (a, ); name = Empty; outputPaths = ( ); };
+		S5 = {isa = PBXShellScriptBuildPhase; name = Generate; outputPaths = (b, ); };
+		S6 = {
+			isa = PBXShellScriptBuildPhase;
+			inputFileListPaths = ("${SRCROOT}/lists/in-${CONFIGURATION}.xcfilelist", );
+			name = "[CP] Embed Pods Frameworks";
+			outputFileListPaths = ("${SRCROOT}/lists/out-${CONFIGURATION}.xcfilelist", );
+		};
+		S7 = {
+			isa = PBXShellScriptBuildPhase;
+			inputFileListPaths = ("${SRCROOT}/lists/in-${CONFIGURATION}.xcfilelist", );
+			name = "[CP] Copy Pods Resources";
+			outputFileListPaths = ("${SRCROOT}/lists/resources-${CONFIGURATION}.xcfilelist", );
+		};
+		S8 = {
+			isa = PBXShellScriptBuildPhase;
+			inputPaths = (a, );
+			name = "[CP] Check Pods Manifest.lock";
+			outputFileListPaths = ("${PODS_ROOT}/out.xcfilelist", );
+		};
+		S9 = {
+			isa = PBXShellScriptBuildPhase;
+			inputPaths = (a, );
+			name = "[CP-User] Config";
+			outputFileListPaths = ("${PODS_ROOT}/missing.xcfilelist", );
+		};
+	};
+	rootObject = R1;
+}
+'''
+
+
+@pytest.fixture
+def readiness(tmp_path):
+    lists = tmp_path / 'lists'
+    lists.mkdir()
+    (lists / 'in-Debug.xcfilelist').write_text('# inputs\n${PODS_ROOT}/a\n\n${PODS_ROOT}/b\n')
+    (lists / 'in-Release.xcfilelist').write_text('${PODS_ROOT}/a\n')
+    (lists / 'out-Debug.xcfilelist').write_text('${BUILT_PRODUCTS_DIR}/a\n')
+    (lists / 'out-Release.xcfilelist').write_text('${BUILT_PRODUCTS_DIR}/a\n')
+    (lists / 'resources-Debug.xcfilelist').write_text('# generated by pod install\n')
+    (tmp_path / 'Pods').mkdir()
+    (tmp_path / 'Pods' / 'out.xcfilelist').write_text('${BUILT_PRODUCTS_DIR}/a\n')
+    analyzer = ReadinessAnalyzer(SettingsResolver(PBXProject(None, PROJECT), tmp_path))
+    targets = analyzer.targets()
+    assert [target.name for target in targets] == ['App']
+    return targets[0]
+
+
+def phase(target, name):
+    return next(phase for phase in target.phases if phase.name == name)
+
+
+def kinds(target, name):
+    return [finding.kind for finding in phase(target, name).findings]
+
+
+def test_file_lists_skip_comments_and_blank_lines(tmp_path):
+    path = tmp_path / 'a.xcfilelist'
+    path.write_text('# header\n  $(SRCROOT)/a  \n\n#x\nb\n')
+    assert read_file_list(path) == ['$(SRCROOT)/a', 'b']
+    assert read_file_list(tmp_path / 'missing.xcfilelist') is None
+
+
+def test_phases_with_inputs_and_outputs_are_dependency_tracked(readiness):
+    bundle = phase(readiness, 'Bundle React Native code and images')
+    assert (bundle.status, bundle.findings, bundle.inputs, bundle.outputs) == (DEPENDENCY_TRACKED, [], 1, 1)
+    # File list entries count for the configuration that lists the most
+    embed = phase(readiness, '[CP] Embed Pods Frameworks')
+    assert (embed.status, embed.inputs, embed.outputs) == (DEPENDENCY_TRACKED, 2, 1)
+
+
+@pytest.mark.parametrize('name, kind', [
+    ('Upload Symbols', 'no_outputs'),
+    ('Stamp', 'always_out_of_date'),
+    ('Empty', 'empty_outputs'),
+    ('Generate', 'no_inputs'),
+])
+def test_phases_without_usable_outputs_or_inputs_always_run(readiness, name, kind):
+    assert phase(readiness, name).status == ALWAYS_RUN
+    assert kinds(readiness, name) == [kind]
+
+
+def test_missing_or_empty_file_lists_break_the_phase(readiness):
+    resources = phase(readiness, '[CP] Copy Pods Resources')
+    assert resources.status == BROKEN
+    assert [(finding.kind, finding.detail) for finding in resources.findings] == [
+        ('filelist_missing', '${SRCROOT}/lists/resources-${CONFIGURATION}.xcfilelist for Release'),
+        ('filelist_empty', '${SRCROOT}/lists/resources-${CONFIGURATION}.xcfilelist for Debug'),
+    ]
+
+
+def test_unexpandable_file_lists_are_unresolved(readiness):
+    manifest = phase(readiness, '[CP] Check Pods Manifest.lock')
+    assert manifest.status == UNRESOLVED
+    assert [(finding.kind, finding.detail) for finding in manifest.findings] == [
+        ('unresolved', '${PODS_ROOT}/out.xcfilelist for Debug'),
+    ]
+    assert manifest.outputs == 1
+
+
+def test_every_configuration_is_checked_after_an_unresolved_one(readiness):
+    # Debug cannot expand PODS_ROOT; Release can and the list is missing
+    config = phase(readiness, '[CP-User] Config')
+    assert config.status == BROKEN
+    assert [(finding.kind, finding.detail) for finding in config.findings] == [
+        ('unresolved', '${PODS_ROOT}/missing.xcfilelist for Debug'),
+        ('filelist_missing', '${PODS_ROOT}/missing.xcfilelist for Release'),
+    ]
+
+
+def test_target_summary_counts_each_status(readiness):
+    summary = readiness.summary()
+    assert (summary['script_phases'], summary['dependency_tracked'], summary['always_run'],
+            summary['broken'], summary['unresolved'], summary['ready']) == (9, 2, 4, 2, 1, False)
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from xcode_audit import SourceScanner
+
+SOURCE = Path('Bridge.mm')
+
+
+def scanner(*specs):
+    return SourceScanner.from_protocol([
+        dict(spec, id=f'CC{n:03}') for n, spec in enumerate(specs, 1)
+    ])
+
+
+def hits(source_scanner, data):
+    return [(match.rule.id, match.line, match.column, match.text)
+            for match in source_scanner.scan(SOURCE, data)]
+
+
+def test_literals_and_plain_regexes_share_one_pass():
+    source_scanner = scanner(
+        {'literal': 'CallSeq'},
+        {'literal': 'CallSeqFactory'},
+        {'regex': r'RCT_EXPORT_\w+'},
+    )
+    data = b'auto f = CallSeqFactory();\nRCT_EXPORT_MODULE()\n'
+    assert hits(source_scanner, data) == [
+        ('CC002', 1, 10, b'CallSeqFactory'),
+        ('CC001', 1, 10, b'CallSeq'),
+        ('CC003', 2, 1, b'RCT_EXPORT_MODULE'),
+    ]
+
+
+def test_regexes_with_backreferences_and_named_groups_are_searched_alone():
+    source_scanner = scanner(
+        {'literal': 'jsi::'},
+        {'regex': r'(\w+) = \1;'},
+        {'regex': r'(?P<q>["\']).*?(?P=q)'},
+        {'regex': r'(?P<q>#import)'},
+    )
+    data = b'#import "A.h"\nx = x;\nusing jsi::Value;\ny = z;\n'
+    assert hits(source_scanner, data) == [
+        ('CC004', 1, 1, b'#import'),
+        ('CC003', 1, 9, b'"A.h"'),
+        ('CC002', 2, 1, b'x = x;'),
+        ('CC001', 3, 7, b'jsi::'),
+    ]
+
+
+def test_only_grouped_regexes():
+    source_scanner = scanner({'regex': r'(a)\1'})
+    assert hits(source_scanner, b'abaab\naa') == [('CC001', 1, 3, b'aa'), ('CC001', 2, 1, b'aa')]
+
+
+def test_regexes_with_inline_global_flags_are_searched_alone():
+    source_scanner = scanner({'literal': 'Factory'}, {'regex': r'(?i)callseq'})
+    assert hits(source_scanner, b'CallSeqFactory\ncallseq') == [
+        ('CC002', 1, 1, b'CallSeq'),
+        ('CC001', 1, 8, b'Factory'),
+        ('CC002', 2, 1, b'callseq'),
+    ]
+    assert hits(scanner({'regex': r'(?i)callseq'}), b'x CALLSEQ') == [('CC001', 1, 3, b'CALLSEQ')]
+
+
+def test_invalid_regex_names_its_rule():
+    with pytest.raises(ValueError, match='CC002'):
+        scanner({'literal': 'ok'}, {'regex': r'(unclosed'})
@@ -0,0 +1,153 @@
+import pytest
+
+from xcode_audit import FixTransaction, PatchConflictError, set_array_field, set_string_field
+from xcode_audit import transaction as transaction_module
+from xcode_auditor import XcodeAuditor
+
+PROJECT = b'''// !$*UTF8*$!
+{
+	objects = {
+		P1 = {
+			isa = PBXShellScriptBuildPhase;
+			name = Bundle;
+			shellScript = "make";
+		};
+	};
+	rootObject = P1;
+}
+'''
+
+
+@pytest.fixture
+def files(tmp_path):
+    pbxproj = tmp_path / 'ios' / 'App.xcodeproj' / 'project.pbxproj'
+    pbxproj.parent.mkdir(parents=True)
+    pbxproj.write_bytes(PROJECT)
+    source = tmp_path / 'ios' / 'Bridge.mm'
+    source.write_bytes(b'CallSeqFactory();\n')
+    return pbxproj, source
+
+
+def leftovers(directory):
+    return sorted(path.name for path in directory.rglob('.*.tmp'))
+
+
+def test_edits_from_several_fixers_are_written_once_per_file(files):
+    pbxproj, source = files
+    backups = []
+    with FixTransaction() as transaction:
+        project = transaction.project(pbxproj)
+        set_array_field(transaction.patches(pbxproj), project, 'P1', 'outputPaths', ['$(DERIVED_FILE_DIR)/a'])
+        set_string_field(transaction.patches(pbxproj), project, 'P1', 'name', 'Bundle JS')
+        transaction.replace(source, transaction.read(source).replace(b'CallSeqFactory', b'invokeAsync'))
+        assert transaction.read(source) == b'invokeAsync();\n'
+        assert sorted(transaction.changed()) == sorted([pbxproj, source])
+        written = transaction.commit(backup=backups.append)
+
+    assert sorted(written) == sorted([pbxproj, source])
+    assert sorted(backups) == sorted([pbxproj, source])
+    text = pbxproj.read_bytes()
+    assert b'name = "Bundle JS";' in text
+    assert b'outputPaths = (\n\t\t\t\t"$(DERIVED_FILE_DIR)/a",\n\t\t\t);' in text
+    assert source.read_bytes() == b'invokeAsync();\n'
+    assert leftovers(pbxproj.parent.parent) == []
+
+
+def test_nothing_to_commit_writes_nothing(files):
+    pbxproj, _ = files
+    backups = []
+    with FixTransaction() as transaction:
+        transaction.patches(pbxproj)
+        assert transaction.commit(backup=backups.append) == []
+    assert backups == []
+    assert pbxproj.read_bytes() == PROJECT
+
+
+def test_overlapping_patches_are_rejected_before_anything_is_touched(files):
+    pbxproj, source = files
+    backups = []
+    with FixTransaction() as transaction:
+        project = transaction.project(pbxproj)
+        transaction.replace(source, b'rewritten\n')
+        # Two fixers rewriting the same value
+        set_string_field(transaction.patches(pbxproj), project, 'P1', 'shellScript', 'make a')
+        set_string_field(transaction.patches(pbxproj), project, 'P1', 'shellScript', 'make b')
+        with pytest.raises(PatchConflictError):
+            transaction.commit(backup=backups.append)
+    assert backups == []
+    assert pbxproj.read_bytes() == PROJECT
+    assert source.read_bytes() == b'CallSeqFactory();\n'
+
+
+def test_whole_file_rewrite_cannot_join_a_patched_file(files):
+    pbxproj, _ = files
+    with FixTransaction() as transaction:
+        transaction.patches(pbxproj)
+        with pytest.raises(ValueError):
+            transaction.replace(pbxproj, b'')
+
+
+def test_failed_staging_leaves_every_file_unchanged(files, monkeypatch):
+    pbxproj, source = files
+    real_stage = transaction_module.stage_file
+
+    def stage_file(path, chunks):
+        if path == source:
+            raise OSError(28, 'No space left on device')
+        return real_stage(path, chunks)
+
+    monkeypatch.setattr(transaction_module, 'stage_file', stage_file)
+    with FixTransaction() as transaction:
+        project = transaction.project(pbxproj)
+        set_array_field(transaction.patches(pbxproj), project, 'P1', 'outputPaths', ['a'])
+        transaction.replace(source, b'rewritten\n')
+        with pytest.raises(OSError):
+            transaction.commit()
+    assert pbxproj.read_bytes() == PROJECT
+    assert source.read_bytes() == b'CallSeqFactory();\n'
+    assert leftovers(pbxproj.parent.parent) == []
+
+
+def test_failed_rename_removes_the_remaining_staged_files(files, monkeypatch):
+    pbxproj, source = files
+    real_replace = transaction_module.os.replace
+
+    def replace(tmp_path, path):
+        if path == source:
+            raise OSError(13, 'Permission denied')
+        real_replace(tmp_path, path)
+
+    monkeypatch.setattr(transaction_module.os, 'replace', replace)
+    with FixTransaction() as transaction:
+        project = transaction.project(pbxproj)
+        set_string_field(transaction.patches(pbxproj), project, 'P1', 'name', 'Renamed')
+        transaction.replace(source, b'rewritten\n')
+        with pytest.raises(OSError):
+            transaction.commit()
+    # Files already renamed stay fully rewritten, the rest stay as they were
+    assert b'name = Renamed;' in pbxproj.read_bytes()
+    assert source.read_bytes() == b'CallSeqFactory();\n'
+    assert leftovers(pbxproj.parent.parent) == []
+
+
+@pytest.mark.parametrize('enabled', [True, False])
+def test_auditor_backs_up_only_when_backup_before_fix_is_set(tmp_path, files, enabled):
+    pbxproj, source = files
+    protocol = {'automationRules': {'backupBeforeFix': enabled}}
+    auditor = XcodeAuditor(str(tmp_path), str(tmp_path / 'protocol.json'), protocol=protocol)
+    auditor.parse_cache = None
+    transaction = auditor.fix_transaction()
+    project = transaction.project(pbxproj)
+    set_array_field(transaction.patches(pbxproj), project, 'P1', 'outputPaths', ['a'])
+    transaction.replace(source, b'rewritten\n')
+    assert sorted(auditor.commit_fixes(transaction)) == sorted([pbxproj, source])
+    for project in auditor._projects.values():
+        project.close()
+
+    backup = auditor.backup_dir / 'ios'
+    if enabled:
+        assert (backup / 'App.xcodeproj' / 'project.pbxproj').read_bytes() == PROJECT
+        assert (backup / 'Bridge.mm').read_bytes() == b'CallSeqFactory();\n'
+    else:
+        assert not auditor.backup_dir.exists()
+    assert source.read_bytes() == b'rewritten\n'
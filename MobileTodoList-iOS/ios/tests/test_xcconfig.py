@@ -0,0 +1,120 @@
+import pytest
+
+from xcode_audit import PBXProject, SettingsResolver, split_setting_key
+
+PROJECT = b'''// !$*UTF8*$!
+{
+	objects = {
+		R1 = {isa = PBXProject; buildConfigurationList = L0; targets = (T1, ); };
+		L0 = {isa = XCConfigurationList; buildConfigurations = (PD, PR, ); };
+		PD = {isa = XCBuildConfiguration; buildSettings = {OTHER_LDFLAGS = "-lproject"; }; name = Debug; };
+		PR = {isa = XCBuildConfiguration; buildSettings = {OTHER_LDFLAGS = "-lproject"; }; name = Release; };
+		T1 = {isa = PBXNativeTarget; buildConfigurationList = L1; name = App; };
+		L1 = {isa = XCConfigurationList; buildConfigurations = (TD, TR, ); };
+		TD = {
+			isa = XCBuildConfiguration;
+			baseConfigurationReference = X1;
+			buildSettings = {
+				OTHER_LDFLAGS = (
+					"$(inherited)",
+					"-lc++",
+				);
+				"OTHER_LDFLAGS[config=Release]" = "-lnever";
+				LOOP_A = "$(LOOP_B)";
+				LOOP_B = "x $(LOOP_A)";
+			};
+			name = Debug;
+		};
+		TR = {isa = XCBuildConfiguration; buildSettings = {OTHER_LDFLAGS = "$(inherited) -lrelease"; }; name = Release; };
+		X1 = {isa = PBXFileReference; path = "Pods/App.debug.xcconfig"; sourceTree = SOURCE_ROOT; };
+	};
+	rootObject = R1;
+}
+'''
+
+APP_XCCONFIG = '''\
+#include "Shared.xcconfig"
+#include? "Missing.xcconfig"
+#include <DEVELOPER_DIR/Platform.xcconfig>
+OTHER_LDFLAGS = $(inherited) -ObjC // linked by CocoaPods
+OTHER_LDFLAGS[sdk=iphonesimulator*] = $(inherited) -lsimulator
+OTHER_LDFLAGS[sdk=iphoneos*][arch=arm64] = $(inherited) -ldevice;
+HEADER_SEARCH_PATHS = $(inherited) "${PODS_ROOT}/Headers/Public"
+'''
+
+SHARED_XCCONFIG = '''\
+// Includes its includer back: the cycle is cut, not followed
+#include "App.debug.xcconfig"
+PODS_ROOT = ${SRCROOT}/Pods
+OTHER_LDFLAGS = -lshared
+'''
+
+
+@pytest.fixture
+def project_dir(tmp_path):
+    pods = tmp_path / 'Pods'
+    pods.mkdir()
+    (pods / 'App.debug.xcconfig').write_text(APP_XCCONFIG)
+    (pods / 'Shared.xcconfig').write_text(SHARED_XCCONFIG)
+    return tmp_path
+
+
+def resolver(project_dir, **kwargs):
+    return SettingsResolver(PBXProject(None, PROJECT), project_dir, **kwargs)
+
+
+def test_setting_keys_split_into_name_and_conditions():
+    assert split_setting_key('OTHER_LDFLAGS') == ('OTHER_LDFLAGS', ())
+    assert split_setting_key('OTHER_LDFLAGS[sdk=iphoneos*][config=Debug,arch=arm64]') == \
+        ('OTHER_LDFLAGS', (('sdk', 'iphoneos*'), ('config', 'Debug'), ('arch', 'arm64')))
+
+
+def test_includes_are_inlined_and_cycles_and_missing_files_are_skipped(project_dir):
+    settings_resolver = resolver(project_dir)
+    assignments = settings_resolver.read_xcconfig(project_dir / 'Pods' / 'App.debug.xcconfig')
+    assert [(a.setting, a.conditions, a.value) for a in assignments] == [
+        ('PODS_ROOT', (), '${SRCROOT}/Pods'),
+        ('OTHER_LDFLAGS', (), '-lshared'),
+        ('OTHER_LDFLAGS', (), '$(inherited) -ObjC'),
+        ('OTHER_LDFLAGS', (('sdk', 'iphonesimulator*'),), '$(inherited) -lsimulator'),
+        ('OTHER_LDFLAGS', (('sdk', 'iphoneos*'), ('arch', 'arm64')), '$(inherited) -ldevice'),
+        ('HEADER_SEARCH_PATHS', (), '$(inherited) "${PODS_ROOT}/Headers/Public"'),
+    ]
+    settings_resolver.read_xcconfig(project_dir / 'Pods' / 'App.debug.xcconfig')
+    assert settings_resolver.files_read == 2
+
+
+def test_inherited_stacks_project_then_xcconfig_then_target_settings(project_dir):
+    settings_resolver = resolver(project_dir)
+    # The xcconfig's unconditioned -lshared replaces the project's value
+    assert settings_resolver.raw('T1', 'Debug', 'OTHER_LDFLAGS') == '-lshared -ObjC -ldevice -lc++'
+    assert settings_resolver.raw('T1', 'Release', 'OTHER_LDFLAGS') == '-lproject -lrelease'
+    assert settings_resolver.raw('R1', 'Debug', 'OTHER_LDFLAGS') == '-lproject'
+    assert settings_resolver.raw('T1', 'Debug', 'UNSET') is None
+
+
+@pytest.mark.parametrize('sdk, arch, expected', [
+    ('iphoneos', 'arm64', '-lshared -ObjC -ldevice -lc++'),
+    ('iphoneos', 'armv7', '-lshared -ObjC -lc++'),
+    ('iphonesimulator17.0', 'arm64', '-lshared -ObjC -lsimulator -lc++'),
+])
+def test_conditional_settings_follow_the_sdk_and_arch(project_dir, sdk, arch, expected):
+    assert resolver(project_dir, sdk=sdk, arch=arch).resolve('T1', 'Debug', 'OTHER_LDFLAGS') == expected
+
+
+def test_references_expand_through_builtins_and_stop_at_cycles(project_dir):
+    settings_resolver = resolver(project_dir)
+    assert settings_resolver.resolve('T1', 'Debug', 'HEADER_SEARCH_PATHS') == \
+        f'"{project_dir}/Pods/Headers/Public"'
+    assert settings_resolver.expand('T1', 'Debug', '$(TARGET_NAME:lower)-$(CONFIGURATION)$(EFFECTIVE_PLATFORM_NAME)') == \
+        'app-Debug-iphoneos'
+    assert settings_resolver.expand('T1', 'Debug', '$(NOT_A_SETTING)/x') == '$(NOT_A_SETTING)/x'
+    assert settings_resolver.resolve('T1', 'Debug', 'LOOP_A') == 'x $(LOOP_A)'
+
+
+def test_effective_reports_every_target_and_configuration(project_dir):
+    rows = resolver(project_dir).effective(['OTHER_LDFLAGS'])
+    assert [(row['target'], row['configuration'], row['settings']['OTHER_LDFLAGS']) for row in rows] == [
+        ('App', 'Debug', '-lshared -ObjC -ldevice -lc++'),
+        ('App', 'Release', '-lproject -lrelease'),
+    ]
@@ -0,0 +1,101 @@
+"""
+Shared building blocks for xcode_auditor.py and the standalone fix scripts.
+"""
+
+from .activitylog import BuildTimeline, iter_slf_tokens, LogSection, read_sections, SLFError
+from .buildlog import BuildLogTimings, parse_build_logs, STEP_KINDS, StepTiming
+from .buildsettings import Flag, parse_flags, SettingEdit, SettingFinding, SettingRule, SettingsRuleSet
+from .cache import ParseCache
+from .graph import ProjectGraph
+from .instrument import Instrumentation, Span
+from .lockfile import Lockfile, LockfileError, parse_lockfile, PodDrift, pods_status, PodsStatus
+from .manifest import ScanManifest, rules_hash
+from .model import MODEL_CLASSES, PBXObject, PBXShellScriptBuildPhase, make_object
+from .patch import (
+    Patch, PatchConflictError, PatchSet, set_array_field, set_string_field, write_atomic,
+)
+from .phaserules import PhaseRule, PhaseRuleSet
+from .pbxproj import FieldSpan, load_projects, PBXParseError, PBXProject, quote
+from .readiness import (
+    ALWAYS_RUN, BROKEN, DEPENDENCY_TRACKED, PhaseFinding, PhaseReadiness, read_file_list,
+    ReadinessAnalyzer, TargetReadiness, UNRESOLVED,
+)
+from .scanner import SourceMatch, SourceRule, SourceScanner
+from .scope import AuditScope, diff_objects, GitScopeError
+from .transaction import FixTransaction
+from .walk import DEFAULT_IGNORE, SourceWalker
+from .watch import InotifyWatcher, open_watcher, PollingWatcher, wait_for_changes
+from .workspace import workspace_projects
+from .xcconfig import SettingsResolver, split_setting_key
+
+__all__ = [
+    'ALWAYS_RUN',
+    'AuditScope',
+    'BROKEN',
+    'BuildLogTimings',
+    'BuildTimeline',
+    'DEFAULT_IGNORE',
+    'DEPENDENCY_TRACKED',
+    'diff_objects',
+    'FieldSpan',
+    'FixTransaction',
+    'Flag',
+    'GitScopeError',
+    'InotifyWatcher',
+    'Instrumentation',
+    'iter_slf_tokens',
+    'load_projects',
+    'Lockfile',
+    'LockfileError',
+    'LogSection',
+    'make_object',
+    'MODEL_CLASSES',
+    'open_watcher',
+    'parse_build_logs',
+    'parse_flags',
+    'parse_lockfile',
+    'ParseCache',
+    'Patch',
+    'PatchConflictError',
+    'PatchSet',
+    'PBXObject',
+    'PBXParseError',
+    'PBXProject',
+    'PBXShellScriptBuildPhase',
+    'PhaseFinding',
+    'PhaseReadiness',
+    'PhaseRule',
+    'PhaseRuleSet',
+    'PodDrift',
+    'pods_status',
+    'PodsStatus',
+    'PollingWatcher',
+    'ProjectGraph',
+    'quote',
+    'read_file_list',
+    'read_sections',
+    'ReadinessAnalyzer',
+    'rules_hash',
+    'ScanManifest',
+    'set_array_field',
+    'set_string_field',
+    'SettingEdit',
+    'SettingFinding',
+    'SettingRule',
+    'SettingsResolver',
+    'SettingsRuleSet',
+    'SLFError',
+    'SourceMatch',
+    'SourceRule',
+    'SourceScanner',
+    'SourceWalker',
+    'Span',
+    'split_setting_key',
+    'STEP_KINDS',
+    'StepTiming',
+    'TargetReadiness',
+    'UNRESOLVED',
+    'wait_for_changes',
+    'workspace_projects',
+    'write_atomic',
+]
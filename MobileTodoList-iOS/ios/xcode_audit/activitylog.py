@@ -0,0 +1,330 @@
+"""
+Build timelines from Xcode's .xcactivitylog files.
+
+DerivedData/<project>/Logs/Build/*.xcactivitylog is a gzip-compressed SLF
+stream: `SLF0` followed by tokens written as an optional prefix and a type
+character,
+
+    12#      integer 12               -        null
+    5"hello  string of 5 bytes        3(       list of 3 items
+    21%Name  class name, 21 bytes     1@       instance of class 1
+    <hex>^   little-endian double     4*data   JSON blob of 4 bytes
+
+Class names are numbered from 1 in the order they first appear. Every
+IDEActivityLog*Section instance starts with the same fields:
+
+    sectionType#, domainType", title", signature", timeStartedRecording^,
+    timeStoppedRecording^, subSections(
+
+where times are seconds since 2001-01-01 and subSections are sections
+again. The remaining fields (log text, messages, ...) vary by Xcode version
+and are skipped, so a section's children are counted off its subSections
+list instead of parsing every field: a new section belongs to the nearest
+open section that still expects children.
+
+The file is decompressed and tokenized in chunks; only the section headers
+are kept. From them the timeline gives per-target spans, the concurrency of
+leaf steps over time, a critical path inferred from timing (each step's
+predecessor is the one that finished last before it started, since the log
+records no dependency edges), and Chrome trace JSON for chrome://tracing or
+Perfetto.
+"""
+
+import bisect
+import gzip
+import re
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+_TOKEN_RE = re.compile(rb'([0-9a-f]*)([#%@"^(*-])')
+_CHUNK = 1 << 16
+_MAX_PREFIX = 32
+_TARGET_TITLE_RE = re.compile(r'Build target (.+?)(?: of project .*)?$')
+_TARGET_DOMAIN = 'IDEActivityLogDomainType.target'
+_IN_TARGET_RE = re.compile(r"\(in target '([^']+)'")
+
+Token = Tuple[str, object]
+
+
+class SLFError(ValueError):
+    """Raised when a file is not a valid SLF stream"""
+
+
+def iter_slf_tokens(stream: BinaryIO) -> Iterator[Token]:
+    """(type character, value) for each token of a decompressed SLF stream"""
+    buffer = b''
+    pos = 0
+    eof = False
+
+    def fill(needed: int) -> None:
+        nonlocal buffer, pos, eof
+        buffer = buffer[pos:]
+        pos = 0
+        while not eof and len(buffer) < needed:
+            chunk = stream.read(max(_CHUNK, needed - len(buffer)))
+            if not chunk:
+                eof = True
+            buffer += chunk
+
+    fill(4)
+    if not buffer.startswith(b'SLF0'):
+        raise SLFError("Not an SLF stream (missing SLF0 header)")
+    pos = 4
+
+    while True:
+        match = _TOKEN_RE.match(buffer, pos)
+        if match is None:
+            if not eof and len(buffer) - pos < _MAX_PREFIX:
+                fill(len(buffer) - pos + _MAX_PREFIX)
+                continue
+            if pos == len(buffer):
+                return
+            raise SLFError(f"Unexpected {buffer[pos:pos + 16]!r} in SLF stream")
+
+        prefix, kind = match.group(1), match.group(2).decode()
+        pos = match.end()
+        if kind in '"%*':
+            length = int(prefix or 0)
+            if len(buffer) - pos < length:
+                fill(length)
+                if len(buffer) < length:
+                    raise SLFError("SLF stream ends inside a string")
+            value = buffer[pos:pos + length].decode('utf-8', 'replace')
+            pos += length
+            yield kind, value
+        elif kind == '^':
+            try:
+                yield kind, struct.unpack('<d', bytes.fromhex(prefix.decode()))[0]
+            except (ValueError, struct.error):
+                raise SLFError(f"Bad double {prefix!r} in SLF stream")
+        elif kind == '-':
+            yield kind, None
+        else:
+            # '#' integer, '(' list length, '@' class reference
+            yield kind, int(prefix or 0)
+
+
+class LogSection(NamedTuple):
+    """The header fields of one IDEActivityLogSection"""
+    index: int
+    parent: Optional[int]
+    depth: int
+    title: str
+    signature: str
+    domain: str
+    start: float
+    end: float
+    children: int
+
+    @property
+    def duration(self) -> float:
+        return max(self.end - self.start, 0.0)
+
+    @property
+    def kind(self) -> str:
+        """Build step kind, the first word of the signature (CompileC, Ld, ...)"""
+        return (self.signature or self.title).split(' ', 1)[0]
+
+
+def _read(tokens: Iterator[Token], kinds: str):
+    try:
+        kind, value = next(tokens)
+    except StopIteration:
+        raise SLFError("SLF stream ends inside a section")
+    if kind not in kinds:
+        raise SLFError(f"Expected one of {kinds!r} in a section header, got {kind!r}")
+    return value
+
+
+def read_sections(tokens: Iterator[Token]) -> Iterator[LogSection]:
+    """Section headers in log order, each linked to its parent section"""
+    tokens = iter(tokens)
+    classes: List[str] = []
+    # [section index, depth, children still expected]
+    open_sections: List[List[int]] = []
+    index = 0
+    for kind, value in tokens:
+        if kind == '%':
+            classes.append(value)
+            continue
+        if kind != '@' or not 0 < value <= len(classes) or not classes[value - 1].endswith('Section'):
+            continue
+
+        _read(tokens, '#')
+        domain = _read(tokens, '"-') or ''
+        title = _read(tokens, '"-') or ''
+        signature = _read(tokens, '"-') or ''
+        start = _read(tokens, '^#')
+        end = _read(tokens, '^#')
+        children = _read(tokens, '(-') or 0
+
+        while open_sections and open_sections[-1][2] == 0:
+            open_sections.pop()
+        parent = None
+        depth = 0
+        if open_sections:
+            parent, depth = open_sections[-1][0], open_sections[-1][1] + 1
+            open_sections[-1][2] -= 1
+        yield LogSection(index, parent, depth, title, signature, domain,
+                         float(start), float(end), children)
+        open_sections.append([index, depth, children])
+        index += 1
+
+
+def _open_log(path: Path) -> BinaryIO:
+    with open(path, 'rb') as f:
+        magic = f.read(2)
+    return gzip.open(path, 'rb') if magic == b'\x1f\x8b' else open(path, 'rb')
+
+
+class BuildTimeline:
+    """Sections of one build log with timeline, concurrency and critical path"""
+
+    def __init__(self, sections: List[LogSection]):
+        self.sections = sections
+        self.targets: Dict[int, Optional[str]] = {}
+        for section in sections:
+            self.targets[section.index] = self._target_of(section)
+        # Leaf sections are the build steps; a target with nothing to do is a
+        # leaf too but not a step
+        self.steps = [section for section in sections
+                      if section.children == 0 and section.depth > 0 and section.start > 0
+                      and section.end >= section.start and _TARGET_DOMAIN not in section.domain]
+        self.origin = min((step.start for step in self.steps), default=0.0)
+
+    @classmethod
+    def load(cls, path: Path) -> 'BuildTimeline':
+        """Decode a .xcactivitylog (gzip SLF, or already decompressed)"""
+        with _open_log(Path(path)) as stream:
+            return cls(list(read_sections(iter_slf_tokens(stream))))
+
+    def _target_of(self, section: LogSection) -> Optional[str]:
+        found = _IN_TARGET_RE.search(section.title) or _IN_TARGET_RE.search(section.signature)
+        if found:
+            return found.group(1)
+        if _TARGET_DOMAIN in section.domain:
+            titled = _TARGET_TITLE_RE.match(section.title)
+            if titled:
+                return titled.group(1)
+        return self.targets.get(section.parent) if section.parent is not None else None
+
+    def target(self, step: LogSection) -> str:
+        return self.targets.get(step.index) or '(no target)'
+
+    @property
+    def wall_time(self) -> float:
+        if not self.steps:
+            return 0.0
+        return max(step.end for step in self.steps) - self.origin
+
+    def concurrency(self) -> List[Tuple[float, int]]:
+        """(seconds since start, steps running) at every change"""
+        events = []
+        for step in self.steps:
+            events.append((step.start, 1))
+            events.append((step.end, -1))
+        # Ends before starts at the same instant, so back-to-back steps don't overlap
+        events.sort(key=lambda event: (event[0], event[1]))
+        changes: List[Tuple[float, int]] = []
+        running = 0
+        for time, delta in events:
+            running += delta
+            offset = time - self.origin
+            if changes and changes[-1][0] == offset:
+                changes[-1] = (offset, running)
+            else:
+                changes.append((offset, running))
+        return changes
+
+    def serial_time(self) -> Dict[str, float]:
+        """Per target, the time it had the only running step"""
+        serial: Dict[str, float] = {}
+        events = sorted([(step.start, 1, step.index) for step in self.steps] +
+                        [(step.end, -1, step.index) for step in self.steps],
+                        key=lambda event: (event[0], event[1]))
+        running = set()
+        last = None
+        for time, delta, index in events:
+            if last is not None and len(running) == 1:
+                only = next(iter(running))
+                target = self.targets.get(only) or '(no target)'
+                serial[target] = serial.get(target, 0.0) + time - last
+            if delta > 0:
+                running.add(index)
+            else:
+                running.discard(index)
+            last = time
+        return serial
+
+    def critical_path(self) -> List[LogSection]:
+        """Chain ending at the last step to finish, each preceded by the step
+        that finished last at or before its start"""
+        if not self.steps:
+            return []
+        by_end = sorted(self.steps, key=lambda step: step.end)
+        ends = [step.end for step in by_end]
+        position = len(by_end) - 1
+        path = [by_end[position]]
+        while True:
+            # Latest step (before this one in end order) that had finished when it started
+            position = bisect.bisect_right(ends, path[-1].start, 0, position)
+            if position == 0:
+                break
+            position -= 1
+            path.append(by_end[position])
+        path.reverse()
+        return path
+
+    def target_summary(self) -> List[Dict]:
+        """Per target: span, summed step time and step count, by start time"""
+        spans: Dict[str, Dict] = {}
+        for step in self.steps:
+            name = self.target(step)
+            span = spans.setdefault(name, {'target': name, 'start': step.start, 'end': step.end,
+                                           'busy': 0.0, 'steps': 0})
+            span['start'] = min(span['start'], step.start)
+            span['end'] = max(span['end'], step.end)
+            span['busy'] += step.duration
+            span['steps'] += 1
+        rows = []
+        for span in sorted(spans.values(), key=lambda span: span['start']):
+            rows.append({
+                'target': span['target'],
+                'start': round(span['start'] - self.origin, 3),
+                'end': round(span['end'] - self.origin, 3),
+                'wall': round(span['end'] - span['start'], 3),
+                'busy': round(span['busy'], 3),
+                'steps': span['steps'],
+            })
+        return rows
+
+    def chrome_trace(self) -> Dict:
+        """Trace Event Format: one process per target, one row per overlapping step"""
+        events = []
+        pids: Dict[str, int] = {}
+        lanes: Dict[str, List[float]] = {}
+        for step in sorted(self.steps, key=lambda step: (step.start, step.end)):
+            name = self.target(step)
+            if name not in pids:
+                pids[name] = len(pids) + 1
+                events.append({'name': 'process_name', 'ph': 'M', 'pid': pids[name],
+                               'args': {'name': name}})
+            # First row free by the time this step starts
+            rows = lanes.setdefault(name, [])
+            lane = next((i for i, free_at in enumerate(rows) if free_at <= step.start), len(rows))
+            if lane == len(rows):
+                rows.append(step.end)
+            else:
+                rows[lane] = step.end
+            events.append({
+                'name': step.title or step.signature,
+                'cat': step.kind,
+                'ph': 'X',
+                'ts': round((step.start - self.origin) * 1e6),
+                'dur': round(step.duration * 1e6),
+                'pid': pids[name],
+                'tid': lane + 1,
+                'args': {'signature': step.signature},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
@@ -0,0 +1,242 @@
+"""
+Benchmarks for the auditor and fix scripts on synthetic projects.
+
+For each size (a synthetic.PRESETS name) a throwaway project root is
+generated and these stages are measured:
+
+    parse           PBXProject.load plus decoding every object
+    audit           XcodeAuditor build-phase and build-setting checks
+    fix:auditor     XcodeAuditor fix_build_phases + fix_build_settings, one transaction
+    fix:phases      fix_build_phase_warnings.fix_build_phases
+    fix:ldflags     fix_duplicate_lc++.fix_duplicate_lc_plusplus
+    write           PatchSet.write of the OTHER_LDFLAGS dedupe alone
+
+Fix stages start from a fresh copy of the generated file each run and
+include the fixer's own read, backup and write. Time is the best of
+--repeat untraced runs; peak memory comes from one more run under
+tracemalloc, which would otherwise slow the timed runs down.
+
+Results are compared with a stored baseline (per size and stage); a stage
+slower or larger than the baseline by more than --tolerance (and by more
+than a small absolute margin, so millisecond stages don't flap) is a
+regression and the exit status is 1. Baselines are machine specific:
+record one with --update-baseline on the machine that runs the checks.
+Without a baseline to compare against the run fails (exit status 2), so a
+check that lost its baseline cannot pass silently.
+
+Usage:
+  python3 -m xcode_audit.bench --sizes app,medium
+  python3 -m xcode_audit.bench --sizes app,medium,pods --baseline xcode-bench-baseline.json
+  python3 -m xcode_audit.bench --sizes app,medium,pods --update-baseline
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from .membench import measure
+from .patch import PatchSet, set_array_field, set_string_field
+from .pbxproj import PBXProject
+from .synthetic import PRESETS, write_project
+
+IOS_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_PROTOCOL = IOS_DIR.parent / '.vscode' / 'xcode-build-protocol.json'
+
+# Absolute slack below which a difference is noise
+MIN_SECONDS = 0.05
+MIN_BYTES = 1 << 20
+
+
+def _load_script(name: str, filename: str):
+    """Import one of the ios/ fix scripts as a module"""
+    spec = importlib.util.spec_from_file_location(name, IOS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Bench:
+    """Stages for one generated project root"""
+
+    def __init__(self, root: Path, pbxproj: Path, protocol: Path):
+        if str(IOS_DIR) not in sys.path:
+            sys.path.insert(0, str(IOS_DIR))
+        import xcode_auditor
+        self.auditor_module = xcode_auditor
+        self.phase_fixer = _load_script('fix_build_phase_warnings', 'fix_build_phase_warnings.py')
+        self.ldflags_fixer = _load_script('fix_duplicate_lcxx', 'fix_duplicate_lc++.py')
+        self.root = root
+        self.pbxproj = pbxproj
+        self.protocol = protocol
+        self.pristine = pbxproj.read_bytes()
+
+    def reset(self) -> None:
+        """Restore the generated file and drop fixer backups"""
+        self.pbxproj.write_bytes(self.pristine)
+        for backup in self.pbxproj.parent.glob('project.pbxproj.backup_*'):
+            backup.unlink()
+        shutil.rmtree(self.root / '.xcode_backup', ignore_errors=True)
+
+    def auditor(self):
+        auditor = self.auditor_module.XcodeAuditor(str(self.root), str(self.protocol))
+        auditor.parse_cache = None
+        auditor.use_manifest = False
+        auditor.protocol.setdefault('automationRules', {})['backupBeforeFix'] = False
+        return auditor
+
+    def parse(self):
+        project = PBXProject.load(self.pbxproj)
+        for _ in project.objects.values():
+            pass
+        return project
+
+    def audit(self):
+        auditor = self.auditor()
+        return auditor.audit_build_phases() + auditor.audit_build_settings()
+
+    def fix_auditor(self):
+        auditor = self.auditor()
+        transaction = auditor.fix_transaction()
+        changed = auditor.fix_build_phases(transaction), auditor.fix_build_settings(transaction)
+        auditor.commit_fixes(transaction)
+        return changed
+
+    def fix_phases(self):
+        return self.phase_fixer.fix_build_phases(str(self.pbxproj))
+
+    def fix_ldflags(self):
+        return self.ldflags_fixer.fix_duplicate_lc_plusplus(str(self.pbxproj))
+
+    def ldflags_patches(self) -> PatchSet:
+        # From a copy: reset() rewrites the file the fixers work on
+        source = self.pbxproj.with_name('project.pbxproj.src')
+        source.write_bytes(self.pristine)
+        project = PBXProject.load(source)
+        patches = PatchSet(project.data)
+        rules = self.ldflags_fixer.load_ldflags_rules(self.pbxproj)
+        for config_id, config in project.objects_of('XCBuildConfiguration'):
+            for edit in rules.check(config):
+                setter = set_string_field if isinstance(edit.fixed, str) else set_array_field
+                setter(patches, project, config_id, edit.key, edit.fixed, within='buildSettings')
+        return patches
+
+    def stages(self) -> Dict[str, Callable[[], object]]:
+        patches = self.ldflags_patches()
+        output = self.pbxproj.with_name('project.pbxproj.out')
+        return {
+            'parse': self.parse,
+            'audit': self.audit,
+            'fix:auditor': self.fix_auditor,
+            'fix:phases': self.fix_phases,
+            'fix:ldflags': self.fix_ldflags,
+            'write': lambda: patches.write(output),
+        }
+
+
+def run_stage(bench: Bench, stage: Callable[[], object], repeat: int) -> Dict[str, float]:
+    best = None
+    # Fixers print progress; only the numbers matter here
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            bench.reset()
+            started = time.perf_counter()
+            stage()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        bench.reset()
+        _, peak = measure(stage)
+    return {'seconds': round(best, 4), 'peak_bytes': peak}
+
+
+def run_size(size: str, protocol: Path, repeat: int, workdir: Path) -> Dict:
+    root = workdir / size
+    (root / '.vscode').mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(protocol, root / '.vscode' / 'xcode-build-protocol.json')
+    (root / 'package.json').write_text('{}\n')
+    pbxproj = write_project(root / 'ios', PRESETS[size], name='Synthetic')
+
+    bench = Bench(root, pbxproj, root / '.vscode' / 'xcode-build-protocol.json')
+    result = {'file_bytes': pbxproj.stat().st_size, 'shape': PRESETS[size]._asdict(), 'stages': {}}
+    for name, stage in bench.stages().items():
+        result['stages'][name] = run_stage(bench, stage, repeat)
+        timing = result['stages'][name]
+        print(f"  {size:<8} {name:<12} {timing['seconds']:9.3f}s  {timing['peak_bytes'] / 1e6:8.1f} MB peak",
+              flush=True)
+    return result
+
+
+def regressions(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Stages slower or larger than the baseline beyond tolerance"""
+    found = []
+    for size, result in results.items():
+        for stage, timing in result['stages'].items():
+            before = baseline.get(size, {}).get('stages', {}).get(stage)
+            if before is None:
+                continue
+            seconds, base_seconds = timing['seconds'], before['seconds']
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > MIN_SECONDS:
+                found.append(f"{size} {stage}: {seconds:.3f}s vs {base_seconds:.3f}s baseline")
+            peak, base_peak = timing['peak_bytes'], before['peak_bytes']
+            if peak > base_peak * (1 + tolerance) and peak - base_peak > MIN_BYTES:
+                found.append(f"{size} {stage}: {peak / 1e6:.1f} MB vs {base_peak / 1e6:.1f} MB baseline")
+    return found
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m xcode_audit.bench',
+                                     description='Benchmark the auditor and fixers on synthetic projects')
+    parser.add_argument('--sizes', default='app,medium',
+                        help=f"Comma-separated presets ({', '.join(PRESETS)}; default: app,medium)")
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage, best kept (default: 3)')
+    parser.add_argument('--protocol', default=str(DEFAULT_PROTOCOL))
+    parser.add_argument('--baseline', default='xcode-bench-baseline.json')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store these results as the baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown or growth over the baseline (default: 0.25)')
+    parser.add_argument('--output', help='Also write the results as JSON')
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown = [size for size in sizes if size not in PRESETS]
+    if unknown:
+        print(f"Unknown sizes: {', '.join(unknown)}")
+        return 2
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='xcode-bench-') as workdir:
+        for size in sizes:
+            results[size] = run_size(size, Path(args.protocol), max(args.repeat, 1), Path(workdir))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2) + '\n')
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to record one")
+        return 2
+
+    found = regressions(results, json.loads(baseline_path.read_text()), args.tolerance)
+    for line in found:
+        print(f"REGRESSION {line}")
+    if not found:
+        print(f"No regressions against {baseline_path} (tolerance {args.tolerance:.0%})")
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,199 @@
+"""
+Wall time per build step from saved plain xcodebuild logs.
+
+xcodebuild prints one block per task, headed by a line such as
+
+    PhaseScriptExecution Bundle\\ React\\ Native\\ code\\ and\\ images /.../Script-00DD1BFF1BD5951E006B06BC.sh (in target 'MobileTodoList' from project 'MobileTodoList')
+    CompileC /.../main.o /.../main.m normal arm64 objective-c com.apple.compilers.llvm.clang.1_0.compiler (in target 'MobileTodoList' from project 'MobileTodoList')
+
+PhaseScriptExecution, CompileC, CompileSwift / SwiftCompile, Ld and CodeSign
+steps are recorded per target; the script path of a PhaseScriptExecution
+carries the phase's object ID, so timings join back to the pbxproj.
+
+Plain logs carry no times of their own. When lines are timestamped (CI
+prefixes such as `2024-05-01T12:00:00.123Z`, or `ts`-style `[12:00:00]`),
+each step is charged the time since the previous task's header: xcodebuild
+prints a block once its task finishes, so that is exact for serialized steps
+(script phases, Ld, CodeSign) and an upper bound for compiles that ran in
+parallel. The first task of a log is charged the time since the log's first
+timestamped line, so it gets 0 s when its header is the first stamped line
+(CI logs usually start with the invocation, which it then includes). A
+`-showBuildTimingSummary` section is read for per-kind totals.
+
+Logs are read line by line (gzip-compressed ones too) and only per-step
+aggregates are kept, so memory does not grow with the size of the log.
+"""
+
+import gzip
+import re
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+STEP_KINDS = ('PhaseScriptExecution', 'CompileC', 'CompileSwift', 'SwiftCompile', 'Ld', 'CodeSign')
+
+_TIMESTAMP_RE = re.compile(
+    r'\[?(?:(\d{4})-(\d\d)-(\d\d)[T ])?(\d\d):(\d\d):(\d\d(?:\.\d+)?)(?:Z|[+-]\d\d:?\d\d)?\]?\s')
+_TASK_RE = re.compile(
+    r'([A-Z][A-Za-z]+) (.*?)\s*\(in target(?:: |\s+\')([^\')]+)\'?(?: from project \'([^\']+)\')?\)\s*$')
+_ARG_RE = re.compile(r'(?:\\.|[^\s\\])+')
+_UNESCAPE_RE = re.compile(r'\\(.)')
+_SCRIPT_ID_RE = re.compile(r'Script-([0-9A-F]{24})\.sh$')
+_SUMMARY_RE = re.compile(r'(\w+) \((\d+) tasks?\) \| ([\d.]+) seconds')
+
+
+def _arguments(text: str) -> List[str]:
+    return [_UNESCAPE_RE.sub(r'\1', arg) for arg in _ARG_RE.findall(text)]
+
+
+def _timestamp(match: re.Match) -> float:
+    year, month, day, hours, minutes, seconds = match.groups()
+    value = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    if year is not None:
+        value += date(int(year), int(month), int(day)).toordinal() * 86400
+    return value
+
+
+def _subject(kind: str, args: List[str]) -> Tuple[str, Optional[str]]:
+    """What a step works on (phase name, source file, product) and its phase ID"""
+    if kind == 'PhaseScriptExecution':
+        script = _SCRIPT_ID_RE.search(args[1]) if len(args) > 1 else None
+        return (args[0] if args else ''), (script.group(1) if script else None)
+    if kind == 'CompileC':
+        return (args[1] if len(args) > 1 else ''), None
+    if kind in ('CompileSwift', 'SwiftCompile'):
+        # `normal arm64 <file>`, or no file for a whole-module/batch job
+        return (args[2] if len(args) > 2 else '(whole module)'), None
+    return (args[0] if args else ''), None
+
+
+class StepTiming:
+    """Aggregated runs of one step (kind, target, subject) across logs"""
+
+    __slots__ = ('kind', 'target', 'project', 'subject', 'phase_id',
+                 'runs', 'builds', 'seconds', '_last_build')
+
+    def __init__(self, kind: str, target: str, project: Optional[str],
+                 subject: str, phase_id: Optional[str]):
+        self.kind = kind
+        self.target = target
+        self.project = project
+        self.subject = subject
+        self.phase_id = phase_id
+        self.runs = 0
+        self.builds = 0
+        self.seconds = 0.0
+        self._last_build = -1
+
+    @property
+    def per_build(self) -> float:
+        return self.seconds / self.builds if self.builds else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'kind': self.kind,
+            'target': self.target,
+            'project': self.project,
+            'subject': self.subject,
+            'phase_id': self.phase_id,
+            'runs': self.runs,
+            'builds': self.builds,
+            'seconds': round(self.seconds, 3),
+            'seconds_per_build': round(self.per_build, 3),
+        }
+
+
+class BuildLogTimings:
+    """Per-step timings accumulated over one or more xcodebuild logs"""
+
+    def __init__(self):
+        self.steps: Dict[Tuple[str, str, str], StepTiming] = {}
+        self.summary: Dict[str, List[float]] = {}  # kind -> [tasks, seconds]
+        self.builds = 0
+        self.lines = 0
+        self.timed = False
+
+    def add_log(self, path: Path) -> None:
+        """Parse one saved log (plain or .gz); each log counts as one build"""
+        path = Path(path)
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+            self.feed(f)
+
+    def feed(self, lines: Iterable[str]) -> None:
+        build = self.builds
+        self.builds += 1
+        clock: Optional[float] = None
+        previous: Optional[float] = None
+        in_summary = False
+
+        for line in lines:
+            self.lines += 1
+            now = None
+            stamp = _TIMESTAMP_RE.match(line)
+            if stamp is not None:
+                now = _timestamp(stamp)
+                if previous is not None and now < previous and stamp.group(1) is None:
+                    now += 86400  # time-of-day stamps past midnight
+                previous = now
+                line = line[stamp.end():]
+                if clock is None:
+                    clock = now
+
+            if in_summary:
+                summary = _SUMMARY_RE.match(line)
+                if summary is not None:
+                    totals = self.summary.setdefault(summary.group(1), [0, 0.0])
+                    totals[0] += int(summary.group(2))
+                    totals[1] += float(summary.group(3))
+                    continue
+            if line.startswith('Build Timing Summary'):
+                in_summary = True
+                continue
+            if not line[:1].isupper() or '(in target' not in line:
+                continue
+
+            task = _TASK_RE.match(line)
+            if task is None:
+                continue
+            # Every task advances the clock, tracked kind or not
+            elapsed = None
+            if now is not None:
+                elapsed = max(now - clock, 0.0)
+                clock = now
+            kind, rest, target, project = task.groups()
+            if kind not in STEP_KINDS:
+                continue
+            subject, phase_id = _subject(kind, _arguments(rest))
+            key = (kind, target, subject)
+            step = self.steps.get(key)
+            if step is None:
+                step = self.steps[key] = StepTiming(kind, target, project, subject, phase_id)
+            step.runs += 1
+            if step._last_build != build:
+                step._last_build = build
+                step.builds += 1
+            if elapsed is not None:
+                step.seconds += elapsed
+                self.timed = True
+
+    def slowest(self, kind: Optional[str] = None, limit: Optional[int] = None) -> List[StepTiming]:
+        """Steps by total time (then by runs), optionally of one kind"""
+        steps = [step for step in self.steps.values() if kind is None or step.kind == kind]
+        steps.sort(key=lambda step: (-step.seconds, -step.runs, step.target, step.subject))
+        return steps[:limit] if limit is not None else steps
+
+    def by_target(self) -> Dict[str, Dict[str, float]]:
+        """Target -> step kind -> total seconds"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for step in self.steps.values():
+            kinds = totals.setdefault(step.target, {})
+            kinds[step.kind] = kinds.get(step.kind, 0.0) + step.seconds
+        return totals
+
+
+def parse_build_logs(paths: Iterable[Path]) -> BuildLogTimings:
+    timings = BuildLogTimings()
+    for path in paths:
+        timings.add_log(path)
+    return timings
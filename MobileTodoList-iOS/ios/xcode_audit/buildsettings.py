@@ -0,0 +1,271 @@
+"""
+Protocol-driven rules over XCBuildConfiguration build settings.
+
+`buildSettingsConfiguration.rules` entries name a setting and what to
+enforce on it:
+
+    dedupe          drop repeated flags, keeping the first occurrence
+    require         values that must be present (appended when missing)
+    forbid          values that must not be present
+    inheritedFirst  move $(inherited) to the front, other flags keep their order
+
+A setting may be written as a string (`"$(inherited) -ObjC -lc++"`) or an
+array whose elements hold one or more flags. Both are split the way
+xcodebuild splits them, honouring quotes and backslashes, and flags that
+take an argument (`-framework UIKit`) are treated as one unit. Only
+elements that actually change are rewritten, in the form they were found.
+
+References to other settings (`$(OTHER_CFLAGS)`) are never removed since
+their expansion is unknown here; `$(inherited)` itself is kept once.
+"""
+
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .model import XCBuildConfiguration
+
+SettingValue = Union[str, List[str]]
+
+INHERITED = '$(inherited)'
+
+# Flags whose meaning includes the following argument
+PAIRED_FLAGS = frozenset((
+    '-framework', '-weak_framework', '-force_load',
+    '-Xcc', '-Xfrontend', '-Xlinker',
+))
+
+# Pass-through prefixes: `-Xlinker -rpath -Xlinker @x -Xlinker -rpath ...`
+# legitimately repeats a pair, so these are never deduplicated
+_POSITIONAL = frozenset(('-Xcc', '-Xfrontend', '-Xlinker'))
+
+_FLAG_RE = re.compile(r'''(?:[^\s"'\\]|\\.|"(?:[^"\\]|\\.)*"?|'[^']*'?)+''', re.DOTALL)
+_SHELL_QUOTE_RE = re.compile(r'''\\(.)|"((?:[^"\\]|\\.)*)"?|'([^']*)'?''', re.DOTALL)
+_DQ_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+
+
+def _shell_unquote(token: str) -> str:
+    def replace(match: re.Match) -> str:
+        if match.group(1) is not None:
+            return match.group(1)
+        if match.group(2) is not None:
+            return _DQ_ESCAPE_RE.sub(r'\1', match.group(2))
+        return match.group(3)
+    return _SHELL_QUOTE_RE.sub(replace, token)
+
+
+class Flag(NamedTuple):
+    """One flag unit: its words as xcodebuild sees them and the raw text
+
+    `element` and `last` are the array elements the unit was read from
+    (a pair may span two), or None for values added by a rule.
+    """
+    key: Tuple[str, ...]
+    text: str
+    element: Optional[int]
+    last: Optional[int]
+
+
+def parse_flags(values: Sequence[str]) -> List[Flag]:
+    """Split setting values into flag units, remembering where each came from"""
+    flags: List[Flag] = []
+    pending: Optional[Tuple[str, str, int]] = None
+    for index, value in enumerate(values):
+        for token in _FLAG_RE.findall(value):
+            word = _shell_unquote(token)
+            if pending is not None:
+                flag, text, element = pending
+                flags.append(Flag((flag, word), f"{text} {token}", element, index))
+                pending = None
+            elif word in PAIRED_FLAGS:
+                pending = (word, token, index)
+            else:
+                flags.append(Flag((word,), token, index, index))
+    if pending is not None:
+        flag, text, element = pending
+        flags.append(Flag((flag,), text, element, element))
+    return flags
+
+
+def _is_reference(flag: Flag) -> bool:
+    return flag.key != (INHERITED,) and any('$(' in word or '${' in word for word in flag.key)
+
+
+class SettingRule(NamedTuple):
+    id: str
+    setting: str
+    dedupe: bool
+    require: Tuple[str, ...]
+    forbid: Tuple[str, ...]
+    inherited_first: bool
+    configurations: Tuple[str, ...]
+    severity: str
+    description: str
+
+    @classmethod
+    def from_protocol(cls, spec: Dict) -> 'SettingRule':
+        return cls(
+            id=spec['id'],
+            setting=spec['setting'],
+            dedupe=bool(spec.get('dedupe', False)),
+            require=tuple(spec.get('require', ())),
+            forbid=tuple(spec.get('forbid', ())),
+            inherited_first=bool(spec.get('inheritedFirst', False)),
+            configurations=tuple(spec.get('configurations', ())),
+            severity=spec.get('severity', 'warning'),
+            description=spec.get('description', ''),
+        )
+
+    def applies_to(self, configuration_name: Optional[str]) -> bool:
+        return not self.configurations or configuration_name in self.configurations
+
+
+class SettingFinding(NamedTuple):
+    rule: SettingRule
+    kind: str  # 'duplicate', 'missing', 'forbidden' or 'order'
+    values: Tuple[str, ...]
+
+
+class SettingEdit(NamedTuple):
+    """Findings for one setting key of one configuration and the fixed value"""
+    key: str
+    value: Optional[SettingValue]
+    fixed: SettingValue
+    findings: List[SettingFinding]
+
+
+def _apply_rule(rule: SettingRule, flags: List[Flag],
+                findings: List[SettingFinding]) -> List[Flag]:
+    if rule.forbid:
+        forbidden = {flag.key for value in rule.forbid for flag in parse_flags([value])}
+        removed = [flag.text for flag in flags if flag.key in forbidden and flag.key != (INHERITED,)]
+        if removed:
+            findings.append(SettingFinding(rule, 'forbidden', tuple(removed)))
+            flags = [flag for flag in flags if flag.key not in forbidden or flag.key == (INHERITED,)]
+
+    if rule.dedupe:
+        seen = set()
+        kept = []
+        repeated = []
+        for flag in flags:
+            if _is_reference(flag) or flag.key[0] in _POSITIONAL:
+                kept.append(flag)
+            elif flag.key in seen:
+                repeated.append(flag.text)
+            else:
+                seen.add(flag.key)
+                kept.append(flag)
+        if repeated:
+            findings.append(SettingFinding(rule, 'duplicate', tuple(dict.fromkeys(repeated))))
+            flags = kept
+
+    if rule.require:
+        present = {flag.key for flag in flags}
+        missing = [flag for value in rule.require for flag in parse_flags([value])
+                   if flag.key not in present]
+        if missing:
+            findings.append(SettingFinding(rule, 'missing', tuple(flag.text for flag in missing)))
+            flags = flags + [flag._replace(element=None, last=None) for flag in missing]
+
+    if rule.inherited_first:
+        inherited = [flag for flag in flags if flag.key == (INHERITED,)]
+        if inherited and flags[0].key != (INHERITED,):
+            findings.append(SettingFinding(rule, 'order', (INHERITED,)))
+            flags = inherited + [flag for flag in flags if flag.key != (INHERITED,)]
+
+    return flags
+
+
+def _render(value: SettingValue, original: List[Flag], flags: List[Flag]) -> SettingValue:
+    """Rebuild a value in its original form, keeping untouched elements verbatim"""
+    if isinstance(value, str):
+        return ' '.join(flag.text for flag in flags)
+
+    by_element: Dict[int, List[Flag]] = {}
+    covered = set()
+    for flag in original:
+        by_element.setdefault(flag.element, []).append(flag)
+        covered.update(range(flag.element, flag.last + 1))
+
+    # (source element, text) pairs; consecutive flags from one element
+    # are written back together
+    elements: List[Tuple[Optional[int], str]] = []
+    group: List[Flag] = []
+
+    def flush():
+        if not group:
+            return
+        element = group[0].element
+        if element is not None and by_element.get(element) == group:
+            elements.extend((index, value[index]) for index in range(element, group[-1].last + 1))
+        else:
+            elements.append((element, ' '.join(flag.text for flag in group)))
+        group.clear()
+
+    for flag in flags:
+        if flag.element is None or not group or group[0].element != flag.element:
+            flush()
+        group.append(flag)
+    flush()
+
+    # Elements without any flag (Xcode templates leave a " " entry) stay
+    # after the element they followed
+    for index, text in enumerate(value):
+        if index not in covered:
+            position = max((i + 1 for i, (source, _) in enumerate(elements)
+                            if source is not None and source < index), default=0)
+            elements.insert(position, (index, text))
+    return [text for _, text in elements]
+
+
+class SettingsRuleSet:
+    """Build-setting rules grouped by setting name for one pass per configuration"""
+
+    def __init__(self, rules: List[SettingRule]):
+        self.rules = rules
+        self.by_setting: Dict[str, List[SettingRule]] = {}
+        for rule in rules:
+            self.by_setting.setdefault(rule.setting, []).append(rule)
+
+    @classmethod
+    def from_protocol(cls, specs: List[Dict]) -> 'SettingsRuleSet':
+        return cls([SettingRule.from_protocol(spec) for spec in specs])
+
+    def check_value(self, key: str, value: Optional[SettingValue],
+                    configuration_name: Optional[str] = None) -> Optional[SettingEdit]:
+        """Apply every rule for `key` (or its [sdk=...] base) to one value"""
+        rules = [rule for rule in self.by_setting.get(key.partition('[')[0], ())
+                 if rule.applies_to(configuration_name)]
+        if not rules:
+            return None
+        if value is None:
+            # Unset means inherited, so a created setting keeps $(inherited)
+            original = []
+            flags = [Flag((INHERITED,), INHERITED, None, None)]
+        else:
+            original = flags = parse_flags([value] if isinstance(value, str) else value)
+
+        findings: List[SettingFinding] = []
+        for rule in rules:
+            flags = _apply_rule(rule, flags, findings)
+        if not findings:
+            return None
+        if value is None:
+            fixed = [flag.text for flag in flags]
+        else:
+            fixed = _render(value, original, flags)
+        return SettingEdit(key, value, fixed, findings)
+
+    def check(self, configuration: XCBuildConfiguration) -> Iterator[SettingEdit]:
+        """Edits for one configuration, visiting each of its settings once"""
+        settings = configuration.get('buildSettings') or {}
+        name = configuration.get('name')
+        for key, value in settings.items():
+            edit = self.check_value(key, value, name)
+            if edit is not None:
+                yield edit
+        # Required values for settings the configuration does not set at all
+        for setting, rules in self.by_setting.items():
+            if setting not in settings and any(rule.require and rule.applies_to(name) for rule in rules):
+                edit = self.check_value(setting, None, name)
+                if edit is not None:
+                    yield edit
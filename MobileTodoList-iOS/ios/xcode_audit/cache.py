@@ -0,0 +1,163 @@
+"""
+On-disk cache of pbxproj scan results.
+
+Parsing a large Pods project is dominated by the tokenizer pass that builds
+the object index. The index (object IDs, byte spans, isa codes and the
+top-level keys) is stored per content hash, so a warm run maps the file and
+restores the index without tokenizing anything:
+
+    <cache_dir>/stat.marshal       resolved path -> (size, mtime_ns, sha256)
+    <cache_dir>/<sha256>.marshal   (CACHE_VERSION, exported index)
+
+A file whose size and mtime match the stat record is trusted without being
+hashed. Otherwise the content is hashed, and a touched-but-unchanged file
+still hits. Entries from an older CACHE_VERSION are ignored and replaced.
+Entry mtimes are bumped on every hit and the least recently used entries are
+evicted once the directory grows past `max_bytes`.
+"""
+
+import hashlib
+import marshal
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .pbxproj import PBXProject, load_projects
+
+# Bump whenever PBXProject.export_index() changes shape
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_STAT_FILE = 'stat.marshal'
+_ENTRY_SUFFIX = '.marshal'
+
+
+def _write_atomic(path: Path, payload: bytes):
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+class ParseCache:
+    """Content-addressed cache of PBXProject indexes"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._stats: Optional[Dict[str, Tuple[int, int, str]]] = None
+
+    def _load_stats(self) -> Dict[str, Tuple[int, int, str]]:
+        if self._stats is None:
+            try:
+                with open(self.cache_dir / _STAT_FILE, 'rb') as f:
+                    version, stats = marshal.load(f)
+                self._stats = stats if version == CACHE_VERSION else {}
+            except (OSError, EOFError, ValueError, TypeError):
+                self._stats = {}
+        return self._stats
+
+    def _read_entry(self, digest: str) -> Optional[tuple]:
+        entry_path = self.cache_dir / f"{digest}{_ENTRY_SUFFIX}"
+        try:
+            with open(entry_path, 'rb') as f:
+                version, index = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if version != CACHE_VERSION:
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return index
+
+    def load(self, path: Path) -> PBXProject:
+        """PBXProject.load(path), restoring the index from cache when possible"""
+        return self.load_many([path])[0]
+
+    def load_many(self, paths: List[Path], jobs: int = 1) -> List[PBXProject]:
+        """Load several projects; cache misses are parsed in up to `jobs` processes"""
+        stats = self._load_stats()
+        projects: List[Optional[PBXProject]] = []
+        misses = []
+        dirty = False
+        for path in paths:
+            path = Path(path)
+            key = str(path.resolve())
+            st = os.stat(path)
+            data = PBXProject.map_file(path)
+
+            record = stats.get(key)
+            if record is not None and record[:2] == (st.st_size, st.st_mtime_ns):
+                project = self._restore(path, data, record[2])
+                if project is not None:
+                    projects.append(project)
+                    continue
+
+            digest = hashlib.sha256(data).hexdigest()
+            project = self._restore(path, data, digest)
+            if project is None:
+                misses.append((len(projects), path, data, digest))
+            stats[key] = (st.st_size, st.st_mtime_ns, digest)
+            dirty = True
+            projects.append(project)
+
+        if misses:
+            parsed = load_projects([path for _, path, _, _ in misses], jobs,
+                                   [data for _, _, data, _ in misses])
+            for (position, _, _, digest), project in zip(misses, parsed):
+                self.misses += 1
+                self._store(digest, project)
+                projects[position] = project
+        if dirty:
+            self._save_stats()
+        return projects
+
+    def _restore(self, path: Path, data, digest: str) -> Optional[PBXProject]:
+        index = self._read_entry(digest)
+        if index is None:
+            return None
+        try:
+            project = PBXProject(path, data, index=index)
+        except (ValueError, TypeError):
+            return None
+        self.hits += 1
+        return project
+
+    def _store(self, digest: str, project: PBXProject):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            payload = marshal.dumps((CACHE_VERSION, project.export_index()))
+            _write_atomic(self.cache_dir / f"{digest}{_ENTRY_SUFFIX}", payload)
+            self.evict()
+        except OSError:
+            pass
+
+    def _save_stats(self):
+        stats = self._load_stats()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.cache_dir / _STAT_FILE, marshal.dumps((CACHE_VERSION, stats)))
+        except OSError:
+            pass
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(_ENTRY_SUFFIX) and entry.name != _STAT_FILE:
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,184 @@
+"""
+Forward and reverse reference indexes over a parsed project.
+
+    target -> build phases -> build files -> file references -> groups
+    target / project -> XCConfigurationList -> XCBuildConfiguration
+
+Each relation is built on first use with one pass over the objects of the
+relevant isa, after which "which target owns this phase" or "which group
+holds this file" is a dict lookup instead of a rescan of the file.
+"""
+
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .model import PBXObject, XCBuildConfiguration
+from .pbxproj import PBXProject
+
+TARGET_ISAS = ('PBXNativeTarget', 'PBXAggregateTarget', 'PBXLegacyTarget')
+PHASE_ISAS = (
+    'PBXSourcesBuildPhase', 'PBXFrameworksBuildPhase', 'PBXResourcesBuildPhase',
+    'PBXHeadersBuildPhase', 'PBXCopyFilesBuildPhase', 'PBXShellScriptBuildPhase',
+)
+GROUP_ISAS = ('PBXGroup', 'PBXVariantGroup', 'XCVersionGroup')
+
+
+class ProjectGraph:
+    """Lazily built reference indexes for one PBXProject"""
+
+    def __init__(self, project: PBXProject):
+        self.project = project
+        self._configuration_names: Dict[str, List[str]] = {}
+
+    def _targets(self):
+        for isa in TARGET_ISAS:
+            yield from self.project.objects_of(isa)
+
+    @cached_property
+    def target_phases(self) -> Dict[str, tuple]:
+        """Target ID -> its buildPhases, in build order"""
+        return {target_id: target.get('buildPhases', ()) for target_id, target in self._targets()}
+
+    @cached_property
+    def phase_target(self) -> Dict[str, str]:
+        """Build phase ID -> owning target ID"""
+        owners = {}
+        for target_id, phases in self.target_phases.items():
+            for phase_id in phases:
+                owners[phase_id] = target_id
+        return owners
+
+    @cached_property
+    def build_file_phase(self) -> Dict[str, str]:
+        """PBXBuildFile ID -> the build phase that lists it"""
+        owners = {}
+        for isa in PHASE_ISAS:
+            for phase_id, phase in self.project.objects_of(isa):
+                for build_file_id in phase.get('files', ()):
+                    owners[build_file_id] = phase_id
+        return owners
+
+    @cached_property
+    def file_build_files(self) -> Dict[str, List[str]]:
+        """File reference ID -> PBXBuildFile IDs that compile/copy/link it"""
+        users: Dict[str, List[str]] = {}
+        for build_file_id, build_file in self.project.objects_of('PBXBuildFile'):
+            if build_file.fileRef:
+                users.setdefault(build_file.fileRef, []).append(build_file_id)
+        return users
+
+    @cached_property
+    def parent_group(self) -> Dict[str, str]:
+        """File reference or group ID -> the group that lists it as a child"""
+        parents = {}
+        for isa in GROUP_ISAS:
+            for group_id, group in self.project.objects_of(isa):
+                for child_id in group.get('children', ()):
+                    parents[child_id] = group_id
+        return parents
+
+    @cached_property
+    def configuration_list_owner(self) -> Dict[str, str]:
+        """XCConfigurationList ID -> the target or project that uses it"""
+        owners = {}
+        for target_id, target in self._targets():
+            if target.get('buildConfigurationList'):
+                owners[target['buildConfigurationList']] = target_id
+        for project_id, root in self.project.objects_of('PBXProject'):
+            if root.get('buildConfigurationList'):
+                owners[root['buildConfigurationList']] = project_id
+        return owners
+
+    @cached_property
+    def configuration_list(self) -> Dict[str, str]:
+        """XCBuildConfiguration ID -> the XCConfigurationList containing it"""
+        lists = {}
+        for list_id, config_list in self.project.objects_of('XCConfigurationList'):
+            for config_id in config_list.get('buildConfigurations', ()):
+                lists[config_id] = list_id
+        return lists
+
+    def target_of(self, object_id: str) -> Optional[PBXObject]:
+        """Owning target of a build phase, build file or build configuration"""
+        project = self.project
+        isa = project.isa(object_id)
+        if isa == 'PBXBuildFile':
+            object_id = self.build_file_phase.get(object_id, '')
+        elif isa == 'XCBuildConfiguration':
+            owner = self.configuration_list_owner.get(self.configuration_list.get(object_id, ''))
+            return project.get(owner) if owner and project.isa(owner) in TARGET_ISAS else None
+        target_id = self.phase_target.get(object_id)
+        return project.get(target_id) if target_id else None
+
+    def phases_of(self, target_id: str, isa: Optional[str] = None) -> List[PBXObject]:
+        """A target's build phases in build order, optionally of one isa"""
+        phases = self.project.resolve(self.target_phases.get(target_id, ()))
+        return [phase for phase in phases if isa is None or phase.isa == isa]
+
+    def group_of(self, object_id: str) -> Optional[PBXObject]:
+        group_id = self.parent_group.get(object_id)
+        return self.project.get(group_id) if group_id else None
+
+    def group_path(self, object_id: str) -> List[str]:
+        """Group names from the main group down to the object's parent"""
+        names = []
+        seen = set()
+        group = self.group_of(object_id)
+        while group is not None and group.id not in seen:
+            seen.add(group.id)
+            name = group.get('name') or group.get('path')
+            if name:
+                names.append(name)
+            group = self.group_of(group.id)
+        return names[::-1]
+
+    def source_path(self, object_id: str, project_dir: Path) -> Optional[Path]:
+        """Filesystem path of a file reference or group
+
+        Group-relative paths are joined up the group chain; references
+        relative to build products or an SDK have no fixed path (None).
+        """
+        parts = []
+        seen = set()
+        item = self.project.get(object_id)
+        while item is not None and item.id not in seen:
+            seen.add(item.id)
+            if item.get('path'):
+                parts.append(item['path'])
+            source_tree = item.get('sourceTree', '<group>')
+            if source_tree == '<group>':
+                item = self.group_of(item.id)
+            elif source_tree == 'SOURCE_ROOT':
+                break
+            elif source_tree == '<absolute>':
+                return Path(*reversed(parts))
+            else:
+                return None
+        return Path(project_dir, *reversed(parts))
+
+    def configurations(self, owner_id: str) -> List[XCBuildConfiguration]:
+        """Build configurations of a target or of the project itself"""
+        owner = self.project.get(owner_id)
+        if owner is None or not owner.get('buildConfigurationList'):
+            return []
+        config_list = self.project.get(owner['buildConfigurationList'])
+        if config_list is None:
+            return []
+        return list(self.project.resolve(config_list.get('buildConfigurations')))
+
+    def context(self, object_id: str) -> Dict[str, object]:
+        """Owning target and configuration names for an issue report"""
+        target = self.target_of(object_id)
+        if target is None:
+            return {}
+        context = {'target': target.get('name'), 'target_id': target.id}
+        if self.project.isa(object_id) == 'XCBuildConfiguration':
+            context['configurations'] = [self.project.get(object_id).get('name')]
+        else:
+            names = self._configuration_names.get(target.id)
+            if names is None:
+                names = [config.name for config in self.configurations(target.id)]
+                self._configuration_names[target.id] = names
+            context['configurations'] = list(names)
+        return context
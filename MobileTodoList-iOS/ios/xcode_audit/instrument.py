@@ -0,0 +1,141 @@
+"""
+Instrumentation spans for the auditor's checks and fixes.
+
+A span records, for the code run inside it:
+
+    wall_seconds   perf_counter time
+    cpu_seconds    process CPU time (all threads)
+    files_read     files opened for reading
+    bytes_read     size of those files
+    peak_bytes     highest traced memory above what was traced at the start
+                   (only when tracing memory)
+
+Spans nest (a check's span holds its parse and scan spans) and every figure
+is inclusive of the spans inside. Files are counted from Python's `open`
+audit event, so mmap'd pbxprojs, gzip logs and lazy imports are seen, while
+reads done by subprocesses (git, pod) or pool worker processes are not;
+bytes read is the file size at open time, which is what the checks read
+since they read whole files. Memory comes from tracemalloc, started for the
+outermost span when nothing else is tracing. It makes allocation-heavy code
+such as the pbxproj parse several times slower (and skews the times next to
+it), so it is opt-in.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Spans currently open, outermost first; audit hooks cannot be removed, so
+# one hook is installed per process and charges reads to these
+_active: List['Span'] = []
+_hook_installed = False
+
+
+def _opened_for_reading(mode: Optional[str], flags: int) -> bool:
+    if mode is not None:
+        return not any(c in mode for c in 'wax+')
+    return flags & os.O_ACCMODE == os.O_RDONLY
+
+
+def _count_reads(event: str, args: tuple) -> None:
+    if event != 'open' or not _active:
+        return
+    try:
+        path, mode, flags = args
+        if isinstance(path, int) or not _opened_for_reading(mode, flags):
+            return
+        size = os.stat(path).st_size
+    except Exception:
+        # Never fail the open being audited; a missing file is not a read
+        return
+    for span in _active:
+        span.files_read += 1
+        span.bytes_read += size
+
+
+def _install_hook() -> None:
+    global _hook_installed
+    if not _hook_installed:
+        sys.addaudithook(_count_reads)
+        _hook_installed = True
+
+
+class Span:
+    """Measurements of one named stage"""
+
+    __slots__ = ('name', 'parent', 'depth', 'wall_seconds', 'cpu_seconds',
+                 'files_read', 'bytes_read', 'peak_bytes', '_base', '_peak')
+
+    def __init__(self, name: str, parent: Optional[str], depth: int):
+        self.name = name
+        self.parent = parent
+        self.depth = depth
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.files_read = 0
+        self.bytes_read = 0
+        self.peak_bytes: Optional[int] = None
+        self._base = 0
+        self._peak = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'files_read': self.files_read,
+            'bytes_read': self.bytes_read,
+            'peak_bytes': self.peak_bytes,
+        }
+
+
+class Instrumentation:
+    """Spans of one run, in the order they started"""
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        _install_hook()
+        parent = _active[-1] if _active else None
+        span = Span(name, parent.name if parent is not None else None, len(_active))
+        self.spans.append(span)
+
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # The peak counter is global: fold it into the parent before
+            # restarting it for this span
+            if parent is not None:
+                parent._peak = max(parent._peak, peak)
+            tracemalloc.reset_peak()
+            span._base = span._peak = current
+
+        _active.append(span)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield span
+        finally:
+            span.wall_seconds = time.perf_counter() - wall
+            span.cpu_seconds = time.process_time() - cpu
+            _active.remove(span)
+            if self.trace_memory and tracemalloc.is_tracing():
+                peak = max(span._peak, tracemalloc.get_traced_memory()[1])
+                span.peak_bytes = peak - span._base
+                if parent is not None:
+                    parent._peak = max(parent._peak, peak)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def to_list(self) -> List[Dict]:
+        return [span.to_dict() for span in self.spans]
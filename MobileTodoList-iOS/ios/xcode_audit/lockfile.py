@@ -0,0 +1,241 @@
+"""
+CocoaPods lockfiles and whether `pod install` has anything to do.
+
+Podfile.lock and Pods/Manifest.lock are written by `pod install` with the
+same YAML layout:
+
+    PODS:
+      - boost (1.84.0)
+      - "React-Core/Default (0.76.0)":
+        - glog
+    SPEC CHECKSUMS:
+      boost: 1dca942403ed9342f98334bf4c3621f011aa7946
+    PODFILE CHECKSUM: 8d2b6a5c...
+
+Only the block mappings, sequences and plain or quoted scalars CocoaPods
+emits are supported, so no YAML package is needed.
+
+`pod install` is needed when the Podfile's SHA-1 no longer matches PODFILE
+CHECKSUM (the Podfile was edited), when either lockfile is missing, or when
+the installed Manifest.lock disagrees with Podfile.lock on a pod's version
+or spec checksum (a pull brought in new pods). That is the same comparison
+the "[CP] Check Pods Manifest.lock" build phase makes, made before the build.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+Node = Union[str, List['Node'], Dict[str, 'Node']]
+
+
+class LockfileError(ValueError):
+    """Raised when a lockfile uses YAML outside the supported subset"""
+
+
+def _scalar(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '"\'':
+        body = text[1:-1]
+        if text[0] == "'":
+            return body.replace("''", "'")
+        return body.replace('\\"', '"').replace('\\\\', '\\')
+    return text
+
+
+def _split_key(text: str) -> Optional[Tuple[str, str]]:
+    """`key: value` / `"quoted key": value` / `:podspec: value` -> (key, rest)"""
+    if text[:1] in '"\'':
+        end = text.find(text[0], 1)
+        while end != -1 and text[0] == '"' and text[end - 1] == '\\':
+            end = text.find('"', end + 1)
+        if end == -1 or text[end + 1:end + 2] != ':':
+            return None
+        return _scalar(text[:end + 1]), text[end + 2:].strip()
+    if text.endswith(':'):
+        return text[:-1], ''
+    colon = text.find(': ', 1)
+    if colon == -1:
+        return None
+    return text[:colon], text[colon + 2:].strip()
+
+
+def parse_lockfile(text: str) -> Dict[str, Node]:
+    """Parse the block-style YAML subset CocoaPods writes"""
+    lines = []
+    for number, raw in enumerate(text.splitlines(), 1):
+        stripped = raw.strip()
+        if not stripped or stripped.startswith('#') or stripped == '---':
+            continue
+        lines.append((len(raw) - len(raw.lstrip(' ')), stripped, number))
+
+    pos = 0
+
+    def parse_block(indent: int) -> Node:
+        nonlocal pos
+        if lines[pos][1].startswith('- ') or lines[pos][1] == '-':
+            return parse_sequence(indent)
+        return parse_mapping(indent)
+
+    def parse_value(rest: str, indent: int) -> Node:
+        nonlocal pos
+        if rest:
+            return _scalar(rest)
+        # Nested block, or an empty value; CocoaPods lists may sit at the
+        # key's own indent
+        if pos < len(lines) and (lines[pos][0] > indent or
+                                 (lines[pos][0] == indent and lines[pos][1].startswith('-'))):
+            return parse_block(lines[pos][0])
+        return ''
+
+    def parse_sequence(indent: int) -> List[Node]:
+        nonlocal pos
+        items: List[Node] = []
+        while pos < len(lines) and lines[pos][0] == indent and lines[pos][1].startswith('-'):
+            item = lines[pos][1][1:].strip()
+            pos += 1
+            pair = _split_key(item) if item else None
+            if pair is not None:
+                key, rest = pair
+                items.append({key: parse_value(rest, indent + 2)})
+            elif not item:
+                items.append(parse_value('', indent))
+            else:
+                items.append(_scalar(item))
+        return items
+
+    def parse_mapping(indent: int) -> Dict[str, Node]:
+        nonlocal pos
+        mapping: Dict[str, Node] = {}
+        while pos < len(lines) and lines[pos][0] == indent:
+            _, content, number = lines[pos]
+            if content.startswith('-'):
+                break
+            pair = _split_key(content)
+            if pair is None:
+                raise LockfileError(f"Expected 'key: value' on line {number}")
+            pos += 1
+            key, rest = pair
+            mapping[key] = parse_value(rest, indent)
+        return mapping
+
+    if not lines:
+        return {}
+    result = parse_block(lines[0][0])
+    if pos < len(lines):
+        raise LockfileError(f"Unexpected indentation on line {lines[pos][2]}")
+    if not isinstance(result, dict):
+        raise LockfileError("Lockfile is not a mapping")
+    return result
+
+
+def _pod_entry(entry: Node) -> Optional[Tuple[str, str]]:
+    """`Name (1.2.3)` or `{Name (1.2.3): [deps]}` -> (name, version)"""
+    if isinstance(entry, dict):
+        entry = next(iter(entry), '')
+    if not isinstance(entry, str):
+        return None
+    name, _, version = entry.partition(' (')
+    return name, version.rstrip(')')
+
+
+def _root(name: str) -> str:
+    # SPEC CHECKSUMS is keyed by podspec, PODS lists subspecs (React-Core/Default)
+    return name.split('/', 1)[0]
+
+
+class Lockfile(NamedTuple):
+    path: Path
+    pods: Dict[str, str]
+    checksums: Dict[str, str]
+    podfile_checksum: Optional[str]
+    cocoapods: Optional[str]
+
+    @classmethod
+    def load(cls, path: Path) -> 'Lockfile':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = parse_lockfile(f.read())
+        pods = {}
+        for entry in data.get('PODS') or ():
+            parsed = _pod_entry(entry)
+            if parsed is not None:
+                pods[parsed[0]] = parsed[1]
+        checksums = data.get('SPEC CHECKSUMS') or {}
+        return cls(
+            path=Path(path),
+            pods=pods,
+            checksums=dict(checksums) if isinstance(checksums, dict) else {},
+            podfile_checksum=data.get('PODFILE CHECKSUM') or None,
+            cocoapods=data.get('COCOAPODS') or None,
+        )
+
+    def fingerprint(self) -> str:
+        """Stable digest of what was resolved: pod versions, spec checksums, Podfile"""
+        digest = hashlib.sha256()
+        for name in sorted(self.pods):
+            checksum = self.checksums.get(_root(name), '')
+            digest.update(f"{name}\0{self.pods[name]}\0{checksum}\n".encode('utf-8'))
+        digest.update((self.podfile_checksum or '').encode('utf-8'))
+        return digest.hexdigest()
+
+
+def podfile_checksum(podfile: Path) -> str:
+    """The SHA-1 CocoaPods records as PODFILE CHECKSUM"""
+    return hashlib.sha1(Path(podfile).read_bytes()).hexdigest()
+
+
+class PodDrift(NamedTuple):
+    """One pod whose locked and installed state differ"""
+    name: str
+    locked: Optional[str]
+    installed: Optional[str]
+    reason: str  # 'added', 'removed', 'version' or 'checksum'
+
+
+class PodsStatus(NamedTuple):
+    podfile: Path
+    lockfile: Optional[Lockfile]
+    manifest: Optional[Lockfile]
+    podfile_checksum: str
+    drift: List[PodDrift]
+
+    @property
+    def podfile_changed(self) -> bool:
+        return self.lockfile is not None and self.lockfile.podfile_checksum != self.podfile_checksum
+
+    @property
+    def install_needed(self) -> bool:
+        return (self.lockfile is None or self.manifest is None
+                or self.podfile_changed or bool(self.drift))
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        return self.lockfile.fingerprint() if self.lockfile is not None else None
+
+
+def compare_lockfiles(locked: Lockfile, installed: Lockfile) -> List[PodDrift]:
+    """Pods whose version or spec checksum differ between Podfile.lock and Manifest.lock"""
+    drift = []
+    for name in sorted(locked.pods.keys() | installed.pods.keys()):
+        want = locked.pods.get(name)
+        have = installed.pods.get(name)
+        if have is None:
+            drift.append(PodDrift(name, want, None, 'added'))
+        elif want is None:
+            drift.append(PodDrift(name, None, have, 'removed'))
+        elif want != have:
+            drift.append(PodDrift(name, want, have, 'version'))
+        elif locked.checksums.get(_root(name)) != installed.checksums.get(_root(name)):
+            drift.append(PodDrift(name, want, have, 'checksum'))
+    return drift
+
+
+def pods_status(podfile: Path) -> PodsStatus:
+    """Compare Podfile, Podfile.lock and Pods/Manifest.lock next to it"""
+    podfile = Path(podfile)
+    lock_path = podfile.with_name('Podfile.lock')
+    manifest_path = podfile.parent / 'Pods' / 'Manifest.lock'
+    lockfile = Lockfile.load(lock_path) if lock_path.exists() else None
+    manifest = Lockfile.load(manifest_path) if manifest_path.exists() else None
+    drift = compare_lockfiles(lockfile, manifest) if lockfile and manifest else []
+    return PodsStatus(podfile, lockfile, manifest, podfile_checksum(podfile), drift)
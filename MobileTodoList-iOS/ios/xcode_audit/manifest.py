@@ -0,0 +1,110 @@
+"""
+Incremental source-scan manifest.
+
+Maps each scanned file's (inode, size, mtime_ns) to the rule matches found
+in it, under a hash of the rule set:
+
+    {
+      "version": 1,
+      "rules": "<sha256 of the sourceRules>",
+      "files": {"<path>": [inode, size, mtime_ns, [[rule, offset, line, column, text], ...]]}
+    }
+
+A file whose stat triple is unchanged reuses its recorded matches without
+being opened. Editing any rule changes the hash and drops every entry.
+Files modified within RACY_NS of the scan are not recorded, since a second
+edit inside the same mtime tick would go unnoticed (the same guard git
+applies to its index).
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .scanner import SourceMatch, SourceRule
+
+MANIFEST_VERSION = 1
+RACY_NS = 2_000_000_000
+
+
+def rules_hash(specs: List[Dict]) -> str:
+    """Stable hash of the protocol's sourceRules"""
+    canonical = json.dumps([MANIFEST_VERSION, specs], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ScanManifest:
+    """Per-file cache of source-rule matches, keyed by stat"""
+
+    def __init__(self, path: Path, rules: List[SourceRule], rule_set_hash: str):
+        self.path = Path(path)
+        self.rules = rules
+        self.rule_set_hash = rule_set_hash
+        # By value: matches from --jobs workers carry unpickled copies of the rules
+        self._rule_index: Dict[SourceRule, int] = {}
+        for n, rule in enumerate(rules):
+            self._rule_index.setdefault(rule, n)
+        self._old: Dict[str, list] = {}
+        self._new: Dict[str, list] = {}
+        self._started_ns = time.time_ns()
+        self.reused = 0
+        self.scanned = 0
+
+    @classmethod
+    def load(cls, path: Path, rules: List[SourceRule], rule_set_hash: str) -> 'ScanManifest':
+        manifest = cls(path, rules, rule_set_hash)
+        try:
+            with open(path, 'r') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        if (isinstance(stored, dict) and stored.get('version') == MANIFEST_VERSION
+                and stored.get('rules') == rule_set_hash):
+            manifest._old = stored.get('files', {})
+        return manifest
+
+    def lookup(self, file_path: Path, st: os.stat_result) -> Optional[List[SourceMatch]]:
+        """Recorded matches if the file is unchanged since the last scan"""
+        key = str(file_path)
+        entry = self._old.get(key)
+        if entry is None or entry[:3] != [st.st_ino, st.st_size, st.st_mtime_ns]:
+            return None
+        try:
+            matches = [
+                SourceMatch(self.rules[rule], offset, line, column, text.encode('latin-1'))
+                for rule, offset, line, column, text in entry[3]
+            ]
+        except (IndexError, TypeError, ValueError):
+            return None
+        self._new[key] = entry
+        self.reused += 1
+        return matches
+
+    def record(self, file_path: Path, st: os.stat_result, matches: List[SourceMatch]):
+        self.scanned += 1
+        if st.st_mtime_ns >= self._started_ns - RACY_NS:
+            return
+        self._new[str(file_path)] = [
+            st.st_ino, st.st_size, st.st_mtime_ns,
+            [[self._rule_index[m.rule], m.offset, m.line, m.column, m.text.decode('latin-1')]
+             for m in matches],
+        ]
+
+    def save(self, keep_unseen: bool = False):
+        """Write the entries seen in this run
+
+        Files no longer scanned drop out, unless keep_unseen is set because
+        this run only looked at part of the tree.
+        """
+        files = {**self._old, **self._new} if keep_unseen else self._new
+        payload = {'version': MANIFEST_VERSION, 'rules': self.rule_set_hash, 'files': files}
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
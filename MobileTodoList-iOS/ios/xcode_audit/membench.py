@@ -0,0 +1,69 @@
+"""
+tracemalloc benchmark: parse memory of plain dicts vs the __slots__ model.
+
+Usage:
+  python3 -m xcode_audit.membench ios/Pods/Pods.xcodeproj/project.pbxproj
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from .pbxproj import PBXProject, _Parser
+
+
+def measure(build: Callable[[], object]) -> Tuple[float, int]:
+    """Run build() and return (seconds, peak traced bytes) while its result is alive"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    if isinstance(result, PBXProject):
+        result.close()
+    del result
+    return elapsed, peak
+
+
+def materialize_dicts(path: Path) -> List[dict]:
+    """Every object as the nested dict/list/str tree a naive parser would keep"""
+    objects = []
+    with PBXProject.load(path) as project:
+        for object_id in project.index:
+            parser = _Parser(project.data, *project.span(object_id))
+            objects.append(parser.parse_entry()[1])
+            parser.close()
+    return objects
+
+
+def materialize_model(path: Path) -> PBXProject:
+    """Every object decoded into the typed model"""
+    project = PBXProject.load(path)
+    for _ in project.objects.values():
+        pass
+    return project
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 1:
+        print(__doc__.strip())
+        return 2
+    path = Path(argv[0])
+    dict_time, dict_peak = measure(lambda: materialize_dicts(path))
+    model_time, model_peak = measure(lambda: materialize_model(path))
+    scan_time, scan_peak = measure(lambda: PBXProject.load(path))
+
+    print(f"{path} ({path.stat().st_size / 1e6:.1f} MB)")
+    print(f"  dict objects : {dict_peak / 1e6:8.1f} MB peak  {dict_time:6.2f}s")
+    print(f"  slots model  : {model_peak / 1e6:8.1f} MB peak  {model_time:6.2f}s")
+    print(f"  index only   : {scan_peak / 1e6:8.1f} MB peak  {scan_time:6.2f}s")
+    print(f"  model saving : {dict_peak / max(model_peak, 1):.1f}x overall, "
+          f"{(dict_peak - scan_peak) / max(model_peak - scan_peak, 1):.1f}x for objects")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,254 @@
+"""
+Compact object model for parsed pbxproj objects.
+
+Each isa the auditor cares about gets a `__slots__` class with one slot per
+known field, so the tens of thousands of PBXBuildFile / PBXFileReference
+objects in a Pods project don't each carry a dict of duplicated key strings.
+Arrays are stored as tuples, keys, isa names and short values are interned,
+and fields the model doesn't know about go into a per-object `_extra` dict
+only when present.
+
+Objects are decoded on first lookup, and child lists (children, files,
+buildPhases, ...) hold object IDs that are only resolved when the caller
+looks them up; the arrays themselves are decoded with their object.
+
+Absent fields read as None. Objects also behave like a read-only mapping
+(`get`, `in`, `[]`) so rules can look fields up by their pbxproj key.
+"""
+
+import sys
+from typing import Any, Dict, Iterator, Optional, Tuple, Type
+
+_intern = sys.intern
+
+
+# Short scalars are mostly object IDs and enum-like values (sourceTree,
+# lastKnownFileType, ...) repeated across thousands of objects
+_INTERN_MAX = 32
+
+
+def _compact(value: Any) -> Any:
+    """Lists become tuples; keys and short strings are interned, recursively"""
+    if isinstance(value, str):
+        return _intern(value) if len(value) <= _INTERN_MAX else value
+    if isinstance(value, list):
+        return tuple(_compact(item) for item in value)
+    if isinstance(value, dict):
+        return {_intern(key): _compact(item) for key, item in value.items()}
+    return value
+
+
+class PBXObject:
+    """Base class for every object in the pbxproj `objects` table"""
+
+    __slots__ = ('id', '_extra')
+    isa = 'PBXObject'
+    FIELDS: Tuple[str, ...] = ()
+
+    def __init__(self, object_id: str, fields: Dict[str, Any]):
+        self.id = object_id
+        self._extra: Optional[Dict[str, Any]] = None
+        known = self.FIELDS
+        for key in known:
+            setattr(self, key, None)
+        for key, value in fields.items():
+            if key == 'isa':
+                continue
+            value = _compact(value)
+            if key in known:
+                setattr(self, key, value)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[_intern(key)] = value
+
+    def __repr__(self) -> str:
+        return f"<{self.isa} {self.id}>"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == 'isa':
+            return self.isa
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> Iterator[str]:
+        yield 'isa'
+        for key in self.FIELDS:
+            if getattr(self, key) is not None:
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self.keys():
+            yield key, self.get(key)
+
+
+class PBXBuildFile(PBXObject):
+    FIELDS = ('fileRef', 'productRef', 'settings')
+    __slots__ = FIELDS
+    isa = 'PBXBuildFile'
+
+
+class PBXFileReference(PBXObject):
+    FIELDS = ('explicitFileType', 'fileEncoding', 'includeInIndex',
+              'lastKnownFileType', 'name', 'path', 'sourceTree')
+    __slots__ = FIELDS
+    isa = 'PBXFileReference'
+
+
+class PBXGroup(PBXObject):
+    FIELDS = ('children', 'name', 'path', 'sourceTree')
+    __slots__ = FIELDS
+    isa = 'PBXGroup'
+
+
+class PBXVariantGroup(PBXGroup):
+    __slots__ = ()
+    isa = 'PBXVariantGroup'
+
+
+class PBXBuildPhase(PBXObject):
+    FIELDS = ('buildActionMask', 'files', 'name', 'runOnlyForDeploymentPostprocessing')
+    __slots__ = FIELDS
+
+
+class PBXSourcesBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    isa = 'PBXSourcesBuildPhase'
+
+
+class PBXFrameworksBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    isa = 'PBXFrameworksBuildPhase'
+
+
+class PBXResourcesBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    isa = 'PBXResourcesBuildPhase'
+
+
+class PBXHeadersBuildPhase(PBXBuildPhase):
+    __slots__ = ()
+    isa = 'PBXHeadersBuildPhase'
+
+
+class PBXCopyFilesBuildPhase(PBXBuildPhase):
+    FIELDS = PBXBuildPhase.FIELDS + ('dstPath', 'dstSubfolderSpec')
+    __slots__ = ('dstPath', 'dstSubfolderSpec')
+    isa = 'PBXCopyFilesBuildPhase'
+
+
+class PBXShellScriptBuildPhase(PBXBuildPhase):
+    FIELDS = PBXBuildPhase.FIELDS + (
+        'alwaysOutOfDate', 'inputFileListPaths', 'inputPaths',
+        'outputFileListPaths', 'outputPaths', 'shellPath', 'shellScript',
+        'showEnvVarsInLog',
+    )
+    __slots__ = FIELDS[len(PBXBuildPhase.FIELDS):]
+    isa = 'PBXShellScriptBuildPhase'
+
+    @property
+    def display_name(self) -> str:
+        """Name Xcode shows for the phase (and writes in its comment)"""
+        return self.name or 'ShellScript'
+
+
+class PBXTarget(PBXObject):
+    FIELDS = ('buildConfigurationList', 'buildPhases', 'dependencies',
+              'name', 'productName')
+    __slots__ = FIELDS
+
+
+class PBXNativeTarget(PBXTarget):
+    FIELDS = PBXTarget.FIELDS + (
+        'buildRules', 'packageProductDependencies', 'productReference', 'productType',
+    )
+    __slots__ = FIELDS[len(PBXTarget.FIELDS):]
+    isa = 'PBXNativeTarget'
+
+
+class PBXAggregateTarget(PBXTarget):
+    __slots__ = ()
+    isa = 'PBXAggregateTarget'
+
+
+class PBXTargetDependency(PBXObject):
+    FIELDS = ('name', 'target', 'targetProxy')
+    __slots__ = FIELDS
+    isa = 'PBXTargetDependency'
+
+
+class PBXContainerItemProxy(PBXObject):
+    FIELDS = ('containerPortal', 'proxyType', 'remoteGlobalIDString', 'remoteInfo')
+    __slots__ = FIELDS
+    isa = 'PBXContainerItemProxy'
+
+
+class XCBuildConfiguration(PBXObject):
+    FIELDS = ('baseConfigurationReference', 'buildSettings', 'name')
+    __slots__ = FIELDS
+    isa = 'XCBuildConfiguration'
+
+
+class XCConfigurationList(PBXObject):
+    FIELDS = ('buildConfigurations', 'defaultConfigurationIsVisible',
+              'defaultConfigurationName')
+    __slots__ = FIELDS
+    isa = 'XCConfigurationList'
+
+
+class PBXRootObject(PBXObject):
+    """The single PBXProject object the file's rootObject points at"""
+
+    FIELDS = ('attributes', 'buildConfigurationList', 'compatibilityVersion',
+              'developmentRegion', 'hasScannedForEncodings', 'knownRegions',
+              'mainGroup', 'productRefGroup', 'projectDirPath', 'projectRoot',
+              'targets')
+    __slots__ = FIELDS
+    isa = 'PBXProject'
+
+
+MODEL_CLASSES: Dict[str, Type[PBXObject]] = {
+    cls.isa: cls for cls in (
+        PBXBuildFile, PBXFileReference, PBXGroup, PBXVariantGroup,
+        PBXSourcesBuildPhase, PBXFrameworksBuildPhase, PBXResourcesBuildPhase,
+        PBXHeadersBuildPhase, PBXCopyFilesBuildPhase, PBXShellScriptBuildPhase,
+        PBXNativeTarget, PBXAggregateTarget, PBXTargetDependency,
+        PBXContainerItemProxy, XCBuildConfiguration, XCConfigurationList,
+        PBXRootObject,
+    )
+}
+
+
+class _GenericObject(PBXObject):
+    """Fallback for isas without a dedicated class"""
+
+    __slots__ = ('_isa',)
+
+    def __init__(self, object_id: str, fields: Dict[str, Any]):
+        self._isa = _intern(fields.get('isa', ''))
+        super().__init__(object_id, fields)
+
+    @property
+    def isa(self) -> str:
+        return self._isa
+
+
+def make_object(object_id: str, fields: Dict[str, Any]) -> PBXObject:
+    """Build the typed object for a decoded pbxproj entry"""
+    cls = MODEL_CLASSES.get(fields.get('isa', ''), _GenericObject)
+    return cls(object_id, fields)
@@ -0,0 +1,192 @@
+"""
+Span-based patching of project files.
+
+Fixers record (offset, length, replacement) edits against the byte spans
+reported by the parser. The edits are checked for overlap and the result is
+produced in a single pass, so fixing N objects costs one copy of the file
+and everything outside the edited spans is preserved byte for byte.
+"""
+
+import os
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from .pbxproj import PBXProject, quote
+
+
+class Patch(NamedTuple):
+    offset: int
+    length: int
+    replacement: bytes
+
+
+class PatchConflictError(ValueError):
+    """Raised when two edits touch overlapping byte ranges"""
+
+
+class PatchSet:
+    """Collects non-overlapping edits against an immutable byte buffer"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.patches: List[Patch] = []
+
+    def __len__(self) -> int:
+        return len(self.patches)
+
+    def replace(self, offset: int, length: int, replacement: bytes):
+        if offset < 0 or length < 0 or offset + length > len(self.data):
+            raise ValueError(f"Patch {offset}+{length} is outside the file")
+        self.patches.append(Patch(offset, length, replacement))
+
+    def insert(self, offset: int, text: bytes):
+        self.replace(offset, 0, text)
+
+    def ordered(self) -> List[Patch]:
+        """Edits sorted by offset, rejecting any that overlap"""
+        # Stable sort: inserts at the same offset keep the order they were added
+        ordered = sorted(self.patches, key=lambda p: (p.offset, p.length))
+        for prev, cur in zip(ordered, ordered[1:]):
+            if cur.offset < prev.offset + prev.length:
+                raise PatchConflictError(
+                    f"Overlapping edits at bytes {prev.offset} and {cur.offset}"
+                )
+        return ordered
+
+    def chunks(self) -> Iterator[memoryview]:
+        """Yield the patched file as a sequence of zero-copy slices"""
+        with memoryview(self.data) as view:
+            pos = 0
+            for patch in self.ordered():
+                yield view[pos:patch.offset]
+                yield memoryview(patch.replacement)
+                pos = patch.offset + patch.length
+            yield view[pos:]
+
+    def apply(self) -> bytes:
+        return b''.join(self.chunks())
+
+    def write_to(self, f: BinaryIO):
+        for chunk in self.chunks():
+            f.write(chunk)
+
+    def write(self, path: Path):
+        """Write the patched file next to the original and rename it over
+
+        The source buffer may be an mmap of `path` itself, so the original
+        inode must stay intact until the new content is complete.
+        """
+        write_atomic(path, self.chunks())
+
+
+def stage_file(path: Path, chunks: Iterable[bytes]) -> Path:
+    """Write the new content of path to a synced temporary file beside it"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+def sync_directory(directory: Path):
+    """Make renames in directory durable (not supported everywhere)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path: Path, chunks: Iterable[bytes]):
+    """Replace path with chunks so that readers see the old or the new file, never a mix"""
+    path = Path(path)
+    os.replace(stage_file(path, chunks), path)
+    sync_directory(path.parent)
+
+
+def _line_start(data: bytes, offset: int) -> int:
+    return data.rfind(b'\n', 0, offset) + 1
+
+
+def _indent_of(data: bytes, offset: int) -> Optional[bytes]:
+    """Whitespace before offset on its line, None if anything else precedes it"""
+    prefix = data[_line_start(data, offset):offset]
+    return None if prefix.strip() else prefix
+
+
+def render_array(values: Sequence[str], indent: Optional[bytes]) -> bytes:
+    """Render a string array in Xcode's multi-line layout, or its one-line
+    layout (`(a, b, )`) when indent is None"""
+    if indent is None:
+        return b'(' + b''.join(quote(value).encode('utf-8') + b', ' for value in values) + b')'
+    lines = [b'(\n']
+    for value in values:
+        lines.append(indent + b'\t' + quote(value).encode('utf-8') + b',\n')
+    lines.append(indent + b')')
+    return b''.join(lines)
+
+
+def _set_field(patches: PatchSet, project: PBXProject, object_id: str, key: str,
+               render: Callable[[Optional[bytes]], bytes], within: Optional[str]):
+    # render gets the indent of the key's line, or None for an object Xcode
+    # writes on one line (PBXBuildFile, PBXFileReference, ...)
+    data = project.data
+    fields, close = project.field_spans(object_id, within)
+
+    if key in fields:
+        span = fields[key]
+        indent = _indent_of(data, span.key_start)
+        patches.replace(span.value_start, span.value_end - span.value_start, render(indent))
+        return
+
+    following = sorted(name for name in fields if name > key)
+    first = min((span.key_start for span in fields.values()), default=close)
+    if _indent_of(data, first) is None:
+        # One-line object: the entry goes inline, before the next key or `}`
+        anchor = fields[following[0]].key_start if following else close
+        patches.insert(anchor, quote(key).encode('utf-8') + b' = ' + render(None) + b'; ')
+        return
+
+    if following:
+        anchor = _line_start(data, fields[following[0]].key_start)
+    else:
+        anchor = _line_start(data, close)
+    if fields:
+        indent = data[_line_start(data, first):first]
+    else:
+        indent = data[anchor:close] + b'\t'
+    entry = indent + quote(key).encode('utf-8') + b' = ' + render(indent) + b';\n'
+    patches.insert(anchor, entry)
+
+
+def set_array_field(patches: PatchSet, project: PBXProject, object_id: str,
+                    key: str, values: Sequence[str], within: Optional[str] = None):
+    """Replace an array field, or insert it in key order if it is missing
+
+    `within` names a dictionary field (buildSettings) holding the key.
+    """
+    _set_field(patches, project, object_id, key,
+               lambda indent: render_array(values, indent), within)
+
+
+def set_string_field(patches: PatchSet, project: PBXProject, object_id: str,
+                     key: str, value: str, within: Optional[str] = None):
+    """Replace a string field, or insert it in key order if it is missing"""
+    _set_field(patches, project, object_id, key,
+               lambda indent: quote(value).encode('utf-8'), within)
@@ -0,0 +1,424 @@
+"""
+OpenStep plist parser for project.pbxproj files.
+
+The file is tokenized once and the `objects` dictionary is indexed by its
+24-hex object ID, with a secondary index of IDs by `isa`. Checks and fixers
+query that table instead of regex-scanning the raw project text.
+
+Projects are read through a read-only mmap. The initial pass only records
+each object's ID, isa and byte span; an object's fields are decoded the first
+time a rule asks for it, so large Pods projects parse with flat memory.
+"""
+
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .model import PBXObject, make_object
+
+Value = Union[str, List['Value'], Dict[str, 'Value']]
+Buffer = Union[bytes, mmap.mmap]
+
+
+class FieldSpan(NamedTuple):
+    """Byte offsets of one `key = value;` field inside an object entry"""
+    key_start: int
+    value_start: int
+    value_end: int
+    end: int
+
+
+# Whitespace and comments are consumed as a prefix of the next token, so the
+# scanner only surfaces quoted strings (1), punctuation (2), bare words (3)
+# and end of input (no group).
+_TOKEN_RE = re.compile(
+    rb'''
+    \s*(?:(?:/\*.*?\*/|//[^\n]*)\s*)*
+    (?:
+      ("[^"\\]*(?:\\.[^"\\]*)*")
+    | ([{}()=;,])
+    | ([^\s{}()=;,"]+)
+    | \Z
+    )
+    ''',
+    re.DOTALL | re.VERBOSE
+)
+_KINDS = {1: 'quoted', 2: 'punct', 3: 'word'}
+
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r'}
+_BARE_RE = re.compile(r'[A-Za-z0-9_./]+\Z')
+_QUOTE_RE = re.compile(r'[\\"\n\t]')
+_QUOTES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t'}
+
+_OPEN = frozenset(b'{(')
+_CLOSE = frozenset(b'})')
+
+
+class PBXParseError(ValueError):
+    """Raised when project.pbxproj is not a well-formed OpenStep plist"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at byte {offset}")
+        self.offset = offset
+
+
+def _unquote(raw: bytes) -> str:
+    text = raw[1:-1].decode('utf-8')
+    if '\\' not in text:
+        return text
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def quote(text: str) -> str:
+    """Render a string the way Xcode writes it, quoting only when needed"""
+    if _BARE_RE.match(text):
+        return text
+    return '"' + _QUOTE_RE.sub(lambda m: _QUOTES[m.group()], text) + '"'
+
+
+class _Parser:
+    """Recursive-descent parser over the significant tokens of the file"""
+
+    def __init__(self, data: Buffer, pos: int = 0, endpos: Optional[int] = None):
+        self.data = data
+        self.endpos = len(data) if endpos is None else endpos
+        self.matches = _TOKEN_RE.finditer(data, pos, self.endpos)
+        self.pos = pos
+        self.end = pos
+        self.advance()
+        # Object index: ID -> ordinal into parallel arrays of entry offsets
+        # and isa codes, which is far smaller than a tuple per object
+        self.index: Dict[str, int] = {}
+        self.starts = array('Q')
+        self.ends = array('Q')
+        self.isa_codes = array('H')
+        self.isa_names: List[str] = []
+
+    def close(self):
+        """Release the tokenizer's hold on the underlying buffer"""
+        self.matches = None
+
+    def advance(self):
+        self.prev_end = self.end
+        match = next(self.matches)
+        if match.start() != self.pos:
+            raise PBXParseError("Unexpected character", self.pos)
+        self.pos = self.end = match.end()
+        group = match.lastindex
+        if group is None:
+            if self.end != self.endpos:
+                raise PBXParseError("Unexpected character", self.end)
+            self.kind, self.start = 'eof', self.end
+        else:
+            self.kind, self.start = _KINDS[group], match.start(group)
+
+    def at(self, punct: int) -> bool:
+        return self.kind == 'punct' and self.data[self.start] == punct
+
+    def expect(self, punct: bytes) -> int:
+        if not self.at(punct[0]):
+            raise PBXParseError(f"Expected {punct.decode()!r}", self.start)
+        end = self.end
+        self.advance()
+        return end
+
+    def parse_string(self) -> str:
+        if self.kind == 'quoted':
+            text = _unquote(self.data[self.start:self.end])
+        elif self.kind == 'word':
+            text = self.data[self.start:self.end].decode('utf-8')
+        else:
+            raise PBXParseError("Expected a string", self.start)
+        self.advance()
+        return text
+
+    def parse_value(self) -> Value:
+        if self.at(ord('{')):
+            return self.parse_dict()
+        if self.at(ord('(')):
+            return self.parse_array()
+        return self.parse_string()
+
+    def parse_array(self) -> List[Value]:
+        self.expect(b'(')
+        items = []
+        while not self.at(ord(')')):
+            items.append(self.parse_value())
+            if self.at(ord(',')):
+                self.advance()
+        self.expect(b')')
+        return items
+
+    def parse_dict(self, depth: int = 0,
+                   fields: Optional[Dict[str, FieldSpan]] = None) -> Dict[str, Value]:
+        self.expect(b'{')
+        result = {}
+        while not self.at(ord('}')):
+            key_start = self.start
+            key = self.parse_string()
+            self.expect(b'=')
+            value_start = self.start
+            if depth == 0 and key == 'objects':
+                self.scan_objects()
+            else:
+                result[key] = self.parse_value()
+            value_end = self.prev_end
+            end = self.expect(b';')
+            if fields is not None:
+                fields[key] = FieldSpan(key_start, value_start, value_end, end)
+        self.expect(b'}')
+        return result
+
+    def parse_entry(self, fields: Optional[Dict[str, FieldSpan]] = None
+                    ) -> Tuple[str, Dict[str, Value]]:
+        """Parse one `ID = { ... }` entry from the objects table"""
+        object_id = self.parse_string()
+        self.expect(b'=')
+        return object_id, self.parse_dict(depth=1, fields=fields)
+
+    def scan_objects(self):
+        """Record each object's span and isa without materializing its fields"""
+        self.expect(b'{')
+        data = self.data
+        isa_codes: Dict[bytes, int] = {}
+        while not self.at(ord('}')):
+            entry_start = self.start
+            object_id = sys.intern(self.parse_string())
+            self.expect(b'=')
+            if not self.at(ord('{')):
+                raise PBXParseError("Expected '{'", self.start)
+
+            # Walk the object's tokens directly on the match iterator; this
+            # loop sees every token in the file, so nothing here is decoded.
+            depth = 1
+            isa = -1
+            want_isa = False
+            pos = self.end
+            for match in self.matches:
+                if match.start() != pos:
+                    raise PBXParseError("Unexpected character", pos)
+                pos = match.end()
+                group = match.lastindex
+                if group == 2:
+                    char = data[pos - 1]
+                    if char in _OPEN:
+                        depth += 1
+                    elif char in _CLOSE:
+                        depth -= 1
+                        if depth == 0:
+                            break
+                elif group is None:
+                    raise PBXParseError("Unterminated object", entry_start)
+                elif want_isa:
+                    raw = data[match.start(group):pos]
+                    isa = isa_codes.get(raw)
+                    if isa is None:
+                        isa = isa_codes[raw] = len(self.isa_names)
+                        self.isa_names.append(sys.intern(raw.decode('utf-8').strip('"')))
+                    want_isa = False
+                elif depth == 1 and isa < 0 and data[match.start(group):pos] == b'isa':
+                    want_isa = True
+
+            if isa < 0:
+                raise PBXParseError(f"Object {object_id} has no isa", entry_start)
+            self.pos = self.end = pos
+            self.advance()
+            self.index[object_id] = len(self.starts)
+            self.starts.append(entry_start)
+            self.ends.append(self.expect(b';'))
+            self.isa_codes.append(isa)
+        self.expect(b'}')
+
+
+class _ObjectTable(Mapping):
+    """Object ID -> typed object, decoding each object on first access"""
+
+    def __init__(self, project: 'PBXProject'):
+        self._project = project
+        self._cache: Dict[str, PBXObject] = {}
+
+    def __getitem__(self, object_id: str) -> PBXObject:
+        obj = self._cache.get(object_id)
+        if obj is None:
+            parser = _Parser(self._project.data, *self._project.span(object_id))
+            _, fields = parser.parse_entry()
+            parser.close()
+            obj = self._cache[object_id] = make_object(object_id, fields)
+        return obj
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._project.index)
+
+    def __len__(self) -> int:
+        return len(self._project.index)
+
+
+class PBXProject:
+    """Parsed project.pbxproj with an ID-indexed object table"""
+
+    def __init__(self, path: Optional[Path], data: Buffer, index: Optional[tuple] = None):
+        self.path = path
+        self.data = data
+        if index is None:
+            parser = _Parser(data)
+            self.root = parser.parse_dict()
+            if parser.kind != 'eof':
+                raise PBXParseError("Trailing data after root dictionary", parser.start)
+            parser.close()
+            self.index = parser.index
+            self._starts = parser.starts
+            self._ends = parser.ends
+            self._isa_codes = parser.isa_codes
+            self._isa_names = parser.isa_names
+        else:
+            self._restore_index(index)
+        self.objects = _ObjectTable(self)
+        self.root['objects'] = self.objects
+        self._graph = None
+        self.sections: Dict[str, List[str]] = {isa: [] for isa in self._isa_names}
+        names = self._isa_names
+        codes = self._isa_codes
+        for object_id, ordinal in self.index.items():
+            self.sections[names[codes[ordinal]]].append(object_id)
+
+    def export_index(self) -> tuple:
+        """Scan results as plain builtins, for the on-disk parse cache"""
+        root = {key: value for key, value in self.root.items() if key != 'objects'}
+        ordinals = array('Q', self.index.values())
+        return (root, list(self.index), ordinals.tobytes(), self._starts.tobytes(),
+                self._ends.tobytes(), self._isa_codes.tobytes(), list(self._isa_names))
+
+    def _restore_index(self, index: tuple):
+        root, ids, ordinals, starts, ends, isa_codes, isa_names = index
+        ordinals = array('Q', ordinals)
+        self.root = root
+        self.index = {sys.intern(object_id): ordinal for object_id, ordinal in zip(ids, ordinals)}
+        self._starts = array('Q', starts)
+        self._ends = array('Q', ends)
+        self._isa_codes = array('H', isa_codes)
+        self._isa_names = [sys.intern(name) for name in isa_names]
+        count = len(self._starts)
+        if (len(self._ends) != count or len(self._isa_codes) != count
+                or len(ordinals) != len(ids) or any(ordinal >= count for ordinal in ordinals)):
+            raise ValueError("Inconsistent cached pbxproj index")
+
+    @staticmethod
+    def map_file(path: Path) -> Buffer:
+        """Read-only mmap of a file (empty bytes for an empty file)"""
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @classmethod
+    def load(cls, path: Path) -> 'PBXProject':
+        """Map a project.pbxproj file read-only and parse it"""
+        return cls(Path(path), cls.map_file(path))
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self) -> 'PBXProject':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, object_id: str) -> Optional[PBXObject]:
+        if object_id not in self.index:
+            return None
+        return self.objects[object_id]
+
+    def resolve(self, object_ids: Optional[Iterable[str]]) -> Iterator[PBXObject]:
+        """Materialize a list of object references, skipping dangling IDs"""
+        for object_id in object_ids or ():
+            if object_id in self.index:
+                yield self.objects[object_id]
+
+    def isa(self, object_id: str) -> Optional[str]:
+        ordinal = self.index.get(object_id)
+        if ordinal is None:
+            return None
+        return self._isa_names[self._isa_codes[ordinal]]
+
+    def objects_of(self, isa: str) -> Iterator[Tuple[str, PBXObject]]:
+        """Yield (id, object) pairs for every object of the given isa, in file order"""
+        for object_id in self.sections.get(isa, ()):
+            yield object_id, self.objects[object_id]
+
+    def span(self, object_id: str) -> Tuple[int, int]:
+        """Byte offsets of the `ID = { ... };` entry for an object"""
+        ordinal = self.index[object_id]
+        return self._starts[ordinal], self._ends[ordinal]
+
+    def raw(self, object_id: str) -> memoryview:
+        """Zero-copy view of an object's entry in the mapped file"""
+        start, end = self.span(object_id)
+        return memoryview(self.data)[start:end]
+
+    def field_spans(self, object_id: str, within: Optional[str] = None
+                    ) -> Tuple[Dict[str, FieldSpan], int]:
+        """Spans of an object's fields plus the offset of its closing brace
+
+        With `within`, the spans are those of the dictionary stored in that
+        field (buildSettings). Only the object's own entry is re-tokenized,
+        so field offsets are not kept in memory for every object in large
+        projects.
+        """
+        parser = _Parser(self.data, *self.span(object_id))
+        fields: Dict[str, FieldSpan] = {}
+        parser.parse_entry(fields=fields)
+        parser.close()
+        if within is None:
+            return fields, parser.prev_end - 1
+        span = fields[within]
+        parser = _Parser(self.data, span.value_start, span.value_end)
+        fields = {}
+        parser.parse_dict(depth=1, fields=fields)
+        parser.close()
+        return fields, parser.prev_end - 1
+
+    @property
+    def graph(self) -> 'ProjectGraph':
+        """Forward/reverse reference indexes, built on first use"""
+        if self._graph is None:
+            from .graph import ProjectGraph
+            self._graph = ProjectGraph(self)
+        return self._graph
+
+    @property
+    def root_object(self) -> Optional[PBXObject]:
+        return self.get(self.root.get('rootObject', ''))
+
+
+def _scan_index(path: str) -> tuple:
+    with PBXProject.load(Path(path)) as project:
+        return project.export_index()
+
+
+def load_projects(paths: List[Path], jobs: int = 1,
+                  data: Optional[List[Buffer]] = None) -> List[PBXProject]:
+    """Parse several project files, tokenizing in worker processes when jobs > 1
+
+    Workers only send back the exported index; each project is then mapped
+    (or uses the matching `data` buffer) in this process.
+    """
+    paths = [Path(path) for path in paths]
+    if data is None:
+        data = [PBXProject.map_file(path) for path in paths]
+    jobs = min(jobs, len(paths))
+    if jobs <= 1:
+        return [PBXProject(path, buffer) for path, buffer in zip(paths, data)]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(jobs) as pool:
+        indexes = list(pool.map(_scan_index, [str(path) for path in paths]))
+    return [PBXProject(path, buffer, index=index)
+            for path, buffer, index in zip(paths, data, indexes)]
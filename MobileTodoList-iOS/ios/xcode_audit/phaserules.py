@@ -0,0 +1,101 @@
+"""
+Compiled dispatch for the protocol's build-phase rules.
+
+`buildPhaseConfiguration.scriptPhases.rules` entries match a
+PBXShellScriptBuildPhase either by exact `scriptName` or by
+`scriptNamePattern` (a regex searched anywhere in the name). The rules are
+compiled once into:
+
+  - a dict from exact name to rule, and
+  - one combined regex with a named alternative per pattern rule.
+
+A phase name is looked up in the dict first (O(1)); only on a miss is the
+combined regex tried, once. Exact names take precedence over patterns, and
+among either kind the rule listed first in the protocol wins.
+
+Each pattern is compiled on its own first, so a bad one is reported with its
+rule id. A pattern with capturing groups of its own is kept out of the
+combined regex and searched separately (in protocol order), since its group
+numbers, backreferences and group names would clash with the alternation's.
+So is a pattern starting with inline global flags (`(?i)...`), which are
+only valid at the start of the whole regex.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+_GLOBAL_FLAGS_RE = re.compile(r'\(\?[aiLmsux]+\)')
+
+
+class PhaseRule(NamedTuple):
+    id: str
+    script_name: Optional[str]
+    pattern: Optional[str]
+    required_outputs: Tuple[str, ...]
+    description: str
+
+    @classmethod
+    def from_protocol(cls, spec: Dict) -> 'PhaseRule':
+        return cls(
+            id=spec['id'],
+            script_name=spec.get('scriptName') or None,
+            pattern=spec.get('scriptNamePattern') or None,
+            required_outputs=tuple(spec.get('requiredOutputs', ())),
+            description=spec.get('description', ''),
+        )
+
+
+class PhaseRuleSet:
+    """Build-phase rules compiled for one lookup per phase"""
+
+    def __init__(self, rules: List[PhaseRule]):
+        self.rules = rules
+        self.exact: Dict[str, PhaseRule] = {}
+        self._patterns: Dict[str, PhaseRule] = {}
+        # Tried in order: a combined regex (rule None, the group names the
+        # rule) or one pattern searched alone
+        self._matchers: List[Tuple[re.Pattern, Optional[PhaseRule]]] = []
+        alternatives: List[str] = []
+        for rule in rules:
+            if rule.script_name is not None:
+                self.exact.setdefault(rule.script_name, rule)
+            elif rule.pattern is not None:
+                try:
+                    compiled = re.compile(rule.pattern)
+                except re.error as e:
+                    raise ValueError(f"Phase rule {rule.id} has an invalid scriptNamePattern: {e}") from None
+                if compiled.groups or _GLOBAL_FLAGS_RE.match(rule.pattern):
+                    self._add_combined(alternatives)
+                    alternatives = []
+                    self._matchers.append((compiled, rule))
+                    continue
+                group = f'p{len(self._patterns)}'
+                self._patterns[group] = rule
+                # Each alternative scans the whole name itself, so the
+                # alternation order (protocol order) decides precedence
+                # rather than which pattern matches furthest left
+                alternatives.append(f'(?P<{group}>(?s:.*?)(?:{rule.pattern}))')
+        self._add_combined(alternatives)
+
+    def _add_combined(self, alternatives: List[str]):
+        if alternatives:
+            self._matchers.append((re.compile('|'.join(alternatives)), None))
+
+    @classmethod
+    def from_protocol(cls, specs: List[Dict]) -> 'PhaseRuleSet':
+        return cls([PhaseRule.from_protocol(spec) for spec in specs])
+
+    def match(self, phase_name: str) -> Optional[PhaseRule]:
+        """The rule that applies to a phase name, if any"""
+        rule = self.exact.get(phase_name)
+        if rule is not None:
+            return rule
+        for pattern, rule in self._matchers:
+            if rule is not None:
+                if pattern.search(phase_name):
+                    return rule
+                continue
+            found = pattern.match(phase_name)
+            if found:
+                return self._patterns[found.lastgroup]
+        return None
@@ -0,0 +1,209 @@
+"""
+Incremental-build readiness of shell script phases.
+
+Xcode skips a PBXShellScriptBuildPhase on a no-op build only when it can
+tell nothing changed: the phase declares outputs (outputPaths, or the
+entries of its outputFileListPaths .xcfilelists) and inputs to compare them
+against, and is not marked `alwaysOutOfDate = 1`. Each phase of a target is
+classified as
+
+    dependency-tracked  skipped when its inputs are older than its outputs
+    always-run          runs on every build (no outputs, no inputs, or
+                        alwaysOutOfDate)
+    broken              a file list it names is missing or empty, so the
+                        build fails or the phase silently tracks nothing
+    unresolved          otherwise tracked, but a file list path could not
+                        be expanded, so whether it exists is unknown
+
+Paths are expanded with the target's effective build settings for each of
+its configurations, since CocoaPods file lists are per configuration
+(`...-${CONFIGURATION}-input-files.xcfilelist`). File lists whose path still
+holds an unknown reference after expansion (PODS_ROOT before `pod install`)
+cannot be checked: the phase is reported as unresolved rather than broken,
+and a target with such a phase is not counted as ready.
+
+Every configuration is checked before a phase is classified, and the first
+status that applies wins: broken, always-run, unresolved, dependency-tracked.
+A list found missing or empty for one configuration breaks the phase even
+when it cannot be expanded for another, since that configuration fails
+either way; the unresolved finding is still reported alongside.
+"""
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from .model import PBXShellScriptBuildPhase
+from .xcconfig import SettingsResolver
+
+ALWAYS_RUN = 'always-run'
+DEPENDENCY_TRACKED = 'dependency-tracked'
+BROKEN = 'broken'
+UNRESOLVED = 'unresolved'
+
+_BROKEN_KINDS = frozenset(('filelist_missing', 'filelist_empty'))
+_ALWAYS_RUN_KINDS = frozenset(('always_out_of_date', 'no_outputs', 'empty_outputs', 'no_inputs'))
+
+
+def read_file_list(path: Path) -> Optional[List[str]]:
+    """Entries of an .xcfilelist (one path per line, # comments), None if missing"""
+    try:
+        text = Path(path).read_text(encoding='utf-8', errors='replace')
+    except OSError:
+        return None
+    entries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            entries.append(line)
+    return entries
+
+
+class PhaseFinding(NamedTuple):
+    # 'always_out_of_date', 'no_outputs', 'empty_outputs', 'no_inputs',
+    # 'filelist_missing', 'filelist_empty' or 'unresolved'
+    kind: str
+    detail: str
+
+
+class PhaseReadiness(NamedTuple):
+    phase_id: str
+    name: str
+    status: str
+    findings: List[PhaseFinding]
+    inputs: int
+    outputs: int
+
+    def to_dict(self) -> Dict:
+        return {
+            'phase_id': self.phase_id,
+            'name': self.name,
+            'status': self.status,
+            'inputs': self.inputs,
+            'outputs': self.outputs,
+            'findings': [finding._asdict() for finding in self.findings],
+        }
+
+
+class TargetReadiness(NamedTuple):
+    target_id: str
+    name: str
+    phases: List[PhaseReadiness]
+
+    def count(self, status: str) -> int:
+        return sum(1 for phase in self.phases if phase.status == status)
+
+    @property
+    def ready(self) -> bool:
+        """True when every script phase can be skipped on a no-op build"""
+        return all(phase.status == DEPENDENCY_TRACKED for phase in self.phases)
+
+    def summary(self) -> Dict:
+        return {
+            'target': self.name,
+            'target_id': self.target_id,
+            'script_phases': len(self.phases),
+            'dependency_tracked': self.count(DEPENDENCY_TRACKED),
+            'always_run': self.count(ALWAYS_RUN),
+            'broken': self.count(BROKEN),
+            'unresolved': self.count(UNRESOLVED),
+            'ready': self.ready,
+            'phases': [phase.to_dict() for phase in self.phases],
+        }
+
+
+class ReadinessAnalyzer:
+    """Classifies the script phases of one project, reading each file list once"""
+
+    def __init__(self, resolver: SettingsResolver):
+        self.resolver = resolver
+        self.project = resolver.project
+        self._file_lists: Dict[Path, Optional[List[str]]] = {}
+
+    def file_list(self, path: Path) -> Optional[List[str]]:
+        if path not in self._file_lists:
+            self._file_lists[path] = read_file_list(path)
+        return self._file_lists[path]
+
+    def resolve_path(self, target_id: str, configuration: str, path: str) -> Optional[Path]:
+        """A phase path expanded for one configuration; None if a reference is unknown"""
+        expanded = self.resolver.expand(target_id, configuration, path)
+        if '$(' in expanded or '${' in expanded:
+            return None
+        resolved = Path(expanded)
+        # Relative phase paths are relative to SRCROOT
+        return resolved if resolved.is_absolute() else self.resolver.project_dir / resolved
+
+    def _file_lists_of(self, phase: PBXShellScriptBuildPhase, field: str, target_id: str,
+                       configurations: List[str], findings: List[PhaseFinding]) -> Optional[int]:
+        """Largest entry count over the configurations; None if nothing could be read"""
+        entries = None
+        for path in phase.get(field) or ():
+            unresolved, missing, empty = [], [], []
+            for configuration in configurations:
+                resolved = self.resolve_path(target_id, configuration, path)
+                if resolved is None:
+                    unresolved.append(configuration)
+                    continue
+                listed = self.file_list(resolved)
+                if listed is None:
+                    missing.append(configuration)
+                elif not listed:
+                    empty.append(configuration)
+                else:
+                    entries = max(entries or 0, len(listed))
+            if unresolved:
+                findings.append(PhaseFinding('unresolved', f"{path} for {', '.join(unresolved)}"))
+            if missing:
+                findings.append(PhaseFinding('filelist_missing', f"{path} for {', '.join(missing)}"))
+            if empty:
+                findings.append(PhaseFinding('filelist_empty', f"{path} for {', '.join(empty)}"))
+        return entries
+
+    def phase(self, phase: PBXShellScriptBuildPhase, target_id: str,
+              configurations: List[str]) -> PhaseReadiness:
+        findings: List[PhaseFinding] = []
+        input_paths = [path for path in phase.inputPaths or () if path]
+        output_paths = [path for path in phase.outputPaths or () if path]
+        listed_inputs = self._file_lists_of(phase, 'inputFileListPaths', target_id, configurations, findings)
+        listed_outputs = self._file_lists_of(phase, 'outputFileListPaths', target_id, configurations, findings)
+        inputs = len(input_paths) + (listed_inputs or 0)
+        outputs = len(output_paths) + (listed_outputs or 0)
+
+        # A list that could not be expanded still counts as declared
+        has_inputs = bool(input_paths or phase.inputFileListPaths)
+        has_outputs = bool(output_paths or phase.outputFileListPaths)
+        if str(phase.alwaysOutOfDate) == '1':
+            findings.append(PhaseFinding('always_out_of_date', 'alwaysOutOfDate = 1'))
+        elif not has_outputs:
+            if phase.outputPaths is None and phase.outputFileListPaths is None:
+                findings.append(PhaseFinding('no_outputs', 'no outputPaths or outputFileListPaths'))
+            else:
+                findings.append(PhaseFinding('empty_outputs', 'outputPaths and outputFileListPaths are empty'))
+        elif not has_inputs:
+            findings.append(PhaseFinding('no_inputs', 'no inputPaths or inputFileListPaths'))
+
+        kinds = {finding.kind for finding in findings}
+        if kinds & _BROKEN_KINDS:
+            status = BROKEN
+        elif kinds & _ALWAYS_RUN_KINDS:
+            status = ALWAYS_RUN
+        elif 'unresolved' in kinds:
+            status = UNRESOLVED
+        else:
+            status = DEPENDENCY_TRACKED
+        return PhaseReadiness(phase.id, phase.display_name, status, findings, inputs, outputs)
+
+    def target(self, target_id: str, name: str) -> TargetReadiness:
+        configurations = self.resolver.configuration_names(target_id)
+        phases = [self.phase(phase, target_id, configurations)
+                  for phase in self.project.graph.phases_of(target_id, 'PBXShellScriptBuildPhase')]
+        return TargetReadiness(target_id, name, phases)
+
+    def targets(self) -> List[TargetReadiness]:
+        """Readiness of every target that has script phases, in project order"""
+        readiness = []
+        for target_id, name in self.resolver.targets():
+            target = self.target(target_id, name)
+            if target.phases:
+                readiness.append(target)
+        return readiness
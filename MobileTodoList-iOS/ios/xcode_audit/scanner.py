@@ -0,0 +1,310 @@
+"""
+Multi-pattern source scanner for the protocol's `sourceRules`.
+
+Every rule is folded into one compiled bytes regex, so each file is read
+once and searched in a single pass no matter how many rules there are:
+
+  - literal rules become one trie-shaped alternation (common prefixes are
+    shared, so a position that can't start any literal fails after one
+    byte instead of after trying every literal in turn);
+  - regex rules are appended as further alternatives.
+
+The combined pattern has no groups or lookarounds of its own, which keeps
+re's first-byte prefilter working: the C scanner skips to the next byte
+that could start any rule. Only at a hit are the individual rules checked,
+and the search resumes one byte later, so a match of one rule never hides
+an overlapping match of another. Matches of the same rule don't overlap,
+as with re.finditer.
+
+Regex rules are compiled on their own first, so a bad one is reported with
+its rule id. A regex with capturing groups of its own (backreferences, named
+groups) or with inline global flags (`(?i)...`, only valid at the start of
+a pattern) would break the combined pattern, so it is left out and searched
+separately with finditer; its matches are merged in by offset.
+
+A rule looks like:
+
+    {
+      "id": "CC001",
+      "issueId": "CC001_CALLSEQFACTORY",
+      "literal": "CallSeqFactory",          (or "regex": "...")
+      "severity": "error",
+      "description": "...",
+      "solution": "...",
+      "replacement": "callInvoker_->invokeAsync",  (optional, enables --fix)
+      "fixAction": "replaced_callseqfactory",      (optional)
+      "extensions": [".mm", ".h"]                  (optional)
+    }
+
+With jobs > 1, scan_paths() spreads files over a process pool in
+size-balanced chunks. Larger files are mmapped rather than read, and
+results come back in input order regardless of which worker finishes
+first, so a parallel run reports exactly what a serial run does.
+"""
+
+import heapq
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Below this size a plain read() is cheaper than setting up a mapping
+MMAP_MIN_BYTES = 64 * 1024
+# Chunks per worker: enough to even out a few unexpectedly slow files
+CHUNKS_PER_JOB = 4
+# Leading inline global flags, which can't be part of a larger alternation
+_GLOBAL_FLAGS_RE = re.compile(rb'\(\?[aiLmsux]+\)')
+
+
+class SourceRule(NamedTuple):
+    id: str
+    issue_id: str
+    literal: Optional[bytes]
+    regex: Optional[bytes]
+    severity: str
+    description: str
+    solution: Optional[str]
+    replacement: Optional[bytes]
+    fix_action: str
+    extensions: Optional[frozenset]
+
+    @classmethod
+    def from_protocol(cls, spec: Dict) -> 'SourceRule':
+        if ('literal' in spec) == ('regex' in spec):
+            raise ValueError(f"Source rule {spec.get('id')} needs exactly one of literal/regex")
+        literal = spec.get('literal')
+        regex = spec.get('regex')
+        replacement = spec.get('replacement')
+        extensions = spec.get('extensions')
+        return cls(
+            id=spec['id'],
+            issue_id=spec.get('issueId', spec['id']),
+            literal=literal.encode() if literal is not None else None,
+            regex=regex.encode() if regex is not None else None,
+            severity=spec.get('severity', 'warning'),
+            description=spec.get('description', ''),
+            solution=spec.get('solution'),
+            replacement=replacement.encode() if replacement is not None else None,
+            fix_action=spec.get('fixAction', 'replaced_source'),
+            extensions=frozenset(extensions) if extensions else None,
+        )
+
+    def applies_to(self, path: Path) -> bool:
+        return self.extensions is None or path.suffix in self.extensions
+
+    def apply_fix(self, data: bytes) -> bytes:
+        """data with every match of this rule replaced (unchanged without a replacement)"""
+        if self.replacement is None:
+            return data
+        if self.literal is not None:
+            return data.replace(self.literal, self.replacement)
+        return re.sub(self.regex, self.replacement, data)
+
+
+class SourceMatch(NamedTuple):
+    rule: SourceRule
+    offset: int
+    line: int
+    column: int
+    text: bytes
+
+
+def _trie_pattern(literals: Iterable[bytes]) -> bytes:
+    """Alternation of literals with shared prefixes factored out"""
+    trie: Dict = {}
+    for literal in literals:
+        node = trie
+        for byte in literal:
+            node = node.setdefault(byte, {})
+        node[None] = True
+
+    def render(node: Dict) -> bytes:
+        branches = [re.escape(bytes([byte])) + render(child)
+                    for byte, child in sorted((k, v) for k, v in node.items() if k is not None)]
+        if not branches:
+            return b''
+        body = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+        if None in node:
+            # A literal ends here: prefer the longer continuation (greedy),
+            # shorter literals are recovered from SourceScanner._prefixes
+            return b'(?:' + body + b')?'
+        return body
+
+    return render(trie)
+
+
+class SourceScanner:
+    """All source rules compiled into one matcher"""
+
+    def __init__(self, rules: Iterable[SourceRule]):
+        self.rules = list(rules)
+        self._by_literal: Dict[bytes, List[SourceRule]] = {}
+        regex_rules = []
+        for rule in self.rules:
+            if rule.literal is not None:
+                self._by_literal.setdefault(rule.literal, []).append(rule)
+            else:
+                regex_rules.append(rule)
+        # Literals that are proper prefixes of another literal
+        literals = sorted(self._by_literal)
+        self._prefixes: Dict[bytes, List[bytes]] = {
+            literal: [other for other in literals if other != literal and literal.startswith(other)]
+            for literal in literals
+        }
+
+        # Checked one by one, anchored at each hit of the combined pattern
+        self._literals = re.compile(_trie_pattern(literals)) if literals else None
+        self._regex_rules: List[Tuple[SourceRule, re.Pattern]] = []
+        self._separate_rules: List[Tuple[SourceRule, re.Pattern]] = []
+        for rule in regex_rules:
+            try:
+                pattern = re.compile(rule.regex)
+            except re.error as e:
+                raise ValueError(f"Source rule {rule.id} has an invalid regex: {e}") from None
+            alone = pattern.groups or _GLOBAL_FLAGS_RE.match(rule.regex)
+            (self._separate_rules if alone else self._regex_rules).append((rule, pattern))
+        alternatives = [pattern.pattern for _, pattern in self._regex_rules]
+        if self._literals is not None:
+            alternatives.insert(0, self._literals.pattern)
+        self._pattern = None
+        if alternatives:
+            self._pattern = re.compile(b'|'.join(b'(?:' + p + b')' for p in alternatives))
+
+    @classmethod
+    def from_protocol(cls, specs: Iterable[Dict]) -> 'SourceScanner':
+        return cls(SourceRule.from_protocol(spec) for spec in specs)
+
+    def _hits(self, data: bytes) -> Iterable[Tuple[int, SourceRule, bytes]]:
+        sources = [_finditer_hits(rule, pattern, data) for rule, pattern in self._separate_rules]
+        if self._pattern is not None:
+            sources.insert(0, self._combined_hits(data))
+        # Ties at one offset keep the combined pattern's rules first
+        return heapq.merge(*sources, key=lambda hit: hit[0])
+
+    def _combined_hits(self, data: bytes) -> Iterator[Tuple[int, SourceRule, bytes]]:
+        search = self._pattern.search
+        rule_ends: Dict[int, int] = {}
+        match = search(data)
+        while match is not None:
+            offset = match.start()
+            hits = []
+            if self._literals is not None:
+                literal = self._literals.match(data, offset)
+                if literal is not None:
+                    text = literal.group()
+                    hits.extend((rule, matched) for matched in [text] + self._prefixes[text]
+                                for rule in self._by_literal[matched])
+            for rule, pattern in self._regex_rules:
+                found = pattern.match(data, offset)
+                if found is not None:
+                    hits.append((rule, found.group()))
+            for rule, matched in hits:
+                if rule_ends.get(id(rule), 0) > offset:
+                    continue
+                rule_ends[id(rule)] = offset + max(len(matched), 1)
+                yield offset, rule, matched
+            match = search(data, offset + 1)
+
+    def scan(self, path: Path, data: bytes) -> List[SourceMatch]:
+        """Every rule match in one file, ordered by offset, with 1-based line/column"""
+        if self._pattern is None and not self._separate_rules:
+            return []
+        found = []
+        line = 1
+        counted = 0
+        for offset, rule, text in self._hits(data):
+            if not rule.applies_to(path):
+                continue
+            line += _count_newlines(data, counted, offset)
+            counted = offset
+            line_start = data.rfind(b'\n', 0, offset) + 1
+            found.append(SourceMatch(rule, offset, line, offset - line_start + 1, text))
+        return found
+
+    def scan_file(self, path: Path) -> List[SourceMatch]:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+                return self.scan(path, f.read())
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return self.scan(path, data)
+        finally:
+            data.close()
+
+    def scan_paths(self, paths: List[Path], jobs: int = 1
+                   ) -> Iterator[Tuple[Path, List[SourceMatch], Optional[str]]]:
+        """(path, matches, error) for each path, in input order"""
+        if jobs <= 1 or len(paths) < 2:
+            for path in paths:
+                yield _scan_one(self, path)
+            return
+
+        sizes = []
+        for path in paths:
+            try:
+                sizes.append(path.stat().st_size)
+            except OSError:
+                sizes.append(0)
+        chunks = balanced_chunks(range(len(paths)), sizes, jobs * CHUNKS_PER_JOB)
+        done: Dict[int, Tuple[Path, List[SourceMatch], Optional[str]]] = {}
+        next_index = 0
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(self,)) as pool:
+            futures = {pool.submit(_scan_chunk, [paths[i] for i in chunk]): chunk
+                       for chunk in chunks}
+            for future in as_completed(futures):
+                for i, result in zip(futures[future], future.result()):
+                    done[i] = result
+                # Release everything that is now contiguous from the front
+                while next_index in done:
+                    yield done.pop(next_index)
+                    next_index += 1
+
+
+def _finditer_hits(rule: SourceRule, pattern: re.Pattern, data: bytes
+                   ) -> Iterator[Tuple[int, SourceRule, bytes]]:
+    for found in pattern.finditer(data):
+        yield found.start(), rule, found.group()
+
+
+def _count_newlines(data, start: int, end: int) -> int:
+    if isinstance(data, bytes):
+        return data.count(b'\n', start, end)
+    return data[start:end].count(b'\n')
+
+
+def balanced_chunks(items: Iterable[int], sizes: List[int], count: int) -> List[List[int]]:
+    """Split item indexes into up to `count` chunks of similar total size
+
+    Largest-first greedy assignment to the lightest chunk; each chunk keeps
+    its items in ascending order.
+    """
+    items = sorted(items, key=lambda i: sizes[i], reverse=True)
+    count = max(1, min(count, len(items)))
+    heap = [(0, n) for n in range(count)]
+    chunks: List[List[int]] = [[] for _ in range(count)]
+    for i in items:
+        total, n = heapq.heappop(heap)
+        chunks[n].append(i)
+        heapq.heappush(heap, (total + sizes[i], n))
+    return [sorted(chunk) for chunk in chunks if chunk]
+
+
+def _scan_one(scanner: SourceScanner, path: Path) -> Tuple[Path, List[SourceMatch], Optional[str]]:
+    try:
+        return path, scanner.scan_file(path), None
+    except OSError as e:
+        return path, [], str(e)
+
+
+_worker_scanner: Optional[SourceScanner] = None
+
+
+def _init_worker(scanner: SourceScanner):
+    global _worker_scanner
+    _worker_scanner = scanner
+
+
+def _scan_chunk(paths: List[Path]) -> List[Tuple[Path, List[SourceMatch], Optional[str]]]:
+    return [_scan_one(_worker_scanner, path) for path in paths]
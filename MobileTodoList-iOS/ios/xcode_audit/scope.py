@@ -0,0 +1,102 @@
+"""
+Git-aware audit scope for `--since <ref>`.
+
+Local git supplies the paths changed between the merge base of <ref> and
+HEAD and the working tree (untracked files included). Source checks only
+look at those paths. For project.pbxproj the base blob is parsed as well
+and the two object tables are compared, so build-phase and configuration
+checks only report objects that were added or modified.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Set
+
+from .pbxproj import PBXParseError, PBXProject
+
+
+class GitScopeError(RuntimeError):
+    """git could not resolve the requested base ref"""
+
+
+def _git(cwd: Path, *args: str) -> bytes:
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, check=True)
+    except FileNotFoundError:
+        raise GitScopeError("git is not installed")
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode('utf-8', 'replace').strip()
+        raise GitScopeError(f"git {' '.join(args)} failed: {message}")
+    return result.stdout
+
+
+def diff_objects(base: PBXProject, head: PBXProject) -> Set[str]:
+    """IDs of objects in head that are new or differ from base
+
+    Entries with identical bytes are skipped without decoding; the rest are
+    compared field by field, so reformatting or comment-only changes don't
+    count as modifications.
+    """
+    changed = set()
+    for object_id in head.index:
+        if object_id not in base.index:
+            changed.add(object_id)
+            continue
+        if head.raw(object_id) == base.raw(object_id):
+            continue
+        if list(head.get(object_id).items()) != list(base.get(object_id).items()):
+            changed.add(object_id)
+    return changed
+
+
+class AuditScope:
+    """Paths and pbxproj objects changed relative to a base ref"""
+
+    def __init__(self, root: Path, ref: str):
+        self.root = Path(root).resolve()
+        self.ref = ref
+        self.toplevel = Path(_git(self.root, 'rev-parse', '--show-toplevel').decode().strip())
+        commit = _git(self.root, 'rev-parse', '--verify', f'{ref}^{{commit}}').decode().strip()
+        try:
+            commit = _git(self.root, 'merge-base', commit, 'HEAD').decode().strip()
+        except GitScopeError:
+            pass
+        self.base_commit = commit
+
+        names = _git(self.toplevel, 'diff', '--name-only', '--no-renames', '-z', commit, '--')
+        names += _git(self.toplevel, 'ls-files', '--others', '--exclude-standard', '-z')
+        self.paths: Set[Path] = {
+            self.toplevel / name.decode('utf-8', 'surrogateescape')
+            for name in names.split(b'\0') if name
+        }
+        self._objects: Dict[Path, Set[str]] = {}
+
+    def includes(self, path: Path) -> bool:
+        return Path(path).resolve() in self.paths
+
+    def base_blob(self, path: Path) -> Optional[bytes]:
+        """Contents of path at the base commit (None if it didn't exist)"""
+        relative = Path(path).resolve().relative_to(self.toplevel).as_posix()
+        try:
+            return _git(self.toplevel, 'cat-file', 'blob', f'{self.base_commit}:{relative}')
+        except GitScopeError:
+            return None
+
+    def changed_objects(self, pbxproj: Path, project: PBXProject) -> Set[str]:
+        """Objects of the working-copy project added or modified since the base"""
+        pbxproj = Path(pbxproj).resolve()
+        changed = self._objects.get(pbxproj)
+        if changed is None:
+            if not self.includes(pbxproj):
+                changed = set()
+            else:
+                # Everything counts as new if the file didn't exist or parse at the base
+                changed = set(project.index)
+                data = self.base_blob(pbxproj)
+                if data is not None:
+                    try:
+                        changed = diff_objects(PBXProject(pbxproj, data), project)
+                    except PBXParseError:
+                        pass
+            self._objects[pbxproj] = changed
+        return changed
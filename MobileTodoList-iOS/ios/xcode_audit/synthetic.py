@@ -0,0 +1,294 @@
+"""
+Synthetic project.pbxproj files for benchmarking the auditor and fixers.
+
+A project has N native targets, each with K source files (a PBXFileReference,
+a PBXBuildFile and a group entry per file), a sources and a frameworks
+phase, M script phases and Debug/Release configurations. Script phases
+cycle through the names the protocol rules target, and every other one has
+no outputPaths, so the build-phase audit and fixers have work to do.
+OTHER_LDFLAGS repeats -lc++ and -ObjC `duplicates` extra times per
+configuration for the flag dedupe.
+
+Output is laid out the way Xcode writes it (sorted sections and IDs,
+comments), so parse and patch costs match a real project of the same size.
+
+Usage:
+  python3 -m xcode_audit.synthetic --preset pods -o /tmp/Pods.pbxproj
+  python3 -m xcode_audit.synthetic --targets 40 --script-phases 3 --build-files 200 -o out.pbxproj
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from .pbxproj import quote
+
+
+class ProjectShape(NamedTuple):
+    targets: int
+    script_phases: int  # per target
+    build_files: int  # per target
+    duplicates: int  # extra -lc++/-ObjC per OTHER_LDFLAGS
+
+
+# From about the app project up to a large Pods project (20+ MB)
+PRESETS: Dict[str, ProjectShape] = {
+    'app': ProjectShape(targets=2, script_phases=3, build_files=60, duplicates=1),
+    'medium': ProjectShape(targets=40, script_phases=3, build_files=100, duplicates=1),
+    'large': ProjectShape(targets=150, script_phases=2, build_files=200, duplicates=2),
+    'pods': ProjectShape(targets=400, script_phases=2, build_files=110, duplicates=2),
+}
+
+PHASE_NAMES = (
+    'Bundle React Native code and images',
+    '[CP-User] [RNFB] Core Configuration',
+    '[CP] Copy Pods Resources',
+    '[CP] Embed Pods Frameworks',
+    'Run Script',
+)
+
+_FILE_TYPES = (('m', 'sourcecode.c.objc'), ('swift', 'sourcecode.swift'),
+               ('mm', 'sourcecode.cpp.objcpp'), ('c', 'sourcecode.c.c'))
+
+
+def _object(object_id: str, comment: str, fields: List[Tuple[str, str]], inline: bool) -> str:
+    head = f"\t\t{object_id} /* {comment} */ = {{"
+    if inline:
+        return head + ''.join(f"{key} = {value}; " for key, value in fields) + "};\n"
+    body = ''.join(f"\t\t\t{key} = {value};\n" for key, value in fields)
+    return f"{head}\n{body}\t\t}};\n"
+
+
+def _list(items: List[str], indent: str = '\t\t\t') -> str:
+    if not items:
+        return '(\n' + indent + ')'
+    return '(\n' + ''.join(f"{indent}\t{item},\n" for item in items) + indent + ')'
+
+
+class _Ids:
+    """Deterministic 24-hex-digit object IDs"""
+
+    def __init__(self, seed: int):
+        self.prefix = f"{seed & 0xFFFFFFFF:08X}"
+        self.counter = 0
+
+    def next(self) -> str:
+        self.counter += 1
+        return f"{self.prefix}{self.counter:016X}"
+
+
+def generate_pbxproj(shape: ProjectShape, seed: int = 0) -> str:
+    """A complete project.pbxproj for the given shape"""
+    ids = _Ids(seed)
+    sections: Dict[str, List[Tuple[str, str]]] = {}
+
+    def add(isa: str, object_id: str, text: str) -> None:
+        sections.setdefault(isa, []).append((object_id, text))
+
+    def configuration_list(owner: str, comment: str, settings: Dict[str, str]) -> str:
+        configs = []
+        for name in ('Debug', 'Release'):
+            config_id = ids.next()
+            rendered = ''.join(f"\t\t\t\t{key} = {value};\n" for key, value in sorted(settings.items()))
+            add('XCBuildConfiguration', config_id, _object(config_id, name, [
+                ('isa', 'XCBuildConfiguration'),
+                ('buildSettings', '{\n' + rendered + '\t\t\t}'),
+                ('name', name),
+            ], inline=False))
+            configs.append(f"{config_id} /* {name} */")
+        list_id = ids.next()
+        add('XCConfigurationList', list_id, _object(
+            list_id, f'Build configuration list for {comment} "{owner}"', [
+                ('isa', 'XCConfigurationList'),
+                ('buildConfigurations', _list(configs)),
+                ('defaultConfigurationIsVisible', '0'),
+                ('defaultConfigurationName', 'Release'),
+            ], inline=False))
+        return f'{list_id} /* Build configuration list for {comment} "{owner}" */'
+
+    ldflags = ['"$(inherited)"', '"-ObjC"', '"-lc++"']
+    ldflags += ['"-lc++"', '"-ObjC"'] * shape.duplicates
+    ldflags_value = _list(ldflags, '\t\t\t\t')
+
+    main_group = ids.next()
+    products_group = ids.next()
+    project_id = ids.next()
+    group_children = []
+    product_children = []
+    target_refs = []
+
+    for index in range(shape.targets):
+        name = f"Module{index:04d}"
+        group_id = ids.next()
+        files = []
+        sources = []
+        frameworks = []
+        for number in range(shape.build_files):
+            extension, file_type = _FILE_TYPES[number % len(_FILE_TYPES)]
+            file_name = f"{name}File{number:04d}.{extension}"
+            ref_id, build_id = ids.next(), ids.next()
+            add('PBXFileReference', ref_id, _object(ref_id, file_name, [
+                ('isa', 'PBXFileReference'),
+                ('fileEncoding', '4'),
+                ('lastKnownFileType', file_type),
+                ('path', quote(file_name)),
+                ('sourceTree', '"<group>"'),
+            ], inline=True))
+            add('PBXBuildFile', build_id, _object(build_id, f"{file_name} in Sources", [
+                ('isa', 'PBXBuildFile'),
+                ('fileRef', f"{ref_id} /* {file_name} */"),
+            ], inline=True))
+            files.append(f"{ref_id} /* {file_name} */")
+            sources.append(f"{build_id} /* {file_name} in Sources */")
+
+        product = f"lib{name}.a"
+        product_id = ids.next()
+        add('PBXFileReference', product_id, _object(product_id, product, [
+            ('isa', 'PBXFileReference'),
+            ('explicitFileType', 'archive.ar'),
+            ('includeInIndex', '0'),
+            ('path', quote(product)),
+            ('sourceTree', 'BUILT_PRODUCTS_DIR'),
+        ], inline=True))
+        product_children.append(f"{product_id} /* {product} */")
+
+        add('PBXGroup', group_id, _object(group_id, name, [
+            ('isa', 'PBXGroup'),
+            ('children', _list(files)),
+            ('path', name),
+            ('sourceTree', '"<group>"'),
+        ], inline=False))
+        group_children.append(f"{group_id} /* {name} */")
+
+        phases = []
+        sources_id = ids.next()
+        add('PBXSourcesBuildPhase', sources_id, _object(sources_id, 'Sources', [
+            ('isa', 'PBXSourcesBuildPhase'),
+            ('buildActionMask', '2147483647'),
+            ('files', _list(sources)),
+            ('runOnlyForDeploymentPostprocessing', '0'),
+        ], inline=False))
+        phases.append(f"{sources_id} /* Sources */")
+        frameworks_id = ids.next()
+        add('PBXFrameworksBuildPhase', frameworks_id, _object(frameworks_id, 'Frameworks', [
+            ('isa', 'PBXFrameworksBuildPhase'),
+            ('buildActionMask', '2147483647'),
+            ('files', _list(frameworks)),
+            ('runOnlyForDeploymentPostprocessing', '0'),
+        ], inline=False))
+        phases.append(f"{frameworks_id} /* Frameworks */")
+
+        for number in range(shape.script_phases):
+            phase_name = PHASE_NAMES[(index + number) % len(PHASE_NAMES)]
+            phase_id = ids.next()
+            fields = [
+                ('isa', 'PBXShellScriptBuildPhase'),
+                ('buildActionMask', '2147483647'),
+                ('files', _list([])),
+                ('inputPaths', _list([quote(f'$(SRCROOT)/{name}/input-{number}.txt')])),
+                ('name', quote(phase_name)),
+            ]
+            if (index + number) % 2:
+                fields.append(('outputPaths', _list([quote(f'$(DERIVED_FILE_DIR)/{name}-{number}.stamp')])))
+            fields += [
+                ('runOnlyForDeploymentPostprocessing', '0'),
+                ('shellPath', '/bin/sh'),
+                ('shellScript', quote(f'echo "{phase_name}" > "$DERIVED_FILE_DIR/{name}-{number}.stamp"\n')),
+            ]
+            add('PBXShellScriptBuildPhase', phase_id, _object(phase_id, phase_name, fields, inline=False))
+            phases.append(f"{phase_id} /* {phase_name} */")
+
+        target_id = ids.next()
+        config_list = configuration_list(name, 'PBXNativeTarget', {
+            'OTHER_LDFLAGS': ldflags_value,
+            'PRODUCT_NAME': '"$(TARGET_NAME)"',
+            'SDKROOT': 'iphoneos',
+        })
+        add('PBXNativeTarget', target_id, _object(target_id, name, [
+            ('isa', 'PBXNativeTarget'),
+            ('buildConfigurationList', config_list),
+            ('buildPhases', _list(phases)),
+            ('buildRules', _list([])),
+            ('dependencies', _list([])),
+            ('name', name),
+            ('productName', name),
+            ('productReference', f"{product_id} /* {product} */"),
+            ('productType', '"com.apple.product-type.library.static"'),
+        ], inline=False))
+        target_refs.append(f"{target_id} /* {name} */")
+
+    add('PBXGroup', products_group, _object(products_group, 'Products', [
+        ('isa', 'PBXGroup'),
+        ('children', _list(product_children)),
+        ('name', 'Products'),
+        ('sourceTree', '"<group>"'),
+    ], inline=False))
+    add('PBXGroup', main_group, _object(main_group, '', [
+        ('isa', 'PBXGroup'),
+        ('children', _list(group_children + [f"{products_group} /* Products */"])),
+        ('sourceTree', '"<group>"'),
+    ], inline=False).replace(' /*  */', ''))
+    project_list = configuration_list('Synthetic', 'PBXProject', {
+        'ALWAYS_SEARCH_USER_PATHS': 'NO',
+        'OTHER_LDFLAGS': ldflags_value,
+    })
+    add('PBXProject', project_id, _object(project_id, 'Project object', [
+        ('isa', 'PBXProject'),
+        ('buildConfigurationList', project_list),
+        ('compatibilityVersion', '"Xcode 14.0"'),
+        ('developmentRegion', 'en'),
+        ('hasScannedForEncodings', '0'),
+        ('knownRegions', _list(['en', 'Base'])),
+        ('mainGroup', main_group),
+        ('productRefGroup', f"{products_group} /* Products */"),
+        ('projectDirPath', '""'),
+        ('projectRoot', '""'),
+        ('targets', _list(target_refs)),
+    ], inline=False))
+
+    out = ['// !$*UTF8*$!\n{\n\tarchiveVersion = 1;\n\tclasses = {\n\t};\n',
+           '\tobjectVersion = 56;\n\tobjects = {\n']
+    for isa in sorted(sections):
+        out.append(f"\n/* Begin {isa} section */\n")
+        out.extend(text for _, text in sorted(sections[isa]))
+        out.append(f"/* End {isa} section */\n")
+    out.append(f'\t}};\n\trootObject = {project_id} /* Project object */;\n}}\n')
+    return ''.join(out)
+
+
+def write_project(directory: Path, shape: ProjectShape, name: str = 'Synthetic', seed: int = 0) -> Path:
+    """Write <directory>/<name>.xcodeproj/project.pbxproj and return its path"""
+    pbxproj = Path(directory) / f"{name}.xcodeproj" / 'project.pbxproj'
+    pbxproj.parent.mkdir(parents=True, exist_ok=True)
+    pbxproj.write_text(generate_pbxproj(shape, seed), encoding='utf-8')
+    return pbxproj
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m xcode_audit.synthetic',
+                                     description='Generate a synthetic project.pbxproj')
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='app')
+    parser.add_argument('--targets', type=int)
+    parser.add_argument('--script-phases', type=int, help='Script phases per target')
+    parser.add_argument('--build-files', type=int, help='Source files per target')
+    parser.add_argument('--duplicates', type=int, help='Extra -lc++/-ObjC per OTHER_LDFLAGS')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args(argv)
+
+    shape = PRESETS[args.preset]._replace(**{
+        field: value for field, value in (
+            ('targets', args.targets), ('script_phases', args.script_phases),
+            ('build_files', args.build_files), ('duplicates', args.duplicates),
+        ) if value is not None
+    })
+    output = Path(args.output)
+    output.write_text(generate_pbxproj(shape, args.seed), encoding='utf-8')
+    print(f"{output}: {output.stat().st_size / 1e6:.1f} MB, {shape.targets} targets, "
+          f"{shape.targets * shape.script_phases} script phases, {shape.targets * shape.build_files} build files")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+"""
+One write per file for a run of several fixers.
+
+Fixers used to load project.pbxproj, patch it, back it up and rewrite it
+one after another. Within a FixTransaction they share one parsed project and
+one PatchSet per pbxproj (edits from different fixers are merged, and
+overlapping ones are rejected), and whole-file rewrites of sources are held
+in memory. commit() then
+
+    1. checks every PatchSet for conflicts, before anything is touched
+    2. backs each changed file up once
+    3. writes and fsyncs all new contents to temporary files
+    4. renames them over the originals and syncs their directories
+
+so an interrupted commit leaves each file either as it was or fully
+rewritten, and a failure before step 4 changes nothing.
+"""
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .patch import PatchSet, stage_file, sync_directory
+from .pbxproj import PBXProject
+
+
+class FixTransaction:
+    """Pending edits to pbxprojs and source files, written together by commit()"""
+
+    def __init__(self, loader: Optional[Callable[[Path], PBXProject]] = None):
+        # The auditor passes its own loader so fixers reuse the audit's parse;
+        # projects from a caller's loader stay the caller's to close
+        self.loader = loader or PBXProject.load
+        self._owns_projects = loader is None
+        self._projects: Dict[Path, PBXProject] = {}
+        self._patches: Dict[Path, PatchSet] = {}
+        self._contents: Dict[Path, bytes] = {}
+
+    def __enter__(self) -> 'FixTransaction':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def project(self, path: Path) -> PBXProject:
+        """The project at path, parsed once per transaction"""
+        path = Path(path)
+        project = self._projects.get(path)
+        if project is None:
+            project = self._projects[path] = self.loader(path)
+        return project
+
+    def patches(self, path: Path) -> PatchSet:
+        """The PatchSet every fixer adds its edits of path to"""
+        path = Path(path)
+        patches = self._patches.get(path)
+        if patches is None:
+            patches = self._patches[path] = PatchSet(self.project(path).data)
+        return patches
+
+    def read(self, path: Path) -> bytes:
+        """Content of a whole-file rewrite target, with edits made so far"""
+        path = Path(path)
+        if path in self._contents:
+            return self._contents[path]
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def replace(self, path: Path, content: bytes):
+        """Rewrite path with content when the transaction commits"""
+        path = Path(path)
+        if path in self._patches:
+            raise ValueError(f"{path} already has patches in this transaction")
+        self._contents[path] = content
+
+    def changed(self) -> List[Path]:
+        """Files commit() would write"""
+        return [path for path, patches in self._patches.items() if patches] + list(self._contents)
+
+    def commit(self, backup: Optional[Callable[[Path], object]] = None) -> List[Path]:
+        """Write every changed file once; returns the paths written"""
+        pending = []
+        for path, patches in self._patches.items():
+            if patches:
+                patches.ordered()
+                pending.append((path, patches.chunks()))
+        for path, content in self._contents.items():
+            pending.append((path, (content,)))
+        if not pending:
+            return []
+
+        if backup is not None:
+            for path, _ in pending:
+                backup(path)
+
+        staged = []
+        try:
+            for path, chunks in pending:
+                staged.append((stage_file(path, chunks), path))
+        except BaseException:
+            for tmp_path, _ in staged:
+                tmp_path.unlink(missing_ok=True)
+            raise
+
+        # The PatchSets read from mmaps of the originals, which stay valid
+        # after the rename since the old inodes live on until closed
+        for position, (tmp_path, path) in enumerate(staged):
+            try:
+                os.replace(tmp_path, path)
+            except BaseException:
+                for leftover, _ in staged[position:]:
+                    leftover.unlink(missing_ok=True)
+                raise
+        for directory in {path.parent for _, path in staged}:
+            sync_directory(directory)
+
+        self._patches.clear()
+        self._contents.clear()
+        return [path for _, path in staged]
+
+    def close(self):
+        """Drop pending edits and close the projects this transaction parsed itself"""
+        if self._owns_projects:
+            for project in self._projects.values():
+                project.close()
+        self._projects.clear()
+        self._patches.clear()
+        self._contents.clear()
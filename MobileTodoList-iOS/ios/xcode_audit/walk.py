@@ -0,0 +1,102 @@
+"""
+Pruned walk of the project tree, shared by every source-level check.
+
+The tree is walked once with os.scandir. Directories matching an ignore glob
+(node_modules, Pods, DerivedData, .git, ...) are pruned before descending,
+and files are bucketed by extension so each check just asks for the
+extensions it cares about.
+
+Ignore globs without a '/' are matched against each path component name
+(`build` ignores a directory called build, not `MyBuildTools/`); globs
+containing a '/' are matched against the path relative to the root.
+"""
+
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern
+
+DEFAULT_IGNORE = (
+    '.git',
+    '.xcode_backup',
+    '.xcode_cache',
+    'build',
+    'DerivedData',
+    'node_modules',
+    'Pods',
+)
+
+
+def _compile_globs(globs: Iterable[str]) -> Optional[Pattern]:
+    globs = list(globs)
+    if not globs:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(glob)})' for glob in globs))
+
+
+class SourceWalker:
+    """Single pruned directory walk, grouped by file extension"""
+
+    def __init__(self, root: Path, ignore: Iterable[str] = DEFAULT_IGNORE):
+        self.root = Path(root)
+        ignore = list(ignore)
+        self._name_ignore = _compile_globs(g for g in ignore if '/' not in g)
+        self._path_ignore = _compile_globs(g.strip('/') for g in ignore if '/' in g)
+        self._by_ext: Optional[Dict[str, List[Path]]] = None
+        self._directories: List[Path] = []
+
+    def ignored(self, name: str, rel_path: str) -> bool:
+        if self._name_ignore is not None and self._name_ignore.match(name):
+            return True
+        return self._path_ignore is not None and bool(self._path_ignore.match(rel_path))
+
+    def _walk(self) -> Dict[str, List[Path]]:
+        by_ext: Dict[str, List[Path]] = {}
+        self._directories = []
+        stack = [(str(self.root), '')]
+        while stack:
+            directory, rel_dir = stack.pop()
+            self._directories.append(Path(directory))
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            subdirs = []
+            for entry in entries:
+                rel_path = f"{rel_dir}{entry.name}"
+                if self.ignored(entry.name, rel_path):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((entry.path, rel_path + '/'))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                ext = os.path.splitext(entry.name)[1]
+                if ext:
+                    by_ext.setdefault(ext, []).append(Path(entry.path))
+            stack.extend(reversed(subdirs))
+        return by_ext
+
+    def files(self, extensions: Iterable[str]) -> List[Path]:
+        """Files with any of the given extensions, in walk order per extension"""
+        if self._by_ext is None:
+            self._by_ext = self._walk()
+        found = []
+        for ext in extensions:
+            found.extend(self._by_ext.get(ext, ()))
+        return found
+
+    def directories(self) -> List[Path]:
+        """Every directory the walk descended into, the root first"""
+        if self._by_ext is None:
+            self._by_ext = self._walk()
+        return list(self._directories)
+
+    def invalidate(self):
+        """Forget the walk so the next files() call rescans the tree"""
+        self._by_ext = None
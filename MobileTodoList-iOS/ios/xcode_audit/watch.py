@@ -0,0 +1,147 @@
+"""
+File watching for `xcode_auditor.py --watch`.
+
+On Linux, directories are watched with inotify through libc (no extra
+packages). Elsewhere, or when inotify is unavailable, a polling watcher
+compares (mtime_ns, size) snapshots of the watched files.
+
+Xcode and CocoaPods save project.pbxproj and Podfile.lock by writing a
+temporary file and renaming it over the original, and a `pod install`
+touches dozens of files in a burst. Watchers therefore report close-write
+and rename events, and wait_for_changes() keeps collecting until the tree
+has been quiet for the debounce interval.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct('iIII')
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class InotifyWatcher:
+    """Linux inotify on a set of directories, extended to new subdirectories"""
+
+    kind = 'inotify'
+
+    def __init__(self, directories: Iterable[Path], accept_dir: Callable[[Path], bool]):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.accept_dir = accept_dir
+        self._dirs: Dict[int, Path] = {}
+        for directory in directories:
+            self.add(directory)
+
+    def add(self, directory: Path):
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = Path(directory)
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[Path]]:
+        """Paths changed within timeout (empty on timeout, None if events were lost)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[Path] = set()
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and self.accept_dir(path):
+                    self.add(path)
+                    # Files may already exist by the time the watch is in place
+                    changed.update(p for p in path.rglob('*') if p.is_file())
+                continue
+            changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback: compare stat snapshots every `interval` seconds"""
+
+    kind = 'polling'
+
+    def __init__(self, snapshot: Callable[[], Snapshot], interval: float = 1.0):
+        self.snapshot = snapshot
+        self.interval = interval
+        self._last = snapshot()
+
+    def add(self, directory: Path):
+        pass
+
+    def read(self, timeout: Optional[float]) -> Optional[Set[Path]]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if wait > 0:
+                time.sleep(wait)
+            current = self.snapshot()
+            changed = {path for path in current.keys() | self._last.keys()
+                       if current.get(path) != self._last.get(path)}
+            self._last = current
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(directories: Iterable[Path], accept_dir: Callable[[Path], bool],
+                 snapshot: Callable[[], Snapshot], interval: float = 1.0):
+    """inotify where available, polling otherwise"""
+    try:
+        return InotifyWatcher(directories, accept_dir)
+    except (OSError, AttributeError):
+        return PollingWatcher(snapshot, interval)
+
+
+def wait_for_changes(watcher, debounce: float = 0.3) -> Optional[Set[Path]]:
+    """Block until something changes, then until it has been quiet for `debounce` seconds
+
+    Returns the union of changed paths, or None if the watcher lost events
+    and everything should be treated as changed.
+    """
+    changed = watcher.read(None)
+    while changed is not None:
+        more = watcher.read(debounce)
+        if more is None:
+            return None
+        if not more:
+            break
+        changed |= more
+    return changed
@@ -0,0 +1,60 @@
+"""
+Resolve the projects referenced by an .xcworkspace.
+
+contents.xcworkspacedata is a small XML file of FileRef and Group elements
+whose `location` attribute is `<type>:<path>`:
+
+    group:      relative to the enclosing Group (the workspace's directory
+                at the top level)
+    container:  relative to the directory containing the workspace
+    absolute:   an absolute path
+    self:       the project this embedded workspace lives in
+
+CocoaPods workspaces reference the app project and Pods/Pods.xcodeproj
+next to any number of plain files; only .xcodeproj references are kept.
+"""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import List, Optional
+
+
+def _resolve(location: str, base: Path, container: Path, workspace: Path) -> Optional[Path]:
+    kind, _, path = location.partition(':')
+    if kind == 'group':
+        return base / path
+    if kind == 'container':
+        return container / path
+    if kind == 'absolute':
+        return Path(path)
+    if kind == 'self':
+        return workspace.parent
+    return None
+
+
+def workspace_projects(xcworkspace: Path) -> List[Path]:
+    """.xcodeproj directories referenced by a workspace, in file order"""
+    xcworkspace = Path(xcworkspace)
+    container = xcworkspace.parent
+    try:
+        root = ET.parse(xcworkspace / 'contents.xcworkspacedata').getroot()
+    except (OSError, ET.ParseError):
+        return []
+
+    projects: List[Path] = []
+
+    def visit(element: ET.Element, base: Path):
+        for child in element:
+            location = child.get('location', '')
+            resolved = _resolve(location, base, container, xcworkspace)
+            if resolved is None:
+                continue
+            if child.tag == 'Group':
+                visit(child, resolved)
+            elif child.tag == 'FileRef' and resolved.suffix == '.xcodeproj':
+                resolved = Path(*resolved.parts)  # drop '.' segments from empty group paths
+                if resolved not in projects:
+                    projects.append(resolved)
+
+    visit(root, container)
+    return projects
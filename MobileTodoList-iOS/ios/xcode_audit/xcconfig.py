@@ -0,0 +1,287 @@
+"""
+Effective build settings from a project and its xcconfig files.
+
+A target's value for a setting is built up from four levels, lowest first:
+
+    project xcconfig -> project buildSettings -> target xcconfig -> target buildSettings
+
+where the xcconfigs are each XCBuildConfiguration's baseConfigurationReference
+(for CocoaPods, `Pods/Target Support Files/<target>/*.xcconfig`) with their
+`#include` chains inlined. Every assignment whose [sdk=...][config=...][arch=...]
+conditions match stacks on the ones before it, so `$(inherited)` is the value
+built up so far; conditional assignments stack on top of the unconditional
+ones at the same level. `$(VAR)` / `${VAR}` references are then expanded
+against the same target and configuration.
+
+Parsed xcconfig files and every resolved (target, configuration, setting)
+are memoized, so reporting a setting for every target x configuration costs
+one parse per file instead of an `xcodebuild -showBuildSettings` per target.
+References to settings that are neither assigned nor known builtins
+(BUILD_DIR, SDKROOT paths...) are left unexpanded.
+"""
+
+import fnmatch
+import re
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .pbxproj import PBXProject
+
+Conditions = Tuple[Tuple[str, str], ...]
+
+_ASSIGN_RE = re.compile(r'\s*([A-Za-z_][A-Za-z0-9_]*)((?:\[[^\]]*\])*)\s*=(.*)')
+_INCLUDE_RE = re.compile(r'\s*#include\??\s*"([^"]*)"')
+_CONDITION_RE = re.compile(r'\[([^\]]*)\]')
+_INHERITED_RE = re.compile(r'[ \t]*\$[({]inherited[)}]')
+# Innermost references only, so `$(FOO_$(BAR))` expands BAR first
+_REFERENCE_RE = re.compile(r'\$\(([^$()]*)\)|\$\{([^${}]*)\}')
+_IDENTIFIER_RE = re.compile(r'[^A-Za-z0-9.-]')
+_C99_RE = re.compile(r'[^A-Za-z0-9_]')
+_MAX_EXPANSION_PASSES = 32
+
+
+class Assignment(NamedTuple):
+    setting: str
+    conditions: Conditions
+    value: str
+
+
+def split_setting_key(key: str) -> Tuple[str, Conditions]:
+    """`OTHER_LDFLAGS[sdk=iphoneos*][config=Debug]` -> name and conditions"""
+    name, bracket, rest = key.partition('[')
+    if not bracket:
+        return key, ()
+    conditions = []
+    for group in _CONDITION_RE.findall(bracket + rest):
+        for condition in group.split(','):
+            kind, _, pattern = condition.partition('=')
+            conditions.append((kind.strip(), pattern.strip()))
+    return name, tuple(conditions)
+
+
+def _setting_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ' '.join(item for item in value if isinstance(item, str))
+    return value if isinstance(value, str) else ''
+
+
+class _Context(NamedTuple):
+    target_id: str
+    configuration: str
+
+
+class SettingsResolver:
+    """Memoized effective build settings for the targets of one project"""
+
+    def __init__(self, project: PBXProject, project_dir: Path,
+                 sdk: str = 'iphoneos', arch: str = 'arm64'):
+        self.project = project
+        self.project_dir = Path(project_dir)
+        self.sdk = sdk
+        self.arch = arch
+        self._files: Dict[Path, List[Assignment]] = {}
+        self._stacks: Dict[_Context, Dict[str, List[str]]] = {}
+        self._resolved: Dict[Tuple[_Context, str], Optional[str]] = {}
+        self._resolving: Set[Tuple[_Context, str]] = set()
+        self.files_read = 0
+
+    @classmethod
+    def for_pbxproj(cls, project: PBXProject, pbxproj: Path, **kwargs) -> 'SettingsResolver':
+        """Resolver rooted at the project's directory (projectDirPath applied)"""
+        root = project.root_object
+        project_dir = Path(pbxproj).absolute().parent.parent
+        if root is not None and root.get('projectDirPath'):
+            project_dir = project_dir / root['projectDirPath']
+        return cls(project, project_dir, **kwargs)
+
+    # xcconfig files
+
+    def read_xcconfig(self, path: Path) -> List[Assignment]:
+        """Assignments of an xcconfig with its #includes inlined, parsed once per file"""
+        return self._read_xcconfig(Path(path), ())
+
+    def _read_xcconfig(self, path: Path, including: Tuple[Path, ...]) -> List[Assignment]:
+        cached = self._files.get(path)
+        if cached is not None:
+            return cached
+        if path in including:
+            return []
+        try:
+            text = path.read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return []
+        self.files_read += 1
+
+        assignments: List[Assignment] = []
+        for line in text.splitlines():
+            include = _INCLUDE_RE.match(line)
+            if include:
+                target = include.group(1)
+                if not target.startswith('<'):
+                    assignments.extend(self._read_xcconfig(path.parent / target, including + (path,)))
+                continue
+            line = line.split('//', 1)[0]
+            match = _ASSIGN_RE.match(line)
+            if match is None:
+                continue
+            name, conditions = split_setting_key(match.group(1) + match.group(2))
+            value = match.group(3).strip()
+            if value.endswith(';'):
+                value = value[:-1].rstrip()
+            assignments.append(Assignment(name, conditions, value))
+        self._files[path] = assignments
+        return assignments
+
+    # Assignment stacks
+
+    def _matches(self, conditions: Conditions, configuration: str) -> bool:
+        values = {'sdk': self.sdk, 'config': configuration, 'arch': self.arch}
+        for kind, pattern in conditions:
+            actual = values.get(kind)
+            if actual is None or not fnmatch.fnmatchcase(actual, pattern):
+                return False
+        return True
+
+    def _levels(self, owner_id: str, configuration: str) -> List[List[Assignment]]:
+        config = next((c for c in self.project.graph.configurations(owner_id)
+                       if c.get('name') == configuration), None)
+        if config is None:
+            return []
+        levels = []
+        if config.get('baseConfigurationReference'):
+            path = self.project.graph.source_path(config['baseConfigurationReference'], self.project_dir)
+            if path is not None:
+                levels.append(self.read_xcconfig(path))
+        settings = []
+        for key, value in (config.get('buildSettings') or {}).items():
+            name, conditions = split_setting_key(key)
+            settings.append(Assignment(name, conditions, _setting_text(value)))
+        # Unconditional assignments first, then the more specific ones
+        settings.sort(key=lambda assignment: len(assignment.conditions))
+        levels.append(settings)
+        return levels
+
+    def _stack(self, context: _Context) -> Dict[str, List[str]]:
+        stack = self._stacks.get(context)
+        if stack is not None:
+            return stack
+        root = self.project.root_object
+        levels = []
+        if root is not None:
+            levels.extend(self._levels(root.id, context.configuration))
+        if root is None or context.target_id != root.id:
+            levels.extend(self._levels(context.target_id, context.configuration))
+        stack = {}
+        for level in levels:
+            for assignment in level:
+                if self._matches(assignment.conditions, context.configuration):
+                    stack.setdefault(assignment.setting, []).append(assignment.value)
+        self._stacks[context] = stack
+        return stack
+
+    # Resolution
+
+    def _builtins(self, context: _Context) -> Dict[str, str]:
+        target = self.project.get(context.target_id)
+        platform = self.sdk.rstrip('0123456789.')
+        project_dir = str(self.project_dir)
+        builtins = {
+            'CONFIGURATION': context.configuration,
+            'PLATFORM_NAME': platform,
+            'EFFECTIVE_PLATFORM_NAME': '' if platform == 'macosx' else f'-{platform}',
+            'PROJECT_DIR': project_dir,
+            'SOURCE_ROOT': project_dir,
+            'SRCROOT': project_dir,
+            'SDK_NAME': self.sdk,
+        }
+        if target is not None and target.get('name') and target.isa != 'PBXProject':
+            builtins['TARGET_NAME'] = target['name']
+            builtins['PRODUCT_NAME'] = target.get('productName') or target['name']
+        return builtins
+
+    def raw(self, target_id: str, configuration: str, setting: str) -> Optional[str]:
+        """The setting with $(inherited) applied but other references unexpanded"""
+        values = self._stack(_Context(target_id, configuration)).get(setting)
+        if not values:
+            return None
+        composed = ''
+        for value in values:
+            composed = _INHERITED_RE.sub(lambda m: f' {composed}' if composed else '', value).strip()
+        return composed
+
+    def resolve(self, target_id: str, configuration: str, setting: str) -> Optional[str]:
+        """Effective value of one setting for a target (or the project) and configuration"""
+        context = _Context(target_id, configuration)
+        key = (context, setting)
+        if key in self._resolved:
+            return self._resolved[key]
+        if key in self._resolving:
+            return None
+
+        self._resolving.add(key)
+        try:
+            value = self.raw(target_id, configuration, setting)
+            if value is None:
+                value = self._builtins(context).get(setting)
+            if value is not None:
+                value = self._expand(context, value)
+        finally:
+            self._resolving.discard(key)
+        self._resolved[key] = value
+        return value
+
+    def expand(self, target_id: str, configuration: str, text: str) -> str:
+        """Expand $(VAR) references in arbitrary text (a script phase path)"""
+        return self._expand(_Context(target_id, configuration), text)
+
+    def _expand(self, context: _Context, value: str) -> str:
+        def replace(match: re.Match) -> str:
+            reference = match.group(1) if match.group(1) is not None else match.group(2)
+            name, *operators = reference.split(':')
+            resolved = self.resolve(context.target_id, context.configuration, name)
+            for operator in operators:
+                if operator.startswith('default='):
+                    resolved = resolved or operator[len('default='):]
+                elif resolved is None:
+                    break
+                elif operator == 'lower':
+                    resolved = resolved.lower()
+                elif operator == 'upper':
+                    resolved = resolved.upper()
+                elif operator == 'rfc1034identifier':
+                    resolved = _IDENTIFIER_RE.sub('-', resolved)
+                elif operator == 'c99extidentifier':
+                    resolved = _C99_RE.sub('_', resolved)
+                else:
+                    return match.group(0)
+            return match.group(0) if resolved is None else resolved
+
+        for _ in range(_MAX_EXPANSION_PASSES):
+            expanded = _REFERENCE_RE.sub(replace, value)
+            if expanded == value:
+                break
+            value = expanded
+        return value
+
+    def targets(self) -> List[Tuple[str, str]]:
+        """(target ID, name) for every target of the project, in project order"""
+        root = self.project.root_object
+        targets = self.project.resolve(root.get('targets') if root is not None else ())
+        return [(target.id, target.get('name', target.id)) for target in targets]
+
+    def configuration_names(self, owner_id: str) -> List[str]:
+        return [config.get('name') for config in self.project.graph.configurations(owner_id)]
+
+    def effective(self, settings: List[str]) -> List[Dict]:
+        """One row per target x configuration with the effective value of each setting"""
+        rows = []
+        for target_id, name in self.targets():
+            for configuration in self.configuration_names(target_id):
+                rows.append({
+                    'target': name,
+                    'target_id': target_id,
+                    'configuration': configuration,
+                    'settings': {setting: self.resolve(target_id, configuration, setting)
+                                 for setting in settings},
+                })
+        return rows
@@ -7,14 +7,77 @@ This script follows the Xcode Build Configuration Protocol v1.0.0
 """
 
 import os
-import re
 import sys
 import json
-import subprocess
+import contextlib
+import io
 import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
+
+from xcode_audit import (
+    AuditScope, BuildLogTimings, BuildTimeline, DEFAULT_IGNORE, DEPENDENCY_TRACKED, FixTransaction,
+    GitScopeError, Instrumentation, LockfileError, ParseCache, PatchConflictError, PBXProject,
+    PhaseRuleSet, PodsStatus, pods_status, ReadinessAnalyzer, ScanManifest, SettingsResolver,
+    SettingsRuleSet, SLFError, SourceMatch, SourceScanner, SourceWalker, load_projects, open_watcher,
+    rules_hash, set_array_field, set_string_field, wait_for_changes, workspace_projects,
+)
+
+# Script phase readiness findings -> (issue id, severity)
+PHASE_ISSUES = {
+    'no_outputs': ('BP_OUTPUT_MISSING', 'warning'),
+    'empty_outputs': ('BP_OUTPUT_EMPTY', 'warning'),
+    'no_inputs': ('BP_NO_INPUTS', 'warning'),
+    'always_out_of_date': ('BP_ALWAYS_OUT_OF_DATE', 'warning'),
+    'filelist_missing': ('BP_FILELIST_MISSING', 'error'),
+    'filelist_empty': ('BP_FILELIST_EMPTY', 'warning'),
+}
+PHASE_DESCRIPTIONS = {
+    'no_outputs': "Build phase '{phase}' missing output files, runs on every build",
+    'empty_outputs': "Build phase '{phase}' has empty output files, runs on every build",
+    'no_inputs': "Build phase '{phase}' has no input files, runs on every build",
+    'always_out_of_date': "Build phase '{phase}' is marked alwaysOutOfDate, runs on every build",
+    'filelist_missing': "Build phase '{phase}' names a missing file list {detail}",
+    'filelist_empty': "Build phase '{phase}' names an empty file list {detail}",
+}
+# Issue IDs, descriptions and fix actions per kind of build setting finding
+SETTING_ISSUES = {
+    'duplicate': 'BS_DUPLICATE_FLAGS',
+    'forbidden': 'BS_FORBIDDEN_VALUE',
+    'missing': 'BS_MISSING_VALUE',
+    'order': 'BS_INHERITED_NOT_FIRST',
+}
+SETTING_DESCRIPTIONS = {
+    'duplicate': "{setting} repeats {values}",
+    'forbidden': "{setting} contains {values}",
+    'missing': "{setting} is missing {values}",
+    'order': "{setting} does not start with $(inherited)",
+}
+SETTING_ACTIONS = {
+    'duplicate': ('removed_duplicate_flags', "Removed duplicate"),
+    'forbidden': ('removed_forbidden_values', "Removed"),
+    'missing': ('added_required_values', "Added"),
+    'order': ('moved_inherited_first', "Moved first:"),
+}
+
+# Below this much uncached pbxproj data, starting worker processes costs
+# more than tokenizing in this one
+PARALLEL_PARSE_MIN_BYTES = 8 * 1024 * 1024
+
+# Used when the protocol file predates the sourceRules section
+DEFAULT_SOURCE_RULES = [
+    {
+        'id': 'CC001',
+        'issueId': 'CC001_CALLSEQFACTORY',
+        'literal': 'CallSeqFactory',
+        'severity': 'error',
+        'description': 'Usage of deprecated CallSeqFactory API',
+        'solution': 'Replace with CallInvoker::invokeAsync pattern',
+        'replacement': 'callInvoker_->invokeAsync',
+        'fixAction': 'replaced_callseqfactory',
+    },
+]
 
 class Colors:
     """Terminal color codes for pretty output"""
@@ -28,13 +91,47 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
 class XcodeAuditor:
-    def __init__(self, project_root: str, protocol_path: str):
+    def __init__(self, project_root: str, protocol_path: str, protocol: Optional[Dict] = None):
         self.project_root = Path(project_root)
         self.protocol_path = Path(protocol_path)
-        self.protocol = self.load_protocol()
+        self.protocol = protocol if protocol is not None else self.load_protocol()
         self.issues_found = []
         self.fixes_applied = []
+        self._projects: Dict[Path, PBXProject] = {}
+        self.parse_cache: Optional[ParseCache] = ParseCache(self.project_root / ".xcode_cache" / "pbxproj")
+        self._source_walker: Optional[SourceWalker] = None
+        self._source_matches: Optional[Dict[Path, List[SourceMatch]]] = None
+        self.source_scanner: Optional[SourceScanner] = None
+        self.jobs = 1
+        self.use_manifest = True
+        self.scope: Optional[AuditScope] = None
+        self._phase_rules: Optional[PhaseRuleSet] = None
+        self._setting_rules: Optional[SettingsRuleSet] = None
+        self.pods_status: Optional[PodsStatus] = None
+        self.readiness: List[Dict] = []
+        # Timing/memory spans of the current full run; None outside one
+        self.instrumentation: Optional[Instrumentation] = None
+        self.trace_memory = False
+        # NDJSON output: issues and fixes are written here as found, not kept
+        self.stream = None
+        self.issue_counts = {'error': 0, 'warning': 0}
+        self.fix_count = 0
+        # Fixers apply_all_fixes runs, in order, against one FixTransaction
+        self.fixers: List[Tuple[str, Callable[[FixTransaction], bool]]] = [
+            ('fix_build_phases', self.fix_build_phases),
+            ('fix_build_settings', self.fix_build_settings),
+            ('fix_compiler_errors', self.fix_compiler_errors),
+        ]
+        # Fixes of the open transaction, recorded once its files are written
+        self._pending_fixes: Optional[List[Dict]] = None
         self.backup_dir = self.project_root / ".xcode_backup" / datetime.now().strftime("%Y%m%d_%H%M%S")
         
     def load_protocol(self) -> Dict:
@@ -64,6 +161,35 @@ class XcodeAuditor:
     def print_info(self, text: str):
         print(f"{Colors.OKCYAN}ℹ{Colors.ENDC} {text}")
     
+    def emit(self, record_type: str, record: Dict):
+        """Write one NDJSON record to the output stream"""
+        if self.stream is not None:
+            self.stream.write(json.dumps({'type': record_type, **record}) + '\n')
+            self.stream.flush()
+    
+    def add_issue(self, issues: List[Dict], issue: Dict):
+        """Record an issue found by a check, streaming it immediately in NDJSON mode"""
+        self.issue_counts[issue['severity']] = self.issue_counts.get(issue['severity'], 0) + 1
+        issues.append(issue)
+        self.emit('issue', issue)
+    
+    def add_fix(self, fix: Dict):
+        """Record an applied fix (streamed, not kept, in NDJSON mode)"""
+        if self._pending_fixes is not None:
+            self._pending_fixes.append(fix)
+            return
+        self.fix_count += 1
+        if self.stream is not None:
+            self.emit('fix', fix)
+        else:
+            self.fixes_applied.append(fix)
+    
+    def span(self, name: str):
+        """Instrumentation span for a check, fix or stage (a no-op outside a full run)"""
+        if self.instrumentation is None:
+            return contextlib.nullcontext()
+        return self.instrumentation.span(name)
+    
     def backup_file(self, file_path: Path):
         """Create backup of a file before modification"""
         if not self.protocol.get('automationRules', {}).get('backupBeforeFix', True):
@@ -76,6 +202,33 @@ class XcodeAuditor:
         shutil.copy2(file_path, backup_path)
         self.print_info(f"Backed up: {relative_path}")
     
+    def fix_transaction(self) -> FixTransaction:
+        """Start collecting fixes on the audit's parsed projects; commit_fixes writes them"""
+        self._pending_fixes = []
+        return FixTransaction(loader=self.load_project)
+    
+    def commit_fixes(self, transaction: FixTransaction) -> List[Path]:
+        """Back up and atomically rewrite each changed file once, then record the fixes"""
+        pending, self._pending_fixes = self._pending_fixes or [], None
+        try:
+            with self.span('commit'):
+                written = transaction.commit(backup=self.backup_file)
+        except (OSError, PatchConflictError) as e:
+            self.print_error(f"No changes written, {len(pending)} fixes discarded: {e}")
+            return []
+        for path in written:
+            if path.name == 'project.pbxproj':
+                # The cached parse maps the replaced file; re-parse on next use
+                project = self._projects.pop(path, None)
+                if project is not None:
+                    project.close()
+                self.print_success(f"Saved changes to {self.project_label(path)}")
+            else:
+                self.print_success(f"Saved changes to {path.name}")
+        for fix in pending:
+            self.add_fix(fix)
+        return written
+    
     def find_xcodeproj(self) -> Optional[Path]:
         """Find the Xcode project file"""
         ios_dir = self.project_root / "ios"
@@ -100,222 +253,683 @@ class XcodeAuditor:
                 return pbxproj
         return None
     
+    def find_workspace(self) -> Optional[Path]:
+        """Find the CocoaPods/Xcode workspace next to the project"""
+        for directory in (self.project_root / "ios", self.project_root):
+            if directory.is_dir():
+                for item in sorted(directory.iterdir()):
+                    if item.suffix == ".xcworkspace":
+                        return item
+        return None
+    
+    def find_pbxprojs(self) -> List[Path]:
+        """Every project.pbxproj in the build graph: the workspace's projects, else the one project"""
+        pbxprojs = []
+        workspace = self.find_workspace()
+        if workspace:
+            for xcodeproj in workspace_projects(workspace):
+                pbxproj = xcodeproj / "project.pbxproj"
+                if pbxproj.exists():
+                    pbxprojs.append(pbxproj)
+        main = self.find_pbxproj()
+        if main and main not in pbxprojs:
+            pbxprojs.insert(0, main)
+        return pbxprojs
+    
+    def project_label(self, pbxproj: Path) -> str:
+        """The .xcodeproj a pbxproj belongs to, relative to the project root"""
+        try:
+            return pbxproj.parent.relative_to(self.project_root).as_posix()
+        except ValueError:
+            return str(pbxproj.parent)
+    
+    def load_projects(self, pbxprojs: List[Path]) -> List[PBXProject]:
+        """Parse several projects, tokenizing large uncached ones in up to self.jobs processes"""
+        missing = [pbxproj for pbxproj in pbxprojs if pbxproj not in self._projects]
+        if missing:
+            jobs = min(len(missing), self.jobs)
+            if jobs > 1 and sum(_file_size(pbxproj) for pbxproj in missing) < PARALLEL_PARSE_MIN_BYTES:
+                jobs = 1
+            with self.span('parse'):
+                if self.parse_cache is not None:
+                    loaded = self.parse_cache.load_many(missing, jobs)
+                else:
+                    loaded = load_projects(missing, jobs)
+            self._projects.update(zip(missing, loaded))
+        return [self._projects[pbxproj] for pbxproj in pbxprojs]
+    
+    def load_project(self, pbxproj: Path) -> PBXProject:
+        """Parse project.pbxproj once and share the object table across checks"""
+        project = self._projects.get(pbxproj)
+        if project is None:
+            with self.span('parse'):
+                if self.parse_cache is not None:
+                    project = self.parse_cache.load(pbxproj)
+                else:
+                    project = PBXProject.load(pbxproj)
+            self._projects[pbxproj] = project
+        return project
+    
+    def source_files(self) -> List[Path]:
+        """Source files for the compiler checks, from one shared pruned walk"""
+        scan = self.protocol.get('sourceScan', {})
+        if self._source_walker is None:
+            self._source_walker = SourceWalker(self.project_root, scan.get('ignore', DEFAULT_IGNORE))
+        files = self._source_walker.files(scan.get('extensions', ['.mm', '.cpp', '.m', '.h']))
+        if self.scope is not None:
+            files = [file_path for file_path in files if self.scope.includes(file_path)]
+        return files
+    
+    def scan_sources(self) -> Dict[Path, List[SourceMatch]]:
+        """Match every sourceRules pattern against each source file, reading each once
+        
+        Files unchanged since the last run reuse their findings from the scan
+        manifest stored next to the report; only new or modified files are read.
+        """
+        if self._source_matches is None:
+            with self.span('source_scan'):
+                specs = self.protocol.get('sourceRules', DEFAULT_SOURCE_RULES)
+                if self.source_scanner is None:
+                    self.source_scanner = SourceScanner.from_protocol(specs)
+                scanner = self.source_scanner
+                manifest = None
+                if self.use_manifest:
+                    manifest = ScanManifest.load(self.project_root / "xcode-audit-manifest.json",
+                                                 scanner.rules, rules_hash(specs))
+                
+                found: Dict[Path, List[SourceMatch]] = {}
+                stats = {}
+                to_scan = []
+                files = self.source_files()
+                for file_path in files:
+                    try:
+                        st = os.stat(file_path)
+                    except OSError:
+                        to_scan.append(file_path)
+                        continue
+                    stats[file_path] = st
+                    matches = manifest.lookup(file_path, st) if manifest is not None else None
+                    if matches is None:
+                        to_scan.append(file_path)
+                    else:
+                        found[file_path] = matches
+                
+                for file_path, matches, error in scanner.scan_paths(to_scan, self.jobs):
+                    if error:
+                        self.print_warning(f"Could not read {file_path}: {error}")
+                        continue
+                    found[file_path] = matches
+                    if manifest is not None and file_path in stats:
+                        manifest.record(file_path, stats[file_path], matches)
+                
+                if manifest is not None:
+                    manifest.save(keep_unseen=self.scope is not None)
+                    self.print_info(f"Scanned {len(to_scan)} of {len(files)} source files "
+                                    f"({manifest.reused} unchanged)")
+                
+                # Walk order, so the report doesn't depend on what was cached
+                self._source_matches = {
+                    file_path: found[file_path] for file_path in files if found.get(file_path)
+                }
+        return self._source_matches
+    
+    def phase_rules(self) -> PhaseRuleSet:
+        """buildPhaseConfiguration rules, compiled once per run"""
+        if self._phase_rules is None:
+            specs = self.protocol.get('buildPhaseConfiguration', {}).get('scriptPhases', {}).get('rules', [])
+            self._phase_rules = PhaseRuleSet.from_protocol(specs)
+        return self._phase_rules
+    
     def audit_build_phases(self) -> List[Dict]:
-        """Audit build script phases for missing outputs [BP001, BP002, BP003]"""
+        """Audit script phases for incremental-build readiness [BP001, BP002, BP003]"""
         self.print_header("Auditing Build Script Phases")
         
-        pbxproj = self.find_pbxproj()
-        if not pbxproj:
+        pbxprojs = self.find_pbxprojs()
+        if not pbxprojs:
             self.print_error("Could not find project.pbxproj file")
             return []
         
         issues = []
-        
-        with open(pbxproj, 'r') as f:
-            content = f.read()
-        
-        # Find all PBXShellScriptBuildPhase sections
-        script_phase_pattern = re.compile(
-            r'([A-F0-9]+) /\* (.+?) \*/ = \{[^}]*?isa = PBXShellScriptBuildPhase;[^}]*?\};',
-            re.DOTALL
-        )
-        
-        for match in script_phase_pattern.finditer(content):
-            phase_id = match.group(1)
-            phase_name = match.group(2)
-            phase_content = match.group(0)
+        rules = self.phase_rules()
+        self.readiness = []
+        for pbxproj, project in zip(pbxprojs, self.load_projects(pbxprojs)):
+            label = self.project_label(pbxproj)
+            changed = None
+            if self.scope is not None:
+                changed = self.scope.changed_objects(pbxproj, project)
+                self.print_info(f"{label}: {len(changed)} objects added or modified since {self.scope.ref}")
             
-            # Check if this phase has output files
-            if 'outputPaths = (' not in phase_content:
-                issue = {
-                    'id': 'BP_OUTPUT_MISSING',
-                    'severity': 'warning',
-                    'phase_name': phase_name,
-                    'phase_id': phase_id,
-                    'file': str(pbxproj),
-                    'description': f"Build phase '{phase_name}' missing output files"
-                }
-                issues.append(issue)
-                self.print_warning(f"Phase '{phase_name}' has no output files")
-            elif 'outputPaths = (\n\t\t\t);' in phase_content:
-                issue = {
-                    'id': 'BP_OUTPUT_EMPTY',
-                    'severity': 'warning',
-                    'phase_name': phase_name,
-                    'phase_id': phase_id,
-                    'file': str(pbxproj),
-                    'description': f"Build phase '{phase_name}' has empty output files"
-                }
-                issues.append(issue)
-                self.print_warning(f"Phase '{phase_name}' has empty output files")
-            else:
-                self.print_success(f"Phase '{phase_name}' has output files configured")
+            analyzer = ReadinessAnalyzer(SettingsResolver.for_pbxproj(project, pbxproj))
+            for target in analyzer.targets():
+                location = f" in {target.name}"
+                if len(pbxprojs) > 1:
+                    location += f" ({pbxproj.parent.stem})"
+                
+                for phase in target.phases:
+                    if changed is not None and phase.phase_id not in changed:
+                        continue
+                    context = {'project': label, **project.graph.context(phase.phase_id)}
+                    rule = rules.match(phase.name)
+                    if rule is not None:
+                        context['rule_id'] = rule.id
+                    
+                    for finding in phase.findings:
+                        if finding.kind == 'unresolved':
+                            self.print_info(f"Phase '{phase.name}'{location}: cannot resolve {finding.detail}")
+                            continue
+                        issue_id, severity = PHASE_ISSUES[finding.kind]
+                        issue = {
+                            'id': issue_id,
+                            'severity': severity,
+                            'phase_name': phase.name,
+                            'phase_id': phase.phase_id,
+                            'readiness': phase.status,
+                            'file': str(pbxproj),
+                            'description': PHASE_DESCRIPTIONS[finding.kind].format(
+                                phase=phase.name, detail=finding.detail),
+                            **context
+                        }
+                        self.add_issue(issues, issue)
+                        report = self.print_error if severity == 'error' else self.print_warning
+                        report(f"{issue['description']} ({target.name})")
+                    if phase.status == DEPENDENCY_TRACKED:
+                        self.print_success(f"Phase '{phase.name}'{location} is dependency-tracked "
+                                           f"({phase.inputs} inputs, {phase.outputs} outputs)")
+                
+                summary = target.summary()
+                self.readiness.append({'project': label, **summary})
+                line = (f"{target.name}: {summary['dependency_tracked']}/{summary['script_phases']} "
+                        f"script phases dependency-tracked, {summary['always_run']} always-run, "
+                        f"{summary['broken']} broken, {summary['unresolved']} unresolved")
+                if target.ready:
+                    self.print_success(f"Incremental readiness {line}")
+                else:
+                    self.print_warning(f"Incremental readiness {line}")
         
         return issues
     
-    def fix_build_phases(self) -> bool:
+    def fix_build_phases(self, transaction: Optional[FixTransaction] = None) -> bool:
         """Fix build script phases by adding output files"""
         self.print_header("Fixing Build Script Phases")
         
-        pbxproj = self.find_pbxproj()
-        if not pbxproj:
+        pbxprojs = self.find_pbxprojs()
+        if not pbxprojs:
             self.print_error("Could not find project.pbxproj file")
             return False
         
-        self.backup_file(pbxproj)
+        standalone = transaction is None
+        if standalone:
+            transaction = self.fix_transaction()
+        rules = self.phase_rules()
+        changed = False
+        self.load_projects(pbxprojs)
+        for pbxproj in pbxprojs:
+            label = self.project_label(pbxproj)
+            project = transaction.project(pbxproj)
+            patches = transaction.patches(pbxproj)
+            phase_target = project.graph.phase_target
+            phases = list(project.objects_of('PBXShellScriptBuildPhase'))
+            
+            # Outputs each target already declares: a pattern rule must not
+            # make two phases of one target produce the same file
+            claimed: Dict[str, set] = {}
+            for phase_id, phase in phases:
+                claimed.setdefault(phase_target.get(phase_id, ''), set()).update(phase.outputPaths or ())
+            
+            for phase_id, phase in phases:
+                # Outputs listed in .xcfilelists already track the phase
+                if phase.outputPaths or phase.outputFileListPaths:
+                    continue
+                script_name = phase.display_name
+                rule = rules.match(script_name)
+                if rule is None or not rule.required_outputs:
+                    continue
+                
+                outputs = list(rule.required_outputs)
+                target_outputs = claimed[phase_target.get(phase_id, '')]
+                if target_outputs.intersection(outputs):
+                    self.print_warning(f"Skipped {rule.id} for '{script_name}': another phase "
+                                       f"in its target already produces {', '.join(outputs)}")
+                    continue
+                target_outputs.update(outputs)
+                
+                set_array_field(patches, project, phase_id, 'outputPaths', outputs)
+                if phase.outputPaths is not None:
+                    # Empty outputPaths, replaced
+                    self.print_success(f"Added outputs to '{script_name}'")
+                    action = 'added_outputs'
+                else:
+                    # No outputPaths, added in key order
+                    self.print_success(f"Added outputPaths section to '{script_name}'")
+                    action = 'created_outputs'
+                self.add_fix({
+                    'rule_id': rule.id,
+                    'project': label,
+                    'script_name': script_name,
+                    'action': action
+                })
+                changed = True
         
-        with open(pbxproj, 'r') as f:
-            content = f.read()
+        if standalone:
+            self.commit_fixes(transaction)
+        if not changed:
+            self.print_info("No changes needed for build phases")
+        return changed
+    
+    def setting_rules(self) -> SettingsRuleSet:
+        """buildSettingsConfiguration rules, grouped by setting once per run"""
+        if self._setting_rules is None:
+            specs = self.protocol.get('buildSettingsConfiguration', {}).get('rules', [])
+            self._setting_rules = SettingsRuleSet.from_protocol(specs)
+        return self._setting_rules
+    
+    def audit_build_settings(self) -> List[Dict]:
+        """Audit XCBuildConfiguration settings against the protocol [BS001, ...]"""
+        self.print_header("Auditing Build Settings")
         
-        original_content = content
-        rules = self.protocol['buildPhaseConfiguration']['scriptPhases']['rules']
+        rules = self.setting_rules()
+        pbxprojs = self.find_pbxprojs()
+        if not rules.rules or not pbxprojs:
+            self.print_info("No build setting rules to check")
+            return []
         
-        for rule in rules:
-            script_name = rule.get('scriptName', '')
-            outputs = rule.get('requiredOutputs', [])
-            
-            if not script_name or not outputs:
-                continue
+        issues = []
+        clean = 0
+        for pbxproj, project in zip(pbxprojs, self.load_projects(pbxprojs)):
+            label = self.project_label(pbxproj)
+            changed = self.scope.changed_objects(pbxproj, project) if self.scope is not None else None
             
-            # Find the script phase
-            pattern = re.compile(
-                rf'([A-F0-9]+) /\* {re.escape(script_name)} \*/ = \{{[^}}]*?isa = PBXShellScriptBuildPhase;(.*?)\}};',
-                re.DOTALL
-            )
+            for config_id, config in project.objects_of('XCBuildConfiguration'):
+                if changed is not None and config_id not in changed:
+                    continue
+                edits = list(rules.check(config))
+                if not edits:
+                    clean += 1
+                    continue
+                context = {'project': label, **project.graph.context(config_id)}
+                owner = context.get('target') or 'project'
+                for edit in edits:
+                    for finding in edit.findings:
+                        values = ', '.join(finding.values)
+                        issue = {
+                            'id': SETTING_ISSUES[finding.kind],
+                            'severity': finding.rule.severity,
+                            'rule_id': finding.rule.id,
+                            'setting': edit.key,
+                            'values': list(finding.values),
+                            'configuration': config.name,
+                            'configuration_id': config_id,
+                            'file': str(pbxproj),
+                            'description': SETTING_DESCRIPTIONS[finding.kind].format(setting=edit.key, values=values),
+                            **context
+                        }
+                        self.add_issue(issues, issue)
+                        self.print_warning(f"{issue['description']} ({owner}, {config.name})")
+        
+        if clean:
+            self.print_success(f"{clean} build configurations satisfy the build setting rules")
+        return issues
+    
+    def fix_build_settings(self, transaction: Optional[FixTransaction] = None) -> bool:
+        """Rewrite build settings that break the protocol's rules, one pass per configuration"""
+        self.print_header("Fixing Build Settings")
+        
+        rules = self.setting_rules()
+        pbxprojs = self.find_pbxprojs()
+        if not rules.rules or not pbxprojs:
+            self.print_info("No build setting rules to apply")
+            return False
+        
+        standalone = transaction is None
+        if standalone:
+            transaction = self.fix_transaction()
+        changed = False
+        self.load_projects(pbxprojs)
+        for pbxproj in pbxprojs:
+            label = self.project_label(pbxproj)
+            project = transaction.project(pbxproj)
+            patches = transaction.patches(pbxproj)
             
-            match = pattern.search(content)
-            if match:
-                phase_id = match.group(1)
-                phase_body = match.group(2)
-                
-                # Check if outputPaths already exists
-                if 'outputPaths = (' in phase_body:
-                    if 'outputPaths = (\n\t\t\t);' in phase_body:
-                        # Empty outputPaths, replace it
-                        output_lines = '\n\t\t\t\t'.join([f'"{out}",' for out in outputs])
-                        new_body = phase_body.replace(
-                            'outputPaths = (\n\t\t\t);',
-                            f'outputPaths = (\n\t\t\t\t{output_lines}\n\t\t\t);'
-                        )
-                        content = content.replace(phase_body, new_body)
-                        self.print_success(f"Added outputs to '{script_name}'")
-                        self.fixes_applied.append({
-                            'rule_id': rule['id'],
-                            'script_name': script_name,
-                            'action': 'added_outputs'
+            for config_id, config in project.objects_of('XCBuildConfiguration'):
+                edits = list(rules.check(config))
+                if not edits:
+                    continue
+                owner = project.graph.context(config_id).get('target') or 'project'
+                for edit in edits:
+                    if isinstance(edit.fixed, str):
+                        set_string_field(patches, project, config_id, edit.key, edit.fixed, within='buildSettings')
+                    else:
+                        set_array_field(patches, project, config_id, edit.key, edit.fixed, within='buildSettings')
+                    for finding in edit.findings:
+                        self.print_success(f"{SETTING_ACTIONS[finding.kind][1]} {', '.join(finding.values)} "
+                                           f"in {edit.key} ({owner}, {config.name})")
+                        self.add_fix({
+                            'rule_id': finding.rule.id,
+                            'project': label,
+                            'configuration': config.name,
+                            'configuration_id': config_id,
+                            'setting': edit.key,
+                            'values': list(finding.values),
+                            'action': SETTING_ACTIONS[finding.kind][0]
                         })
-                else:
-                    # No outputPaths, add it before the closing brace
-                    output_lines = '\n\t\t\t\t'.join([f'"{out}",' for out in outputs])
-                    new_body = phase_body.rstrip() + f'\n\t\t\toutputPaths = (\n\t\t\t\t{output_lines}\n\t\t\t);'
-                    content = content.replace(phase_body, new_body)
-                    self.print_success(f"Added outputPaths section to '{script_name}'")
-                    self.fixes_applied.append({
-                        'rule_id': rule['id'],
-                        'script_name': script_name,
-                        'action': 'created_outputs'
-                    })
+                        changed = True
+        
+        if standalone:
+            self.commit_fixes(transaction)
+        if not changed:
+            self.print_info("No changes needed for build settings")
+        return changed
+    
+    def effective_settings(self, settings: List[str], sdk: str = 'iphoneos') -> List[Dict]:
+        """Effective values of settings for every target x configuration, xcconfigs included"""
+        self.print_header("Effective Build Settings")
+        
+        rows = []
+        pbxprojs = self.find_pbxprojs()
+        for pbxproj, project in zip(pbxprojs, self.load_projects(pbxprojs)):
+            label = self.project_label(pbxproj)
+            resolver = SettingsResolver.for_pbxproj(project, pbxproj, sdk=sdk)
+            for row in resolver.effective(settings):
+                row = {'project': label, 'sdk': sdk, **row}
+                rows.append(row)
+                self.emit('settings', row)
+                print(f"{Colors.BOLD}{row['target']}{Colors.ENDC} ({row['configuration']}, {label})")
+                for setting, value in row['settings'].items():
+                    shown = value if value is not None else f"{Colors.OKCYAN}(not set){Colors.ENDC}"
+                    print(f"  {setting} = {shown}")
+            self.print_info(f"{label}: {resolver.files_read} xcconfig files read")
+        return rows
+    
+    def build_timings(self, logs: List[Path], limit: int = 10) -> Dict:
+        """Time per script phase and compile unit from xcodebuild logs, joined with BP findings"""
+        self.print_header("Build Timings")
+        
+        timings = BuildLogTimings()
+        for log in logs:
+            try:
+                timings.add_log(log)
+            except OSError as e:
+                self.print_error(f"Cannot read {log}: {e}")
+        self.print_info(f"{timings.builds} build logs, {timings.lines} lines, {len(timings.steps)} steps")
+        if timings.steps and not timings.timed:
+            self.print_warning("Logs have no timestamps; counting runs only "
+                               "(prefix lines with times, e.g. xcodebuild ... | ts '[%H:%M:%.S]')")
+        
+        # Readiness of every script phase, to join on the phase ID in the script path
+        rules = self.phase_rules()
+        phases = {}
+        pbxprojs = self.find_pbxprojs()
+        for pbxproj, project in zip(pbxprojs, self.load_projects(pbxprojs)):
+            analyzer = ReadinessAnalyzer(SettingsResolver.for_pbxproj(project, pbxproj))
+            for target in analyzer.targets():
+                for phase in target.phases:
+                    phases[phase.phase_id] = phase
+        
+        records = []
+        for step in timings.slowest():
+            record = step.to_dict()
+            phase = phases.get(step.phase_id) if step.phase_id else None
+            if phase is not None:
+                record['readiness'] = phase.status
+                record['issues'] = [PHASE_ISSUES[finding.kind][0] for finding in phase.findings
+                                    if finding.kind in PHASE_ISSUES]
+            if step.kind == 'PhaseScriptExecution':
+                rule = rules.match(step.subject)
+                if rule is not None:
+                    record['rule_id'] = rule.id
+            records.append(record)
+            self.emit('timing', record)
+        
+        for target, kinds in sorted(timings.by_target().items()):
+            if timings.timed:
+                shown = ', '.join(f"{kind} {seconds:.1f}s" for kind, seconds in sorted(kinds.items()))
+                print(f"{Colors.BOLD}{target}{Colors.ENDC}: {sum(kinds.values()):.1f}s ({shown})")
+            else:
+                runs = sum(step.runs for step in timings.steps.values() if step.target == target)
+                print(f"{Colors.BOLD}{target}{Colors.ENDC}: {runs} steps ({', '.join(sorted(kinds))})")
+        for kind, (tasks, seconds) in sorted(timings.summary.items(), key=lambda item: -item[1][1]):
+            print(f"  {kind}: {int(tasks)} tasks, {seconds:.1f}s (build timing summary)")
+        
+        if timings.timed:
+            print(f"\n{Colors.BOLD}Slowest steps{Colors.ENDC}")
+            for step in timings.slowest(limit=limit):
+                print(f"  {step.per_build:8.2f}s/build  {step.kind} {Path(step.subject).name} ({step.target})")
+        
+        # Script phases the audit flags, with what they cost
+        for record in records:
+            phase = phases.get(record['phase_id']) if record['phase_id'] else None
+            if phase is None or phase.status == DEPENDENCY_TRACKED:
+                continue
+            rule = f" [{record['rule_id']}]" if 'rule_id' in record else ""
+            if timings.timed:
+                cost = f"costs {record['seconds_per_build']:.1f}s per build"
+            else:
+                cost = f"ran in {record['builds']} of {timings.builds} builds"
+            for finding in phase.findings:
+                if finding.kind in PHASE_DESCRIPTIONS:
+                    description = PHASE_DESCRIPTIONS[finding.kind].format(phase=phase.name, detail=finding.detail)
+                    self.print_warning(f"{description}{rule} ({record['target']}): {cost}")
+        
+        return {'builds': timings.builds, 'timed': timings.timed, 'steps': records,
+                'summary': {kind: {'tasks': int(tasks), 'seconds': seconds}
+                            for kind, (tasks, seconds) in timings.summary.items()}}
+    
+    def build_timeline(self, log: Path, trace_path: Optional[Path] = None, limit: int = 10) -> Optional[Dict]:
+        """Per-target spans, concurrency and critical path from an .xcactivitylog"""
+        self.print_header("Build Timeline")
+        
+        if log.is_dir():
+            # DerivedData/<project>/Logs/Build: the most recent build
+            logs = sorted(log.rglob('*.xcactivitylog'), key=lambda path: path.stat().st_mtime)
+            if not logs:
+                self.print_error(f"No .xcactivitylog files under {log}")
+                return None
+            log = logs[-1]
+        try:
+            timeline = BuildTimeline.load(log)
+        except (OSError, EOFError, SLFError) as e:
+            self.print_error(f"Cannot decode {log}: {e}")
+            return None
+        
+        steps = timeline.steps
+        wall = timeline.wall_time
+        concurrency = timeline.concurrency()
+        busy = sum(step.duration for step in steps)
+        peak = max((running for _, running in concurrency), default=0)
+        self.print_info(f"{log.name}: {len(timeline.sections)} sections, {len(steps)} steps, "
+                        f"{wall:.1f}s wall")
+        if wall:
+            self.print_info(f"Average parallelism {busy / wall:.2f}, peak {peak} steps at once")
+        
+        targets = timeline.target_summary()
+        for row in targets:
+            print(f"  {row['target']:<40} {row['start']:8.1f}s -> {row['end']:8.1f}s  "
+                  f"wall {row['wall']:7.1f}s  busy {row['busy']:7.1f}s  {row['steps']} steps")
+        
+        serial = timeline.serial_time()
+        for target, seconds in sorted(serial.items(), key=lambda item: -item[1])[:limit]:
+            if wall and seconds / wall >= 0.1:
+                self.print_warning(f"{target} ran alone for {seconds:.1f}s ({seconds / wall:.0%} of the build)")
         
-        if content != original_content:
-            with open(pbxproj, 'w') as f:
-                f.write(content)
-            self.print_success("Saved changes to project.pbxproj")
+        path = timeline.critical_path()
+        on_path: Dict[str, float] = {}
+        for step in path:
+            on_path[timeline.target(step)] = on_path.get(timeline.target(step), 0.0) + step.duration
+        print(f"\n{Colors.BOLD}Critical path{Colors.ENDC}: {len(path)} steps, "
+              f"{sum(step.duration for step in path):.1f}s")
+        for target, seconds in sorted(on_path.items(), key=lambda item: -item[1]):
+            print(f"  {target}: {seconds:.1f}s")
+        for step in sorted(path, key=lambda step: -step.duration)[:limit]:
+            print(f"  {step.duration:8.2f}s  {step.title or step.signature} ({timeline.target(step)})")
+        
+        report = {
+            'log': str(log),
+            'wall': round(wall, 3),
+            'steps': len(steps),
+            'parallelism': round(busy / wall, 3) if wall else None,
+            'peak_concurrency': peak,
+            'targets': targets,
+            'serial_time': {target: round(seconds, 3) for target, seconds in serial.items()},
+            'critical_path': [{'title': step.title, 'signature': step.signature,
+                               'target': timeline.target(step),
+                               'start': round(step.start - timeline.origin, 3),
+                               'duration': round(step.duration, 3)} for step in path],
+        }
+        self.emit('timeline', report)
+        
+        if trace_path is not None:
+            with open(trace_path, 'w') as f:
+                json.dump(timeline.chrome_trace(), f)
+            self.print_success(f"Chrome trace saved to: {trace_path} (open in chrome://tracing or Perfetto)")
+        return report
+    
+    def print_pods_status(self) -> bool:
+        """Print which pods are out of sync; True if `pod install` is needed"""
+        self.print_header("CocoaPods Status")
+        
+        if self.find_podfile() is None:
+            self.print_info("No Podfile found, nothing to install")
+            return False
+        status = self.check_pods()
+        if status is None:
             return True
+        issues = self.pods_issues(status)
+        for issue in issues:
+            print(f"  [{issue['id']}] {issue['description']}")
+        record = {
+            'install_needed': status.install_needed,
+            'fingerprint': status.fingerprint,
+            'podfile_checksum': status.podfile_checksum,
+            'issues': issues
+        }
+        self.emit('pods', record)
+        if status.install_needed:
+            self.print_warning("pod install is needed")
         else:
-            self.print_info("No changes needed for build phases")
-            return False
+            self.print_success(f"Pods are in sync (fingerprint {status.fingerprint[:12]}), pod install can be skipped")
+        return status.install_needed
     
     def audit_compiler_errors(self) -> List[Dict]:
-        """Audit for common compiler errors [CC001, CC002]"""
+        """Audit sources against the protocol's sourceRules [CC001, ...]"""
         self.print_header("Auditing Compiler Compatibility")
         
         issues = []
         
-        # Search for CallSeqFactory usage (deprecated/incorrect API)
-        for ext in ['.mm', '.cpp', '.m', '.h']:
-            for file_path in self.project_root.rglob(f'*{ext}'):
-                if 'Pods' in str(file_path) or 'build' in str(file_path):
-                    continue
+        for file_path, matches in self.scan_sources().items():
+            for match in matches:
+                rule = match.rule
+                issue = {
+                    'id': rule.issue_id,
+                    'severity': rule.severity,
+                    'file': str(file_path),
+                    'line': match.line,
+                    'column': match.column,
+                    'description': rule.description
+                }
+                if rule.solution:
+                    issue['solution'] = rule.solution
+                self.add_issue(issues, issue)
                 
-                try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                    
-                    if 'CallSeqFactory' in content:
-                        issue = {
-                            'id': 'CC001_CALLSEQFACTORY',
-                            'severity': 'error',
-                            'file': str(file_path),
-                            'description': 'Usage of deprecated CallSeqFactory API',
-                            'solution': 'Replace with CallInvoker::invokeAsync pattern'
-                        }
-                        issues.append(issue)
-                        self.print_error(f"Found CallSeqFactory in {file_path.name}")
-                    
-                except Exception as e:
-                    self.print_warning(f"Could not read {file_path}: {e}")
+                text = match.text.decode('utf-8', 'replace')
+                message = f"Found {text} in {file_path.name}:{match.line}:{match.column}"
+                if rule.severity == 'error':
+                    self.print_error(message)
+                else:
+                    self.print_warning(message)
         
         if not issues:
             self.print_success("No compiler compatibility issues found")
         
         return issues
     
-    def fix_compiler_errors(self) -> bool:
+    def fix_compiler_errors(self, transaction: Optional[FixTransaction] = None) -> bool:
         """Fix common compiler errors"""
         self.print_header("Fixing Compiler Errors")
         
+        standalone = transaction is None
+        if standalone:
+            transaction = self.fix_transaction()
         fixed = False
         
-        # Fix CallSeqFactory issues
-        for ext in ['.mm', '.cpp', '.m', '.h']:
-            for file_path in self.project_root.rglob(f'*{ext}'):
-                if 'Pods' in str(file_path) or 'build' in str(file_path):
+        for file_path, matches in self.scan_sources().items():
+            rules = []
+            for match in matches:
+                if match.rule.replacement is not None and match.rule not in rules:
+                    rules.append(match.rule)
+            if not rules:
+                continue
+            
+            try:
+                content = transaction.read(file_path)
+                
+                # Replacements are textual - actual fixes may need more context
+                new_content = content
+                for rule in rules:
+                    new_content = rule.apply_fix(new_content)
+                if new_content == content:
                     continue
+                transaction.replace(file_path, new_content)
                 
-                try:
-                    with open(file_path, 'r') as f:
-                        content = f.read()
-                    
-                    if 'CallSeqFactory' in content:
-                        self.backup_file(file_path)
-                        
-                        # Replace CallSeqFactory with proper pattern
-                        # This is a simplified fix - actual fix may need more context
-                        new_content = content.replace(
-                            'CallSeqFactory',
-                            'callInvoker_->invokeAsync'
-                        )
-                        
-                        with open(file_path, 'w') as f:
-                            f.write(new_content)
-                        
-                        self.print_success(f"Fixed CallSeqFactory in {file_path.name}")
-                        self.fixes_applied.append({
-                            'rule_id': 'CC001',
-                            'file': str(file_path),
-                            'action': 'replaced_callseqfactory'
-                        })
-                        fixed = True
-                    
-                except Exception as e:
-                    self.print_error(f"Could not fix {file_path}: {e}")
+                for rule in rules:
+                    self.print_success(f"Applied {rule.id} fix in {file_path.name}")
+                    self.add_fix({
+                        'rule_id': rule.id,
+                        'file': str(file_path),
+                        'action': rule.fix_action
+                    })
+                fixed = True
+                
+            except Exception as e:
+                self.print_error(f"Could not fix {file_path}: {e}")
         
-        if not fixed:
+        if standalone:
+            self.commit_fixes(transaction)
+        if fixed:
+            self._source_matches = None
+        else:
             self.print_info("No compiler errors to fix")
         
         return fixed
     
+    def find_podfile(self) -> Optional[Path]:
+        """Podfile under ios/ or at the project root"""
+        for podfile in (self.project_root / "ios" / "Podfile", self.project_root / "Podfile"):
+            if podfile.exists():
+                return podfile
+        return None
+    
+    def lockfile_paths(self) -> List[Path]:
+        """Podfile, Podfile.lock and Pods/Manifest.lock, existing or not"""
+        podfile = self.find_podfile() or self.project_root / "ios" / "Podfile"
+        return [podfile, podfile.with_name("Podfile.lock"), podfile.parent / "Pods" / "Manifest.lock"]
+    
+    def check_pods(self) -> Optional[PodsStatus]:
+        """Compare Podfile, Podfile.lock and Pods/Manifest.lock without running CocoaPods"""
+        podfile = self.find_podfile()
+        if podfile is None:
+            return None
+        try:
+            with self.span('pods_check'):
+                self.pods_status = pods_status(podfile)
+        except (OSError, LockfileError) as e:
+            self.print_error(f"Could not read CocoaPods lockfiles: {e}")
+            return None
+        return self.pods_status
+    
     def audit_dependencies(self) -> List[Dict]:
-        """Audit dependency management [DM001]"""
+        """Audit dependency management [DM001-DM005]"""
         self.print_header("Auditing Dependencies")
         
         issues = []
         
-        podfile = self.project_root / "ios" / "Podfile"
-        if not podfile.exists():
-            podfile = self.project_root / "Podfile"
+        podfile = self.find_podfile()
+        
+        if self.scope is not None and podfile is not None and not (
+                self.scope.includes(podfile) or self.scope.includes(podfile.with_name('Podfile.lock'))):
+            self.print_info(f"Podfile and Podfile.lock unchanged since {self.scope.ref}")
+            return issues
         
-        if podfile.exists():
+        if podfile is not None:
             self.print_success("Found Podfile")
             
             with open(podfile, 'r') as f:
@@ -329,15 +943,75 @@ class XcodeAuditor:
                     'file': str(podfile),
                     'description': 'No post_install hook found in Podfile'
                 }
-                issues.append(issue)
+                self.add_issue(issues, issue)
                 self.print_warning("No post_install hook in Podfile")
             else:
                 self.print_success("Podfile has post_install hook")
+            
+            status = self.check_pods()
+            if status is not None:
+                for issue in self.pods_issues(status):
+                    self.add_issue(issues, issue)
+                    if issue['severity'] == 'error':
+                        self.print_error(issue['description'])
+                    else:
+                        self.print_warning(issue['description'])
+                if not status.install_needed:
+                    self.print_success(f"Pods are in sync with Podfile.lock ({len(status.lockfile.pods)} pods)")
         else:
             self.print_error("No Podfile found")
         
         return issues
     
+    def pods_issues(self, status: PodsStatus) -> List[Dict]:
+        """Issues for each reason `pod install` would change something"""
+        lock_path = status.podfile.with_name('Podfile.lock')
+        if status.lockfile is None:
+            return [{
+                'id': 'DM002_NO_PODFILE_LOCK',
+                'severity': 'warning',
+                'file': str(lock_path),
+                'description': 'Podfile.lock not found; run pod install and commit it'
+            }]
+        
+        issues = []
+        if status.podfile_changed:
+            issues.append({
+                'id': 'DM003_PODFILE_CHANGED',
+                'severity': 'warning',
+                'file': str(status.podfile),
+                'podfile_checksum': status.podfile_checksum,
+                'locked_checksum': status.lockfile.podfile_checksum,
+                'description': 'Podfile changed since Podfile.lock was written'
+            })
+        if status.manifest is None:
+            issues.append({
+                'id': 'DM004_PODS_NOT_INSTALLED',
+                'severity': 'error',
+                'file': str(status.podfile.parent / 'Pods' / 'Manifest.lock'),
+                'description': 'Pods/Manifest.lock not found; pods are not installed'
+            })
+        for drift in status.drift:
+            if drift.reason == 'added':
+                description = f"{drift.name} {drift.locked} is locked but not installed"
+            elif drift.reason == 'removed':
+                description = f"{drift.name} {drift.installed} is installed but no longer locked"
+            elif drift.reason == 'version':
+                description = f"{drift.name} is locked at {drift.locked} but {drift.installed} is installed"
+            else:
+                description = f"{drift.name} {drift.locked} podspec checksum differs from the installed one"
+            issues.append({
+                'id': 'DM005_POD_OUT_OF_SYNC',
+                'severity': 'error',
+                'file': str(lock_path),
+                'pod': drift.name,
+                'locked_version': drift.locked,
+                'installed_version': drift.installed,
+                'reason': drift.reason,
+                'description': description
+            })
+        return issues
+    
     def run_full_audit(self) -> Dict:
         """Run complete audit of all checks"""
         self.print_header("Starting Full Project Audit")
@@ -346,40 +1020,186 @@ class XcodeAuditor:
         self.print_info(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         all_issues = []
+        self.issue_counts = {'error': 0, 'warning': 0}
+        self.instrumentation = Instrumentation(self.trace_memory)
         
-        # Run all audit checks
-        all_issues.extend(self.audit_build_phases())
-        all_issues.extend(self.audit_compiler_errors())
-        all_issues.extend(self.audit_dependencies())
+        # Run all audit checks (already streamed in NDJSON mode, so not kept)
+        for check in (self.audit_build_phases, self.audit_build_settings,
+                      self.audit_compiler_errors, self.audit_dependencies):
+            with self.span(check.__name__):
+                issues = check()
+            if self.stream is None:
+                all_issues.extend(issues)
         
         # Generate report
         report = {
             'timestamp': datetime.now().isoformat(),
             'protocol_version': self.protocol['version'],
             'project_root': str(self.project_root),
-            'total_issues': len(all_issues),
-            'issues_by_severity': {
-                'error': len([i for i in all_issues if i['severity'] == 'error']),
-                'warning': len([i for i in all_issues if i['severity'] == 'warning'])
-            },
+            'total_issues': sum(self.issue_counts.values()),
+            'issues_by_severity': dict(self.issue_counts),
             'issues': all_issues
         }
+        if self.readiness:
+            report['incremental_readiness'] = self.readiness
+        if self.pods_status is not None:
+            report['pods'] = {
+                'install_needed': self.pods_status.install_needed,
+                'fingerprint': self.pods_status.fingerprint,
+                'podfile_checksum': self.pods_status.podfile_checksum
+            }
+        if self.scope is not None:
+            report['scope'] = {
+                'since': self.scope.ref,
+                'base_commit': self.scope.base_commit,
+                'changed_paths': len(self.scope.paths)
+            }
         
         self.issues_found = all_issues
         
         return report
     
+    def checks_for(self, path: Path) -> List[str]:
+        """Names of the audit checks whose inputs include path"""
+        extensions = self.protocol.get('sourceScan', {}).get('extensions', ['.mm', '.cpp', '.m', '.h'])
+        # xcconfigs feed the resolved settings and .xcfilelists the
+        # readiness of the phases that reference them
+        if path.name == 'project.pbxproj' or path.suffix in ('.xcconfig', '.xcfilelist'):
+            return ['build_phases', 'build_settings']
+        if path.name in ('Podfile', 'Podfile.lock', 'Manifest.lock'):
+            return ['dependencies']
+        if path.suffix in extensions:
+            return ['compiler']
+        return []
+    
+    def watch(self, debounce: float = 0.3, interval: float = 1.0):
+        """Re-run the checks whose inputs change and print new/resolved issues (Ctrl-C stops)"""
+        checks = {
+            'build_phases': self.audit_build_phases,
+            'build_settings': self.audit_build_settings,
+            'compiler': self.audit_compiler_errors,
+            'dependencies': self.audit_dependencies
+        }
+        results = {name: check() for name, check in checks.items()}
+        ignore = self.protocol.get('sourceScan', {}).get('ignore', DEFAULT_IGNORE)
+        walker = self._source_walker or SourceWalker(self.project_root, ignore)
+        
+        # Pods/ is pruned from the source walk, but Pods.xcodeproj and
+        # Pods/Manifest.lock are still inputs; Pods/ may only appear later
+        inputs = self.find_pbxprojs() + self.lockfile_paths()
+        input_dirs = {path.parent for path in inputs}
+        input_dirs.add(inputs[-1].parent / "Pods.xcodeproj")
+        
+        def accept_dir(path: Path) -> bool:
+            if path in input_dirs:
+                return True
+            try:
+                parts = path.relative_to(self.project_root).parts
+            except ValueError:
+                return False
+            # Nothing below a pruned directory, even one watched for an input
+            return not any(walker.ignored(parts[depth], '/'.join(parts[:depth + 1]))
+                           for depth in range(len(parts)))
+        
+        def snapshot() -> Dict[Path, Tuple[int, int]]:
+            stats = {}
+            for directory in SourceWalker(self.project_root, ignore).directories():
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_file() and self.checks_for(Path(entry.path)):
+                            st = entry.stat()
+                            stats[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+            for path in self.find_pbxprojs() + self.lockfile_paths():
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                stats[path] = (st.st_mtime_ns, st.st_size)
+            return stats
+        
+        directories = walker.directories()
+        for directory in sorted(input_dirs):
+            if directory not in directories and directory.is_dir():
+                directories.append(directory)
+        
+        watcher = open_watcher(directories, accept_dir, snapshot, interval)
+        self.print_info(f"Watching {self.project_root} ({watcher.kind}), press Ctrl-C to stop")
+        try:
+            while True:
+                changed = wait_for_changes(watcher, debounce)
+                if changed is None:
+                    affected = set(checks)
+                else:
+                    affected = {name for path in changed for name in self.checks_for(path)}
+                if not affected:
+                    continue
+                
+                previous = [issue for name in checks for issue in results[name]]
+                # Drop only what the changed inputs invalidate; the parsed
+                # project survives source edits and vice versa
+                if 'build_phases' in affected or 'build_settings' in affected:
+                    for project in self._projects.values():
+                        project.close()
+                    self._projects.clear()
+                if 'compiler' in affected and self._source_walker is not None:
+                    self._source_walker.invalidate()
+                    self._source_matches = None
+                for name, check in checks.items():
+                    if name in affected:
+                        results[name] = check()
+                current = [issue for name in checks for issue in results[name]]
+                self.print_issue_diff(previous, current)
+        except KeyboardInterrupt:
+            self.print_info("Stopped watching")
+        finally:
+            watcher.close()
+    
+    def print_issue_diff(self, previous: List[Dict], current: List[Dict]):
+        """Print issues that appeared or were resolved between two audits"""
+        def key(issue: Dict) -> str:
+            return json.dumps(issue, sort_keys=True, default=str)
+        
+        before = {key(issue) for issue in previous}
+        after = {key(issue) for issue in current}
+        added = [issue for issue in current if key(issue) not in before]
+        resolved = [issue for issue in previous if key(issue) not in after]
+        
+        self.print_header(f"{datetime.now().strftime('%H:%M:%S')}  +{len(added)} new, -{len(resolved)} resolved")
+        for issue in added:
+            color = Colors.FAIL if issue['severity'] == 'error' else Colors.WARNING
+            print(f"{color}+ [{issue['id']}] {issue['description']}{Colors.ENDC}  {self.issue_location(issue)}")
+        for issue in resolved:
+            print(f"{Colors.OKGREEN}- [{issue['id']}] {issue['description']}{Colors.ENDC}  {self.issue_location(issue)}")
+        if not added and not resolved:
+            self.print_info(f"No change: {len(current)} issues")
+    
+    def issue_location(self, issue: Dict) -> str:
+        """file:line:column (target) for an issue, as far as known"""
+        location = Path(issue['file']).name if issue.get('file') else ''
+        if issue.get('line'):
+            location += f":{issue['line']}:{issue['column']}"
+        if issue.get('target'):
+            location += f" ({issue['target']})"
+        return location
+    
     def apply_all_fixes(self) -> Dict:
         """Apply all automated fixes"""
         self.print_header("Applying Automated Fixes")
         
         if self.protocol.get('automationRules', {}).get('autoFixEnabled', True):
-            self.fix_build_phases()
-            self.fix_compiler_errors()
+            if self.instrumentation is None:
+                self.instrumentation = Instrumentation(self.trace_memory)
+            # Every fixer edits the same parsed projects; each changed file
+            # is then backed up and written once
+            transaction = self.fix_transaction()
+            for name, fix in self.fixers:
+                with self.span(name):
+                    fix(transaction)
+            self.commit_fixes(transaction)
             
             return {
                 'timestamp': datetime.now().isoformat(),
-                'fixes_applied': len(self.fixes_applied),
+                'fixes_applied': self.fix_count,
                 'fixes': self.fixes_applied
             }
         else:
@@ -395,13 +1215,22 @@ class XcodeAuditor:
         full_report = {
             'audit': audit_report,
             'fixes': fix_report,
+            'timings': self.instrumentation.to_list() if self.instrumentation is not None else [],
             'backup_location': str(self.backup_dir) if self.backup_dir.exists() else None
         }
         
-        with open(report_path, 'w') as f:
-            json.dump(full_report, f, indent=2)
-        
-        self.print_success(f"Report saved to: {report_path}")
+        if self.stream is not None:
+            # Issues and fixes were streamed as they were found
+            summary = {key: value for key, value in audit_report.items() if key != 'issues'}
+            summary['fixes_applied'] = fix_report['fixes_applied']
+            summary['timings'] = full_report['timings']
+            summary['backup_location'] = full_report['backup_location']
+            self.emit('summary', summary)
+        else:
+            with open(report_path, 'w') as f:
+                json.dump(full_report, f, indent=2)
+            
+            self.print_success(f"Report saved to: {report_path}")
         
         # Print summary
         self.print_header("Audit Summary")
@@ -410,10 +1239,210 @@ class XcodeAuditor:
         print(f"  - Warnings: {Colors.WARNING}{audit_report['issues_by_severity']['warning']}{Colors.ENDC}")
         print(f"\nFixes Applied: {Colors.OKGREEN}{fix_report['fixes_applied']}{Colors.ENDC}")
         
+        if full_report['timings']:
+            print(f"\n{Colors.BOLD}Timings{Colors.ENDC}")
+            for span in full_report['timings']:
+                name = '  ' * span['depth'] + span['name']
+                peak = f"{span['peak_bytes'] / 1e6:7.1f} MB peak" if span['peak_bytes'] is not None else ''
+                print(f"  {name:<26} {span['wall_seconds']:8.3f}s wall {span['cpu_seconds']:8.3f}s cpu "
+                      f"{span['files_read']:6} files {span['bytes_read'] / 1e6:8.1f} MB read {peak}".rstrip())
+        
         if full_report['backup_location']:
             print(f"\nBackups saved to: {Colors.OKCYAN}{full_report['backup_location']}{Colors.ENDC}")
 
 
+# Per-process state for fleet workers: the protocol is loaded and its
+# source rules compiled once per worker, not once per project
+_fleet_protocol: Optional[Dict] = None
+_fleet_protocol_path = ''
+_fleet_scanner: Optional[SourceScanner] = None
+_fleet_use_cache = True
+
+
+def _init_fleet_worker(protocol: Dict, protocol_path: str, use_cache: bool):
+    global _fleet_protocol, _fleet_protocol_path, _fleet_scanner, _fleet_use_cache
+    _fleet_protocol = protocol
+    _fleet_protocol_path = protocol_path
+    _fleet_scanner = SourceScanner.from_protocol(protocol.get('sourceRules', DEFAULT_SOURCE_RULES))
+    _fleet_use_cache = use_cache
+
+
+def _audit_fleet_project(project_root: str) -> Dict:
+    """Audit one app root in a fleet worker, with its console output discarded"""
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            auditor = XcodeAuditor(project_root, _fleet_protocol_path, protocol=_fleet_protocol)
+            auditor.source_scanner = _fleet_scanner
+            # The fleet pool already uses every worker: no nested pools
+            auditor.jobs = 1
+            if not _fleet_use_cache:
+                auditor.parse_cache = None
+                auditor.use_manifest = False
+            report = auditor.run_full_audit()
+            report['timings'] = auditor.instrumentation.to_list()
+            for project in auditor._projects.values():
+                project.close()
+    except Exception as e:
+        return {'project_root': project_root, 'error': f"{type(e).__name__}: {e}"}
+    del report['protocol_version']
+    return report
+
+
+def expand_roots(patterns: List[str], roots_file: Optional[str] = None) -> List[Path]:
+    """App roots from paths/globs on the command line and in a manifest file"""
+    patterns = list(patterns)
+    if roots_file:
+        with open(roots_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    patterns.append(line)
+    
+    import glob
+    roots = set()
+    for pattern in patterns:
+        matches = glob.glob(os.path.expanduser(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            path = Path(match).resolve()
+            if path.is_dir():
+                roots.add(path)
+    return sorted(roots)
+
+
+def _fleet_sections(pool, roots: List[Path], jobs: int):
+    """Per-project reports in root order, with at most 2*jobs projects in flight
+    
+    A project whose worker raised or died is reported as failed instead of
+    ending the run; a dead worker breaks the pool, so every project after it
+    fails too.
+    """
+    from concurrent.futures import Future
+    
+    pending = []
+    queue = iter(roots)
+    while True:
+        while len(pending) < 2 * jobs:
+            root = next(queue, None)
+            if root is None:
+                break
+            try:
+                future = pool.submit(_audit_fleet_project, str(root))
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+            pending.append((root, future))
+        if not pending:
+            return
+        root, future = pending.pop(0)
+        try:
+            section = future.result()
+        except Exception as e:
+            section = {'project_root': str(root), 'error': f"{type(e).__name__}: {e}"}
+        yield section
+
+
+def run_fleet_audit(roots: List[Path], protocol_path: Path, jobs: int, use_cache: bool,
+                    report_path: Path, report_format: Optional[str] = None) -> int:
+    """Audit many app roots in a bounded process pool into one aggregated report
+    
+    Project sections are streamed to the report in root order as they
+    complete (or, with ndjson, to stdout as issue/project records); only the
+    fleet-level counters stay in memory.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    
+    try:
+        with open(protocol_path, 'r') as f:
+            protocol = json.load(f)
+    except Exception as e:
+        print(f"{Colors.FAIL}Error loading protocol: {e}{Colors.ENDC}")
+        return 1
+    
+    report_format = report_format or protocol.get('automationRules', {}).get('reportFormat', 'json')
+    ndjson = report_format == 'ndjson'
+    stream = sys.stdout
+    if ndjson:
+        # Human-readable progress moves to stderr so stdout stays pure NDJSON
+        sys.stdout = sys.stderr
+    
+    def emit(record_type: str, record: Dict):
+        stream.write(json.dumps({'type': record_type, **record}) + '\n')
+        stream.flush()
+    
+    jobs = max(1, jobs)
+    by_rule: Dict[str, int] = {}
+    by_severity = {'error': 0, 'warning': 0}
+    total_issues = 0
+    failed = []
+    
+    print(f"{Colors.HEADER}{Colors.BOLD}Auditing {len(roots)} projects with {jobs} workers{Colors.ENDC}")
+    tmp_path = report_path.with_name(f".{report_path.name}.tmp")
+    out = None
+    if not ndjson:
+        out = open(tmp_path, 'w')
+        out.write('{\n')
+        out.write(f'  "timestamp": {json.dumps(datetime.now().isoformat())},\n')
+        out.write(f'  "protocol_version": {json.dumps(protocol.get("version"))},\n')
+        out.write('  "projects": [')
+    
+    try:
+        with ProcessPoolExecutor(jobs, initializer=_init_fleet_worker,
+                                 initargs=(protocol, str(protocol_path), use_cache)) as pool:
+            for position, section in enumerate(_fleet_sections(pool, roots, jobs)):
+                name = Path(section['project_root']).name
+                if 'error' in section:
+                    failed.append(section['project_root'])
+                    print(f"{Colors.FAIL}✗{Colors.ENDC} {name}: {section['error']}")
+                else:
+                    total_issues += section['total_issues']
+                    for severity, count in section['issues_by_severity'].items():
+                        by_severity[severity] = by_severity.get(severity, 0) + count
+                    for issue in section['issues']:
+                        by_rule[issue['id']] = by_rule.get(issue['id'], 0) + 1
+                    errors = section['issues_by_severity']['error']
+                    mark = f"{Colors.FAIL}✗{Colors.ENDC}" if errors else f"{Colors.OKGREEN}✓{Colors.ENDC}"
+                    print(f"{mark} {name}: {section['total_issues']} issues ({errors} errors)")
+                
+                if ndjson:
+                    for issue in section.pop('issues', []):
+                        emit('issue', {'project_root': section['project_root'], **issue})
+                    emit('project', section)
+                else:
+                    out.write('\n    ' if position == 0 else ',\n    ')
+                    out.write(json.dumps(section))
+    except BaseException:
+        # Interrupted: leave no half-written report behind
+        if out is not None:
+            out.close()
+            tmp_path.unlink(missing_ok=True)
+        raise
+    
+    fleet = {
+        'projects': len(roots),
+        'failed': failed,
+        'total_issues': total_issues,
+        'issues_by_severity': by_severity,
+        'issues_by_rule': dict(sorted(by_rule.items()))
+    }
+    if ndjson:
+        emit('summary', fleet)
+    else:
+        out.write('\n  ],\n')
+        out.write('  "fleet": ' + json.dumps(fleet, indent=2).replace('\n', '\n  ') + '\n}\n')
+        out.close()
+        os.replace(tmp_path, report_path)
+    
+    print(f"\n{Colors.BOLD}Fleet Summary{Colors.ENDC}")
+    print(f"Projects: {len(roots)} ({len(failed)} failed)")
+    print(f"Total Issues Found: {Colors.WARNING}{total_issues}{Colors.ENDC}")
+    for rule_id, count in sorted(by_rule.items(), key=lambda item: (-item[1], item[0])):
+        print(f"  - {rule_id}: {count}")
+    if not ndjson:
+        print(f"Report saved to: {report_path}")
+    
+    return 1 if by_severity.get('error') or failed else 0
+
+
 def main():
     """Main entry point"""
     import argparse
@@ -426,6 +1455,12 @@ Examples:
   python xcode_auditor.py --audit-only
   python xcode_auditor.py --fix
   python xcode_auditor.py --fix --no-backup
+  python xcode_auditor.py --audit-only --profile audit.prof
+  python xcode_auditor.py --roots 'apps/*' --jobs 8
+  python xcode_auditor.py --settings OTHER_LDFLAGS,HEADER_SEARCH_PATHS
+  python xcode_auditor.py --pods-status || (cd ios && pod install)
+  python xcode_auditor.py --timings build.log
+  python xcode_auditor.py --activity-log ~/Library/Developer/Xcode/DerivedData/MobileTodoList-*/Logs/Build --chrome-trace build-trace.json
         '''
     )
     
@@ -435,6 +1470,26 @@ Examples:
         help='Path to project root (default: current directory)'
     )
     
+    parser.add_argument(
+        '--roots',
+        nargs='+',
+        default=[],
+        metavar='ROOT',
+        help='Audit many project roots (paths or globs) into one fleet report'
+    )
+    
+    parser.add_argument(
+        '--roots-file',
+        metavar='FILE',
+        help='File listing project roots or globs, one per line (fleet mode)'
+    )
+    
+    parser.add_argument(
+        '--fleet-report',
+        default='fleet-audit-report.json',
+        help='Aggregated report path in fleet mode (default: fleet-audit-report.json)'
+    )
+    
     parser.add_argument(
         '--protocol',
         default='.vscode/xcode-build-protocol.json',
@@ -459,8 +1514,110 @@ Examples:
         help='Skip backup creation before fixes'
     )
     
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Scan source files and parse large projects with N worker processes, or audit N projects at once in fleet mode (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--since',
+        metavar='REF',
+        help='Only report issues in files and pbxproj objects changed since REF (merge base with HEAD)'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=['json', 'ndjson'],
+        help='json: write xcode-audit-report.json at the end; ndjson: stream issues, fixes '
+             'and a final summary to stdout as JSON lines, with progress on stderr '
+             '(default: automationRules.reportFormat from the protocol)'
+    )
+    
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and re-audit when the project, Podfile or sources change (no report is written)'
+    )
+    
+    parser.add_argument(
+        '--settings',
+        metavar='NAMES',
+        help='Print the effective value of comma-separated build settings for every target and '
+             'configuration, resolving xcconfig files, $(inherited) and $(VAR), then exit'
+    )
+    
+    parser.add_argument(
+        '--sdk',
+        default='iphoneos',
+        help='SDK that [sdk=...] conditions are matched against with --settings (default: iphoneos)'
+    )
+    
+    parser.add_argument(
+        '--pods-status',
+        action='store_true',
+        help='Report whether pod install is needed (Podfile checksum, Podfile.lock vs '
+             'Pods/Manifest.lock) and exit 1 if it is, 0 if the pods are in sync'
+    )
+    
+    parser.add_argument(
+        '--timings',
+        nargs='+',
+        metavar='LOG',
+        help='Attribute build time to script phases, compiles, Ld and CodeSign from saved '
+             'xcodebuild logs (plain or .gz), joined with the build phase findings, then exit'
+    )
+    
+    parser.add_argument(
+        '--activity-log',
+        metavar='PATH',
+        help='Decode an .xcactivitylog (or the newest one under a DerivedData Logs/Build '
+             'directory) into per-target spans, concurrency and critical path, then exit'
+    )
+    
+    parser.add_argument(
+        '--chrome-trace',
+        metavar='FILE',
+        help='With --activity-log, also write the build timeline as Chrome trace JSON'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ignore .xcode_cache/ and the scan manifest; re-parse and re-scan everything'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        help='Profile the audit and fixes with cProfile, write the stats to FILE (for pstats, '
+             'snakeviz, ...) and print the top functions by cumulative time'
+    )
+    
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='Add peak memory to the report timings (tracemalloc; parsing gets several times slower)'
+    )
+    
     args = parser.parse_args()
     
+    if args.roots or args.roots_file:
+        roots = expand_roots(args.roots, args.roots_file)
+        if not roots:
+            print(f"{Colors.FAIL}Error: No project roots matched{Colors.ENDC}")
+            sys.exit(1)
+        # Shared protocol: as given, else the first root that has one
+        candidates = [Path(args.protocol)] + [root / args.protocol for root in roots]
+        protocol_path = next((path for path in candidates if path.exists()), None)
+        if protocol_path is None:
+            print(f"{Colors.FAIL}Error: Protocol file not found: {args.protocol}{Colors.ENDC}")
+            sys.exit(1)
+        sys.exit(run_fleet_audit(roots, protocol_path.resolve(), args.jobs, not args.no_cache,
+                                 Path(args.fleet_report).resolve(), args.format))
+    
     # Resolve paths
     project_root = Path(args.project_root).resolve()
     protocol_path = project_root / args.protocol
@@ -476,6 +1633,52 @@ Examples:
     if args.no_backup:
         auditor.protocol['automationRules']['backupBeforeFix'] = False
     
+    if args.no_cache:
+        auditor.parse_cache = None
+        auditor.use_manifest = False
+    
+    auditor.jobs = args.jobs
+    auditor.trace_memory = args.trace_memory
+    
+    if args.since:
+        try:
+            auditor.scope = AuditScope(project_root, args.since)
+        except GitScopeError as e:
+            print(f"{Colors.FAIL}Error: {e}{Colors.ENDC}")
+            sys.exit(1)
+    
+    if args.watch:
+        auditor.watch()
+        sys.exit(0)
+    
+    report_format = args.format or auditor.protocol.get('automationRules', {}).get('reportFormat', 'json')
+    if report_format == 'ndjson':
+        auditor.stream = sys.stdout
+        # Human-readable progress moves to stderr so stdout stays pure NDJSON
+        sys.stdout = sys.stderr
+    
+    if args.pods_status:
+        sys.exit(1 if auditor.print_pods_status() else 0)
+    
+    if args.timings:
+        auditor.build_timings([Path(log) for log in args.timings])
+        sys.exit(0)
+    
+    if args.activity_log:
+        trace_path = Path(args.chrome_trace) if args.chrome_trace else None
+        sys.exit(0 if auditor.build_timeline(Path(args.activity_log), trace_path) else 1)
+    
+    if args.settings:
+        settings = [name.strip() for name in args.settings.split(',') if name.strip()]
+        auditor.effective_settings(settings, args.sdk)
+        sys.exit(0)
+    
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    
     # Run audit
     audit_report = auditor.run_full_audit()
     
@@ -490,6 +1693,13 @@ Examples:
     # Generate report
     auditor.generate_report(audit_report, fix_report)
     
+    if profiler is not None:
+        import pstats
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        auditor.print_header(f"Profile (saved to {args.profile})")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(20)
+    
     # Exit with appropriate code
     if audit_report['issues_by_severity']['error'] > 0:
         sys.exit(1)